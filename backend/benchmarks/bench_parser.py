@@ -0,0 +1,186 @@
+# backend/benchmarks/bench_parser.py
+"""
+Benchmark of schema parsing and workload generation across schema sizes.
+
+For each tier of synthetic_schema, measures the throughput in tables per
+second of:
+
+    parse_cql          CQLParser.parse_cql on the whole schema
+    write_yaml         CQLParser.generate_nosqlbench_yaml for every table
+    read_yaml_text     read_yaml_generator.generate_read_yaml_from_text on
+                       every write YAML (the ingestion upload path)
+    read_yaml_write    CQLParser.generate_read_yaml_from_write_and_csv on
+                       every write YAML (the read YAML form path)
+
+Each case runs for at least --min-time seconds per round and the best of
+--repeat rounds is kept. Results are compared with a baseline file; the
+run fails when a case's throughput drops more than the threshold below its
+baseline. Absolute throughput depends on the machine, so the baseline is
+not committed: record one where the benchmark runs (in CI, from the base
+commit in the same job):
+
+    python benchmarks/bench_parser.py --save-baseline
+
+A baseline recorded on another host, Python version or architecture is
+only reported against, never failed on.
+
+Usage:
+    python benchmarks/bench_parser.py [--tiers small,medium] [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from read_yaml_generator import generate_read_yaml_from_text
+from schema_parser import CQLParser
+from synthetic_schema import SIZE_TIERS, tier_schema
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+def measure(func: Callable[[], Any], min_time: float, repeat: int) -> float:
+    """Best seconds per call of func over repeat rounds of at least min_time"""
+    best = float("inf")
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while calls == 0 or elapsed < min_time:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed / calls)
+    return best
+
+
+def tier_cases(parser: CQLParser, schema_text: str) -> Dict[str, Callable[[], Any]]:
+    """Benchmark cases of one schema; each call processes every table once"""
+    schema = parser.parse_cql(schema_text)
+    write_yamls = {name: parser.generate_nosqlbench_yaml(schema, name) for name in schema["tables"]}
+
+    def parse():
+        parser.parse_cql(schema_text)
+
+    def write_yaml():
+        for name in schema["tables"]:
+            parser.generate_nosqlbench_yaml(schema, name)
+
+    def read_yaml_text():
+        for write_yaml_text in write_yamls.values():
+            generate_read_yaml_from_text(write_yaml_text)
+
+    def read_yaml_write():
+        for name, write_yaml_text in write_yamls.items():
+            parser.generate_read_yaml_from_write_and_csv(write_yaml_text, None,
+                                                         schema["tables"][name]["primary_key"][0])
+
+    return {
+        "parse_cql": parse,
+        "write_yaml": write_yaml,
+        "read_yaml_text": read_yaml_text,
+        "read_yaml_write": read_yaml_write,
+    }
+
+
+def run_benchmarks(tiers: List[str], min_time: float, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Tables per second of every case of every tier"""
+    parser = CQLParser()
+    results = {}
+    for tier in tiers:
+        schema_text = tier_schema(tier)
+        table_count = SIZE_TIERS[tier]["tables"]
+        print(f"{tier}: {table_count} tables, {len(schema_text) / 1024:.0f} KB of CQL")
+        results[tier] = {}
+        for case, func in tier_cases(parser, schema_text).items():
+            seconds = measure(func, min_time, repeat)
+            results[tier][case] = round(table_count / seconds, 1)
+            print(f"  {case:<18} {seconds * 1000:9.2f} ms {results[tier][case]:12.0f} tables/s")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Cases whose throughput dropped more than threshold below the baseline"""
+    print(f"Against baseline (fails below -{threshold:.0%}):")
+    regressions = []
+    for tier, cases in results.items():
+        for case, throughput in cases.items():
+            label = f"{tier}/{case}"
+            expected = baseline.get(tier, {}).get(case)
+            if not expected:
+                print(f"  {label:<26} no baseline")
+                continue
+            change = throughput / expected - 1
+            failed = change < -threshold
+            print(f"  {label:<26} {change:+7.1%}{'  REGRESSION' if failed else ''}")
+            if failed:
+                regressions.append(label)
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    """What a baseline's numbers depend on besides the code"""
+    return {"python": platform.python_version(), "machine": platform.machine(), "node": platform.node()}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark schema parsing and YAML generation")
+    arg_parser.add_argument("--tiers", default=",".join(SIZE_TIERS),
+                            help=f"Comma-separated tiers out of {', '.join(SIZE_TIERS)}")
+    arg_parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Rounds per case; the best one is kept")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+    arg_parser.add_argument("--threshold", type=float, default=None,
+                            help=f"Allowed throughput drop, default the baseline's or {DEFAULT_THRESHOLD}")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="Record the results as the baseline")
+    args = arg_parser.parse_args(argv)
+
+    tiers = [tier.strip() for tier in args.tiers.split(",") if tier.strip()]
+    unknown = [tier for tier in tiers if tier not in SIZE_TIERS]
+    if unknown:
+        arg_parser.error(f"Unknown tiers: {', '.join(unknown)}")
+
+    results = run_benchmarks(tiers, args.min_time, args.repeat)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)
+        baseline.setdefault("results", {}).update(results)
+        baseline["threshold"] = args.threshold if args.threshold is not None else \
+            baseline.get("threshold", DEFAULT_THRESHOLD)
+        baseline.update(environment())
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    threshold = args.threshold if args.threshold is not None else baseline.get("threshold", DEFAULT_THRESHOLD)
+    regressions = compare(results, baseline.get("results", {}), threshold)
+    mismatched = [f"{key} {baseline.get(key)} (here {value})" for key, value in environment().items()
+                  if baseline.get(key) != value]
+    if mismatched:
+        print(f"Baseline was recorded elsewhere ({'; '.join(mismatched)}); reporting only")
+        return 0
+    if regressions:
+        print(f"Throughput regressed in {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_yaml.py
+"""
+Benchmark of the YAML layer on a large synthetic ingest bundle.
+
+Compares the previous ingest path (pure-Python yaml.safe_load / safe_dump)
+with yaml_utils (libyaml loader and dumper, content-hash cache).
+
+Usage:
+    python benchmarks/bench_yaml.py [--files N] [--columns N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml_utils
+from schema_parser import CQLParser
+
+
+def build_ingest_bundle(file_count: int, column_count: int):
+    """Generate ingest YAMLs for synthetic tables with the schema generator"""
+    parser = CQLParser()
+    column_types = ['uuid', 'text', 'int', 'bigint', 'timestamp', 'double', 'map<text, text>', 'list<text>']
+    bundle = []
+    for table_index in range(file_count):
+        columns = {
+            f"col_{column_index}": column_types[column_index % len(column_types)]
+            for column_index in range(column_count)
+        }
+        columns["id"] = "uuid"
+        schema = {
+            "tables": {
+                f"bench.table_{table_index}": {
+                    "keyspace": "bench",
+                    "name": f"table_{table_index}",
+                    "columns": columns,
+                    "primary_key": [["id"]],
+                    "clustering_order": {},
+                    "with_options": {}
+                }
+            }
+        }
+        bundle.append(parser.generate_nosqlbench_yaml(schema, f"bench.table_{table_index}"))
+    return bundle
+
+
+def time_pass(label: str, func, documents, baseline: float = None) -> float:
+    """Run func over every document and print the throughput"""
+    start = time.perf_counter()
+    for document in documents:
+        func(document)
+    elapsed = time.perf_counter() - start
+    speedup = f"{baseline / elapsed:6.1f}x" if baseline else "     -"
+    print(f"  {label:<44} {elapsed * 1000:9.1f} ms {len(documents) / elapsed:10.0f} docs/s {speedup}")
+    return elapsed
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark YAML loading and dumping")
+    arg_parser.add_argument("--files", type=int, default=2000, help="Number of ingest YAMLs in the bundle")
+    arg_parser.add_argument("--columns", type=int, default=40, help="Columns per synthetic table")
+    args = arg_parser.parse_args(argv)
+
+    bundle = build_ingest_bundle(args.files, args.columns)
+
+    print(f"Bundle: {len(bundle)} files, {sum(len(d) for d in bundle) / 1024 / 1024:.1f} MB, "
+          f"libyaml {'available' if yaml_utils.LIBYAML_AVAILABLE else 'NOT available'}")
+
+    print("Load:")
+    baseline = time_pass("yaml.safe_load (previous path)", yaml.safe_load, bundle)
+    yaml_utils.clear_cache()
+    time_pass("yaml_utils.load_tolerant (cold cache)", yaml_utils.load_tolerant, bundle, baseline)
+    time_pass("yaml_utils.load_tolerant (warm cache)", yaml_utils.load_tolerant, bundle, baseline)
+
+    print("Dump:")
+    documents = [yaml_utils.load(d) for d in bundle]
+    baseline = time_pass("yaml.safe_dump",
+                         lambda d: yaml.safe_dump(d, default_flow_style=False, sort_keys=False), documents)
+    time_pass("yaml_utils.dump", yaml_utils.dump, documents, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# backend/benchmarks/synthetic_schema.py
+"""
+Deterministic synthetic CQL schemas for the benchmarks.
+
+The schema is written the way cqlsh DESCRIBE prints it: keyspaces, then
+per keyspace its UDTs, tables with their WITH clause, and indexes. The same
+options and seed always give the same text, so timings of one tier are
+comparable across runs.
+
+Usage:
+    python benchmarks/synthetic_schema.py --tier medium > schema.cql
+    python benchmarks/synthetic_schema.py --tables 50 --columns 30 --seed 7
+"""
+import argparse
+import random
+from typing import Any, Dict, List
+
+SCALAR_TYPES = ['uuid', 'timeuuid', 'text', 'int', 'bigint', 'smallint', 'boolean', 'double', 'float',
+                'decimal', 'timestamp', 'date', 'inet', 'blob', 'varint']
+KEY_TYPES = ['uuid', 'text', 'int', 'bigint', 'timeuuid', 'timestamp']
+
+# Options in the order DESCRIBE prints them; with_options takes the first N
+TABLE_OPTIONS = [
+    ("additional_write_policy", "'99p'"),
+    ("bloom_filter_fp_chance", "0.01"),
+    ("caching", "{'keys': 'ALL', 'rows_per_partition': 'NONE'}"),
+    ("cdc", "false"),
+    ("comment", "''"),
+    ("compaction", "{'class': 'org.apache.cassandra.db.compaction.SizeTieredCompactionStrategy', "
+                   "'max_threshold': '32', 'min_threshold': '4'}"),
+    ("compression", "{'chunk_length_in_kb': '16', 'class': 'org.apache.cassandra.io.compress.LZ4Compressor'}"),
+    ("crc_check_chance", "1.0"),
+    ("default_time_to_live", "0"),
+    ("extensions", "{}"),
+    ("gc_grace_seconds", "864000"),
+    ("max_index_interval", "2048"),
+    ("memtable_flush_period_in_ms", "0"),
+    ("min_index_interval", "128"),
+    ("read_repair", "'BLOCKING'"),
+    ("speculative_retry", "'99p'"),
+]
+
+# Keyword arguments of generate_schema per benchmark tier
+SIZE_TIERS = {
+    "small": {"keyspaces": 1, "tables": 10, "columns": 10, "udts": 2, "collections": 2,
+              "with_options": 4, "indexes": 2},
+    "medium": {"keyspaces": 3, "tables": 60, "columns": 25, "udts": 6, "collections": 5,
+               "with_options": 10, "indexes": 12},
+    "large": {"keyspaces": 8, "tables": 250, "columns": 60, "udts": 16, "collections": 12,
+              "with_options": len(TABLE_OPTIONS), "indexes": 60},
+}
+
+
+def _collection_type(rng: random.Random, udt_names: List[str]) -> str:
+    element = rng.choice(SCALAR_TYPES[:11])
+    kind = rng.randrange(5)
+    if kind == 0:
+        return f"list<{element}>"
+    if kind == 1:
+        return f"set<{element}>"
+    if kind == 2:
+        return f"map<text, {element}>"
+    if kind == 3 and udt_names:
+        return f"frozen<list<frozen<{rng.choice(udt_names)}>>>"
+    return f"frozen<map<{rng.choice(KEY_TYPES)}, list<{element}>>>"
+
+
+def _with_clause(rng: random.Random, clustering: List[str], with_options: int) -> str:
+    clauses = []
+    if clustering:
+        order = ", ".join(f"{col} {rng.choice(['ASC', 'DESC'])}" for col in clustering)
+        clauses.append(f"CLUSTERING ORDER BY ({order})")
+    clauses.extend(f"{name} = {value}" for name, value in TABLE_OPTIONS[:with_options])
+    if not clauses:
+        return ""
+    return " WITH " + "\n    AND ".join(clauses)
+
+
+def generate_schema(keyspaces: int = 1, tables: int = 10, columns: int = 10, udts: int = 0,
+                    collections: int = 0, with_options: int = 0, indexes: int = 0,
+                    seed: int = 42) -> str:
+    """
+    CQL text of a synthetic schema.
+
+    tables, udts and indexes are totals spread round-robin over the
+    keyspaces; columns and collections are per table, collections counting
+    towards columns. with_options is the number of table options in each
+    WITH clause, up to len(TABLE_OPTIONS).
+    """
+    if keyspaces < 1 or tables < 1 or columns < 2:
+        raise ValueError("Expected at least 1 keyspace, 1 table and 2 columns")
+    rng = random.Random(seed)
+    statements = []
+
+    keyspace_names = [f"bench_ks_{i}" for i in range(keyspaces)]
+    udt_names = {name: [] for name in keyspace_names}
+    table_columns = {}
+
+    for keyspace in keyspace_names:
+        statements.append(
+            f"CREATE KEYSPACE {keyspace} WITH replication = {{'class': 'NetworkTopologyStrategy', "
+            f"'dc1': '3', 'dc2': '3'}} AND durable_writes = true;")
+
+    for i in range(udts):
+        keyspace = keyspace_names[i % keyspaces]
+        name = f"udt_{i}"
+        fields = ", ".join(f"field_{f} {rng.choice(SCALAR_TYPES)}" for f in range(rng.randint(2, 6)))
+        statements.append(f"CREATE TYPE {keyspace}.{name} ({fields});")
+        udt_names[keyspace].append(name)
+
+    for i in range(tables):
+        keyspace = keyspace_names[i % keyspaces]
+        name = f"table_{i}"
+        partition_count = 1 if columns < 4 else rng.choice([1, 1, 2])
+        clustering_count = min(rng.choice([0, 1, 2]), columns - partition_count - 1)
+        definitions = []
+        key_columns = []
+        for k in range(partition_count + clustering_count):
+            column = f"pk_{k}" if k < partition_count else f"ck_{k - partition_count}"
+            key_columns.append(column)
+            definitions.append(f"{column} {rng.choice(KEY_TYPES)}")
+        regular = columns - len(key_columns)
+        collection_count = min(collections, regular)
+        regular_columns = []
+        for c in range(regular):
+            column = f"col_{c}"
+            if c < collection_count:
+                column_type = _collection_type(rng, udt_names[keyspace])
+            elif udt_names[keyspace] and rng.random() < 0.05:
+                column_type = f"frozen<{rng.choice(udt_names[keyspace])}>"
+            else:
+                column_type = rng.choice(SCALAR_TYPES)
+            regular_columns.append((column, column_type))
+            definitions.append(f"{column} {column_type}")
+
+        partition = ", ".join(key_columns[:partition_count])
+        clustering = key_columns[partition_count:]
+        key = f"({partition})" + "".join(f", {col}" for col in clustering)
+        definitions.append(f"PRIMARY KEY ({key})")
+        body = ",\n    ".join(definitions)
+        statements.append(f"CREATE TABLE {keyspace}.{name} (\n    {body}\n)"
+                          f"{_with_clause(rng, clustering, with_options)};")
+        table_columns[f"{keyspace}.{name}"] = regular_columns
+
+    table_names = list(table_columns)
+    for i in range(indexes):
+        full_name = table_names[i % len(table_names)]
+        keyspace, table = full_name.split(".")
+        column, column_type = rng.choice(table_columns[full_name])
+        if column_type.startswith("map<"):
+            target = f"entries({column})"
+        elif column_type.startswith(("list<", "set<")):
+            target = f"values({column})"
+        elif column_type.startswith("frozen<"):
+            target = f"full({column})"
+        else:
+            target = column
+        if i % 2:
+            statements.append(f"CREATE CUSTOM INDEX {table}_{column}_sai_{i} ON {keyspace}.{table} ({target}) "
+                              f"USING 'StorageAttachedIndex';")
+        else:
+            statements.append(f"CREATE INDEX {table}_{column}_idx_{i} ON {keyspace}.{table} ({target});")
+
+    return "\n\n".join(statements) + "\n"
+
+
+def tier_schema(tier: str, seed: int = 42) -> str:
+    """CQL text of a benchmark tier"""
+    if tier not in SIZE_TIERS:
+        raise ValueError(f"Unknown tier: {tier}. Expected one of {', '.join(SIZE_TIERS)}")
+    return generate_schema(seed=seed, **SIZE_TIERS[tier])
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Print a synthetic CQL schema")
+    arg_parser.add_argument("--tier", choices=list(SIZE_TIERS), help="Use the options of a benchmark tier")
+    defaults: Dict[str, Any] = SIZE_TIERS["small"]
+    for option in ("keyspaces", "tables", "columns", "udts", "collections", "with_options", "indexes"):
+        arg_parser.add_argument(f"--{option.replace('_', '-')}", type=int, default=None,
+                                help=f"Default: {defaults[option]}, or the tier's")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args(argv)
+
+    options = dict(SIZE_TIERS[args.tier or "small"])
+    options.update({key: value for key, value in vars(args).items()
+                    if key in options and value is not None})
+    print(generate_schema(seed=args.seed, **options), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# backend/cdm_planner.py
+import math
+import os
+import re
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple, Any
+
+from dsbulk_utils import DSBulkManager, split_token_ring
+from schema_parser import replication_settings
+
+MIGRATION_TYPES = ("full", "incremental")
+ROW_ESTIMATE_METHODS = ("tablestats", "dsbulk", "manual")
+
+# Migration rate assumed when neither a configured nor a measured rate exists
+DEFAULT_ROWS_PER_SECOND = 20000
+
+# Upper bound on token-range partitions; CDM schedules one Spark task per partition
+MAX_PARTITIONS = 100000
+
+# Cassandra Data Migrator assembly used when none is configured
+DEFAULT_CDM_JAR = os.path.expanduser("~/workspace/cassandra-data-migrator.jar")
+
+MIGRATE_CLASS = "com.datastax.cdm.job.Migrate"
+DIFF_DATA_CLASS = "com.datastax.cdm.job.DiffData"
+
+_TABLESTATS_PARTITIONS_PATTERN = re.compile(r"Number of partitions \(estimate\):\s*(\d+)")
+_CDM_COUNT_PATTERN = re.compile(r"(Final )?(Read|Write|Error|Missing|Mismatch|Corrected Missing) Record Count:\s*(\d+)")
+
+
+def find_table(schema_info: Dict[str, Any], keyspace: str, table: str) -> Dict[str, Any]:
+    """Look up a table of a parsed schema by keyspace and name"""
+    for full_name in (f"{keyspace}.{table}", table):
+        table_info = schema_info.get("tables", {}).get(full_name)
+        if table_info and (table_info["keyspace"] in (None, keyspace)):
+            return table_info
+    raise ValueError(f"Table {keyspace}.{table} not found in the schema")
+
+
+def compare_tables(source_info: Dict[str, Any], target_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Check that every source column can be written to the target table"""
+    missing_columns = [col for col in source_info["columns"] if col not in target_info["columns"]]
+    type_mismatches = [
+        {"column": col, "source_type": col_type, "target_type": target_info["columns"][col]}
+        for col, col_type in source_info["columns"].items()
+        if col in target_info["columns"] and target_info["columns"][col].strip() != col_type.strip()
+    ]
+    primary_key_match = source_info["primary_key"] == target_info["primary_key"]
+
+    return {
+        "compatible": not missing_columns and not type_mismatches and primary_key_match,
+        "missing_columns": missing_columns,
+        "type_mismatches": type_mismatches,
+        "primary_key_match": primary_key_match
+    }
+
+
+def estimate_rows_with_dsbulk(dsbulk_manager: DSBulkManager, keyspace: str, table: str) -> Dict[str, Any]:
+    """Count the rows of a table with dsbulk count (exact, but scans the table)"""
+    command = dsbulk_manager.generate_count_command(keyspace=keyspace, table=table)
+    result = dsbulk_manager.execute_command(command)
+    summary = result.get("summary") or {}
+    rows = summary.get("count", summary.get("total_rows"))
+    if not result["success"] or rows is None:
+        raise ValueError(f"dsbulk count failed: {result.get('stderr') or result.get('error') or 'no count in output'}")
+
+    return {"rows": rows, "method": "dsbulk", "exact": True}
+
+
+def replication_factor(schema_info: Dict[str, Any], keyspace: str) -> Optional[int]:
+    """Replicas of every row of a keyspace across all of its datacenters, if the schema declares them"""
+    keyspace_info = schema_info.get("keyspaces", {}).get(keyspace)
+    if not keyspace_info:
+        return None
+    _, factors = replication_settings(keyspace_info)
+    return sum(factors.values()) or None
+
+
+def estimate_rows_from_tablestats(keyspace: str, table: str, nodetool_path: str = "nodetool",
+                                  rows_per_partition: float = 1.0, nodes: int = 1,
+                                  replication_factor: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Estimate the rows of a table from nodetool tablestats.
+
+    Cassandra only tracks an estimated partition count, so rows_per_partition
+    scales it for tables with clustering columns. The count is that of the
+    node nodetool reports on, so it is scaled to the table by nodes /
+    replication_factor; fewer nodes than replicas means every node holds
+    every row.
+    """
+    if nodes < 1:
+        raise ValueError("nodes must be at least 1")
+    result = subprocess.run([nodetool_path, "tablestats", f"{keyspace}.{table}"],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    match = _TABLESTATS_PARTITIONS_PATTERN.search(result.stdout)
+    if result.returncode != 0 or not match:
+        raise ValueError(f"nodetool tablestats failed: {result.stderr.strip() or 'no partition estimate in output'}")
+
+    node_partitions = int(match.group(1))
+    replicas = replication_factor or 1
+    partitions = int(node_partitions * max(nodes, replicas) / replicas)
+    return {
+        "rows": int(partitions * rows_per_partition),
+        "method": "tablestats",
+        "exact": False,
+        "partitions": partitions,
+        "node_partitions": node_partitions,
+        "nodes": nodes,
+        "replication_factor": replication_factor,
+        "rows_per_partition": rows_per_partition
+    }
+
+
+def measured_rows_per_second(runs: List[Dict[str, Any]], keyspace: str, table: str) -> Optional[float]:
+    """
+    Rate of the most recent completed migration of a source table, if any.
+
+    The rate is the read record count CDM logged (see parse_cdm_progress)
+    over the run's elapsed time; runs that logged no count are skipped.
+    """
+    measured = []
+    for run in runs:
+        if (run["status"] != "completed" or not run.get("end_time") or not run.get("start_time")
+                or run["metadata"].get("source") != f"{keyspace}.{table}"):
+            continue
+        rows = parse_cdm_progress(run["stdout"] + run["stderr"], 0)["counts"].get("read")
+        elapsed = run["end_time"] - run["start_time"]
+        if rows and elapsed > 0:
+            measured.append((run["end_time"], rows / elapsed))
+    if not measured:
+        return None
+    return round(max(measured)[1], 1)
+
+
+def plan_partitions(estimated_rows: int, batch_size: int) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Split the token ring into partitions holding about batch_size rows each.
+
+    Returns the ranges and the resulting rows per partition, which exceeds
+    batch_size only when MAX_PARTITIONS caps the partition count.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    partition_count = max(1, min(MAX_PARTITIONS, math.ceil(estimated_rows / batch_size)))
+    return split_token_ring(partition_count), math.ceil(estimated_rows / partition_count)
+
+
+def format_duration(seconds: float) -> str:
+    """Human-readable duration such as '2 hours 5 minutes'"""
+    seconds = int(math.ceil(seconds))
+    if seconds < 60:
+        return f"{seconds} seconds"
+    hours, remainder = divmod(seconds, 3600)
+    minutes = math.ceil(remainder / 60) if not hours else remainder // 60
+    if not hours:
+        return f"{minutes} minutes"
+    return f"{hours} hours {minutes} minutes"
+
+
+def write_partition_file(path: str, partitions: List[Tuple[int, int]]):
+    """Write token ranges in CDM's partition file format (one min,max pair per line)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        for start, end in partitions:
+            f.write(f"{start},{end}\n")
+
+
+def generate_cdm_command(plan: Dict[str, Any],
+                         cdm_jar: str,
+                         spark_submit: str = "spark-submit",
+                         properties_file: Optional[str] = None) -> Tuple[List[str], str]:
+    """
+    Build the spark-submit invocation of Cassandra Data Migrator for a plan.
+
+    Returns the argument list and its shell rendering.
+    """
+    conf = {
+        "spark.cdm.schema.origin.keyspaceTable": plan["source"],
+        "spark.cdm.schema.target.keyspaceTable": plan["target"],
+        "spark.cdm.perfops.numParts": plan["partitions"]["count"],
+        "spark.cdm.tokenrange.partitionFile.input": plan["partitions"]["file"]
+    }
+    if plan.get("origin_host"):
+        conf["spark.cdm.connect.origin.host"] = plan["origin_host"]
+    if plan.get("target_host"):
+        conf["spark.cdm.connect.target.host"] = plan["target_host"]
+    if plan.get("filter_condition"):
+        conf["spark.cdm.filter.cassandra.whereCondition"] = plan["filter_condition"]
+
+    # Incremental migrations diff source and target and write only missing rows
+    job_class = MIGRATE_CLASS
+    if plan["migration_type"] == "incremental":
+        job_class = DIFF_DATA_CLASS
+        conf["spark.cdm.autocorrect.missing"] = "true"
+
+    args = [spark_submit]
+    if properties_file:
+        args += ["--properties-file", properties_file]
+    for key, value in conf.items():
+        args += ["--conf", f"{key}={value}"]
+    args += ["--master", "local[*]", "--class", job_class, cdm_jar]
+
+    command = f"{spark_submit}"
+    if properties_file:
+        command += f" \\\n  --properties-file {properties_file}"
+    for key, value in conf.items():
+        command += f' \\\n  --conf "{key}={value}"'
+    command += f' \\\n  --master "local[*]" \\\n  --class {job_class} \\\n  {cdm_jar}'
+
+    return args, command
+
+
+def build_migration_plan(schema_info: Dict[str, Any],
+                         source_keyspace: str,
+                         source_table: str,
+                         target_keyspace: str,
+                         target_table: str,
+                         row_estimate: Dict[str, Any],
+                         rows_per_second: float,
+                         rate_source: str,
+                         partition_file: str,
+                         migration_type: str = "full",
+                         batch_size: int = 1000,
+                         filter_condition: Optional[str] = None,
+                         origin_host: Optional[str] = None,
+                         target_host: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Plan a CDM migration between two tables of a parsed schema.
+
+    The duration is the estimated row count divided by the migration rate;
+    the token ring is split into partitions of about batch_size rows, which
+    are written to partition_file for CDM to consume.
+    """
+    if migration_type not in MIGRATION_TYPES:
+        raise ValueError(f"Unsupported migration type: {migration_type}. Expected one of {', '.join(MIGRATION_TYPES)}")
+    if rows_per_second <= 0:
+        raise ValueError("rows_per_second must be positive")
+
+    source_info = find_table(schema_info, source_keyspace, source_table)
+    target_info = find_table(schema_info, target_keyspace, target_table)
+    schema_check = compare_tables(source_info, target_info)
+
+    rows = row_estimate["rows"]
+    partitions, rows_per_partition = plan_partitions(rows, batch_size)
+    write_partition_file(partition_file, partitions)
+
+    migrate_seconds = rows / rows_per_second
+    steps = [
+        {
+            "order": 1,
+            "description": f"Check that {target_keyspace}.{target_table} can hold every column of {source_keyspace}.{source_table}",
+            "estimatedTime": "a few seconds"
+        },
+        {
+            "order": 2,
+            "description": (f"Copy {rows:,} rows in {len(partitions):,} token-range partitions "
+                            f"of about {rows_per_partition:,} rows"),
+            "estimatedTime": format_duration(migrate_seconds)
+        }
+    ]
+    if migration_type == "incremental":
+        steps[1]["description"] = (f"Compare {rows:,} rows in {len(partitions):,} token-range partitions "
+                                   f"and write the rows missing from the target")
+
+    return {
+        "source": f"{source_keyspace}.{source_table}",
+        "target": f"{target_keyspace}.{target_table}",
+        "migration_type": migration_type,
+        "batch_size": batch_size,
+        "filter_condition": filter_condition,
+        "origin_host": origin_host,
+        "target_host": target_host,
+        "schema_check": schema_check,
+        "row_estimate": row_estimate,
+        "rate": {"rows_per_second": rows_per_second, "source": rate_source},
+        "estimated_seconds": round(migrate_seconds, 1),
+        "estimatedRows": rows,
+        "estimatedTime": format_duration(migrate_seconds),
+        "partitions": {
+            "count": len(partitions),
+            "rows_per_partition": rows_per_partition,
+            "file": partition_file
+        },
+        "steps": steps,
+        "created_at": time.time()
+    }
+
+
+def parse_cdm_progress(log_lines: List[str], estimated_rows: int) -> Dict[str, Any]:
+    """
+    Extract the latest record counts CDM logs while it runs.
+
+    CDM periodically logs "Read Record Count: N" style lines and "Final ..."
+    lines once done; the read count against the estimate gives the progress.
+    """
+    counts = {}
+    final = False
+    for line in log_lines:
+        for match in _CDM_COUNT_PATTERN.finditer(line):
+            counts[match.group(2).lower().replace(' ', '_')] = int(match.group(3))
+            final = final or bool(match.group(1))
+
+    read = counts.get("read")
+    percent = None
+    if read is not None and estimated_rows:
+        percent = round(min(100.0, 100.0 * read / estimated_rows), 1)
+
+    return {"counts": counts, "final": final, "percent": percent}
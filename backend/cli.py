@@ -0,0 +1,343 @@
+# backend/cli.py
+"""
+benchwave - headless batch generation of NoSQLBench workloads.
+
+Walks a directory tree of .cql schema files and, for every table found,
+writes the write YAML, the read YAML, an nb5 execution script and a DSBulk
+unload script. Unchanged schema files are skipped using content hashes
+stored in a manifest next to the generated output.
+
+Usage:
+    python cli.py SCHEMA_DIR -o OUTPUT_DIR [--workers N] [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Any, Tuple
+
+from schema_parser import CQLParser
+from dsbulk_utils import DSBulkManager, TUNING_PROFILES
+from nb5_executor import NB5Executor
+from partition_model import parse_partition_json
+from read_patterns import parse_read_patterns_json
+from row_sizing import parse_row_size_json
+from sizing_planner import parse_sizing_json, plan_table_sizing, sizing_command_params
+from vector_search import parse_vector_json
+
+
+MANIFEST_FILENAME = ".benchwave-manifest.json"
+
+# Per-process generator instances, created once by the pool initializer so
+# the parser's regular expressions are compiled once per worker
+_parser = None
+_dsbulk_manager = None
+_nb5_executor = None
+
+
+def _init_worker(dsbulk_path: Optional[str], nb5_path: Optional[str]):
+    """Initialize the generators used by a worker process"""
+    global _parser, _dsbulk_manager, _nb5_executor
+    _parser = CQLParser()
+    _dsbulk_manager = DSBulkManager(dsbulk_path)
+    _nb5_executor = NB5Executor(nb5_path)
+
+
+def find_schema_files(schema_dir: str) -> List[str]:
+    """Return the paths of all .cql files under a directory, sorted"""
+    schema_files = []
+    for root, dirs, files in os.walk(schema_dir):
+        # Never descend into hidden directories such as .git
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for filename in files:
+            if filename.endswith('.cql'):
+                schema_files.append(os.path.join(root, filename))
+    return sorted(schema_files)
+
+
+def compute_input_hash(content: bytes, options: Dict[str, Any]) -> str:
+    """Hash a schema file together with the options that affect its output"""
+    digest = hashlib.sha256(content)
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir: str) -> Dict[str, Any]:
+    """Load the manifest of previously generated inputs, if any"""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A corrupt manifest only costs a full regeneration
+        return {}
+
+
+def save_manifest(output_dir: str, manifest: Dict[str, Any]):
+    """Atomically write the manifest of generated inputs"""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+
+def _write_file(path: str, content: str, executable: bool = False):
+    """Write a generated file, creating parent directories as needed"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    if executable:
+        os.chmod(path, 0o755)
+
+
+def process_schema_file(task: Tuple[str, str, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Parse one schema file and write the workloads for all of its tables.
+
+    Runs inside a worker process; returns a plain result dict.
+    """
+    schema_path, relative_path, output_dir, options = task
+    start_time = time.perf_counter()
+
+    try:
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            cql_content = f.read()
+
+        schema_info = _parser.parse_cql(cql_content)
+
+        # Mirror the input tree in the output directory
+        target_dir = os.path.join(output_dir, os.path.splitext(relative_path)[0])
+        outputs = []
+
+        for full_name, table_info in schema_info["tables"].items():
+            safe_name = full_name.replace('.', '_')
+            keyspace = table_info["keyspace"] or options["keyspace"]
+
+            # Write workload
+            write_yaml = _parser.generate_nosqlbench_yaml(schema_info, full_name, options["row_size"],
+                                                         options["partitioning"], options["vectors"],
+                                                         options["sizing"])
+            write_path = os.path.join(target_dir, f"{safe_name}.yaml")
+            _write_file(write_path, write_yaml)
+            outputs.append(write_path)
+
+            # DSBulk unload of the full primary key feeds the read workload's sampler
+            key_columns = [col for part in table_info["primary_key"] for col in part]
+            if key_columns:
+                unload_path = os.path.join(options["csv_dir"], safe_name)
+                csv_path = os.path.join(unload_path, "output-000001.csv")
+
+                read_yaml = _parser.generate_read_yaml_from_write_and_csv(
+                    write_yaml, csv_path, key_columns, read_patterns=options["read_patterns"]
+                )
+                read_path = os.path.join(target_dir, f"{safe_name}_read.yaml")
+                _write_file(read_path, read_yaml)
+                outputs.append(read_path)
+
+                dsbulk_script = _dsbulk_manager.generate_unload_script(
+                    keyspace=keyspace,
+                    table=table_info["name"],
+                    primary_key=",".join(key_columns),
+                    output_path=unload_path,
+                    limit=options["limit"],
+                    profile=options["dsbulk_profile"]
+                )
+                dsbulk_path = os.path.join(target_dir, f"dsbulk_unload_{keyspace}_{table_info['name']}.sh")
+                _write_file(dsbulk_path, dsbulk_script, executable=True)
+                outputs.append(dsbulk_path)
+
+            nb5_script = _nb5_executor.generate_execution_script(
+                yaml_file=write_path,
+                host=options["host"],
+                datacenter=options["datacenter"],
+                keyspace=keyspace,
+                additional_params=sizing_command_params(
+                    plan_table_sizing(schema_info, full_name, table_info, options["sizing"], options["row_size"])
+                )
+            )
+            nb5_path = os.path.join(target_dir, f"nb5_execute_{safe_name}.yaml.sh")
+            _write_file(nb5_path, nb5_script, executable=True)
+            outputs.append(nb5_path)
+
+        return {
+            "path": relative_path,
+            "success": True,
+            "tables": len(schema_info["tables"]),
+            "outputs": outputs,
+            "bytes": len(cql_content.encode('utf-8')),
+            "elapsed": time.perf_counter() - start_time
+        }
+    except Exception as e:
+        return {
+            "path": relative_path,
+            "success": False,
+            "error": str(e),
+            "tables": 0,
+            "outputs": [],
+            "bytes": 0,
+            "elapsed": time.perf_counter() - start_time
+        }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the command line interface"""
+    arg_parser = argparse.ArgumentParser(
+        prog="benchwave",
+        description="Generate NoSQLBench workloads and scripts for every table in a directory of CQL schemas"
+    )
+    arg_parser.add_argument("schema_dir", help="Directory searched recursively for .cql files")
+    arg_parser.add_argument("-o", "--output", default="generated", help="Output directory (default: generated)")
+    arg_parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                            help="Number of worker processes (default: CPU count)")
+    arg_parser.add_argument("--force", action="store_true", help="Regenerate all inputs, ignoring the manifest")
+    arg_parser.add_argument("--host", default="localhost", help="Cassandra host for nb5 scripts")
+    arg_parser.add_argument("--datacenter", default="datacenter1", help="Local datacenter for nb5 scripts")
+    arg_parser.add_argument("--keyspace", default="baselines", help="Keyspace for tables declared without one")
+    arg_parser.add_argument("--csv-dir", default="dsbulk_output",
+                            help="Directory the DSBulk unloads write to and the read workloads sample from")
+    arg_parser.add_argument("--limit", type=int, default=1000000, help="Row limit for DSBulk unloads")
+    arg_parser.add_argument("--row-size", default=None,
+                            help="Row-size options as JSON, or a path to a JSON file (see row_sizing.py)")
+    arg_parser.add_argument("--partitioning", default=None,
+                            help="Partition options as JSON, or a path to a JSON file (see partition_model.py)")
+    arg_parser.add_argument("--vectors", default=None,
+                            help="Vector options as JSON, or a path to a JSON file (see vector_search.py)")
+    arg_parser.add_argument("--sizing", default=None,
+                            help="Dataset sizing as JSON, or a path to a JSON file (see sizing_planner.py)")
+    arg_parser.add_argument("--read-patterns", default=None,
+                            help="Read pattern ratios as JSON, or a path to a JSON file (see read_patterns.py)")
+    arg_parser.add_argument("--dsbulk-path", default=None, help="Path to the DSBulk JAR")
+    arg_parser.add_argument("--dsbulk-profile", default="default", choices=sorted(TUNING_PROFILES),
+                            help="DSBulk tuning profile for the unload scripts (default: default)")
+    arg_parser.add_argument("--nb5-path", default=None, help="Path to the NB5 JAR")
+    return arg_parser
+
+
+def _read_json_option(value: Optional[str]) -> Optional[str]:
+    """JSON given inline or as a path to a JSON file"""
+    if value and os.path.isfile(value):
+        with open(value, 'r', encoding='utf-8') as f:
+            return f.read()
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+
+    if not os.path.isdir(args.schema_dir):
+        print(f"Error: {args.schema_dir} is not a directory", file=sys.stderr)
+        return 2
+
+    try:
+        row_size = parse_row_size_json(_read_json_option(args.row_size))
+    except (ValueError, KeyError) as e:
+        print(f"Error: invalid --row-size: {e}", file=sys.stderr)
+        return 2
+    try:
+        partitioning = parse_partition_json(_read_json_option(args.partitioning))
+    except ValueError as e:
+        print(f"Error: invalid --partitioning: {e}", file=sys.stderr)
+        return 2
+    try:
+        vectors = parse_vector_json(_read_json_option(args.vectors))
+    except ValueError as e:
+        print(f"Error: invalid --vectors: {e}", file=sys.stderr)
+        return 2
+    try:
+        sizing = parse_sizing_json(_read_json_option(args.sizing))
+    except ValueError as e:
+        print(f"Error: invalid --sizing: {e}", file=sys.stderr)
+        return 2
+    try:
+        read_patterns = parse_read_patterns_json(_read_json_option(args.read_patterns))
+    except ValueError as e:
+        print(f"Error: invalid --read-patterns: {e}", file=sys.stderr)
+        return 2
+
+    output_dir = os.path.abspath(args.output)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Options that change the generated files are part of the input hash
+    options = {
+        "host": args.host,
+        "datacenter": args.datacenter,
+        "keyspace": args.keyspace,
+        "csv_dir": args.csv_dir,
+        "limit": args.limit,
+        "dsbulk_path": args.dsbulk_path,
+        "dsbulk_profile": args.dsbulk_profile,
+        "row_size": row_size,
+        "partitioning": partitioning,
+        "vectors": vectors,
+        "sizing": sizing,
+        "read_patterns": read_patterns,
+        "nb5_path": args.nb5_path
+    }
+
+    start_time = time.perf_counter()
+    manifest = {} if args.force else load_manifest(output_dir)
+
+    # Decide which inputs need regenerating
+    tasks = []
+    input_hashes = {}
+    skipped = 0
+    for schema_path in find_schema_files(args.schema_dir):
+        relative_path = os.path.relpath(schema_path, args.schema_dir)
+        with open(schema_path, 'rb') as f:
+            input_hash = compute_input_hash(f.read(), options)
+
+        previous = manifest.get(relative_path)
+        if previous and previous.get("hash") == input_hash and all(
+            os.path.exists(path) for path in previous.get("outputs", [])
+        ):
+            skipped += 1
+            continue
+
+        input_hashes[relative_path] = input_hash
+        tasks.append((schema_path, relative_path, output_dir, options))
+
+    generated = 0
+    failed = 0
+    tables = 0
+    total_bytes = 0
+
+    if tasks:
+        workers = max(1, min(args.workers, len(tasks)))
+        with Pool(processes=workers, initializer=_init_worker,
+                  initargs=(args.dsbulk_path, args.nb5_path)) as pool:
+            for result in pool.imap_unordered(process_schema_file, tasks):
+                if result["success"]:
+                    generated += 1
+                    tables += result["tables"]
+                    total_bytes += result["bytes"]
+                    manifest[result["path"]] = {
+                        "hash": input_hashes[result["path"]],
+                        "outputs": result["outputs"]
+                    }
+                    print(f"  generated {result['path']}: {result['tables']} tables in {result['elapsed'] * 1000:.1f} ms")
+                else:
+                    failed += 1
+                    manifest.pop(result["path"], None)
+                    print(f"  failed    {result['path']}: {result['error']}", file=sys.stderr)
+
+    save_manifest(output_dir, manifest)
+
+    # Throughput statistics
+    elapsed = time.perf_counter() - start_time
+    rate_base = elapsed if elapsed > 0 else 1e-9
+    print(f"Processed {generated + skipped + failed} schema files in {elapsed:.2f}s "
+          f"({generated} generated, {skipped} unchanged, {failed} failed)")
+    print(f"Throughput: {generated / rate_base:.1f} files/s, {tables / rate_base:.1f} tables/s, "
+          f"{total_bytes / 1024 / rate_base:.1f} KB/s of schema")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
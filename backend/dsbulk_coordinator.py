@@ -0,0 +1,346 @@
+# backend/dsbulk_coordinator.py
+import glob
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+from dsbulk_utils import DSBulkManager, split_token_ring
+
+COORDINATED_OPERATIONS = ("unload", "load", "count")
+
+# Retry policy for failed sub-jobs
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 300.0
+
+
+class DSBulkRangeCoordinator:
+    """
+    Runs a DSBulk operation as many small sub-jobs instead of one process.
+
+    Unloads and counts are split into token ranges. Loads are split by
+    input file, because the rows in a CSV file are not ordered by token.
+    Sub-jobs run with bounded parallelism and failed ones are retried with
+    exponential backoff. Every state change is checkpointed to a JSON file,
+    so an interrupted operation resumes with only the unfinished sub-jobs.
+    """
+
+    def __init__(self, dsbulk_manager: DSBulkManager, checkpoint_dir: str = None):
+        # Default to a common location if not specified
+        self.dsbulk_manager = dsbulk_manager
+        self.checkpoint_dir = checkpoint_dir or os.path.expanduser("~/workspace/benchwave-jobs")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._threads = {}
+        self._cancelled = set()
+
+    def create_job(self,
+                   operation: str,
+                   keyspace: str,
+                   table: str,
+                   partition_key: Optional[str] = None,
+                   output_path: Optional[str] = None,
+                   csv_path: Optional[str] = None,
+                   range_count: int = 16,
+                   max_parallel: int = 4,
+                   max_retries: int = DEFAULT_MAX_RETRIES,
+                   backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+                   profile: Optional[str] = None) -> Dict[str, Any]:
+        """Plan the sub-jobs of an operation and write the initial checkpoint"""
+        if operation not in COORDINATED_OPERATIONS:
+            raise ValueError(f"Unsupported operation: {operation}. Expected one of {', '.join(COORDINATED_OPERATIONS)}")
+
+        job_id = f"dsbulk_{operation}_{uuid.uuid4().hex[:12]}"
+        job_dir = os.path.join(self.checkpoint_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+
+        if operation == "load":
+            if not csv_path:
+                raise ValueError("CSV path is required for load operations")
+            sub_jobs = self._plan_load(job_dir, keyspace, table, csv_path, range_count, profile)
+        else:
+            if not partition_key:
+                raise ValueError("Partition key is required for token range operations")
+            if operation == "unload" and not output_path:
+                raise ValueError("Output path is required for unload operations")
+            sub_jobs = self._plan_ranges(operation, keyspace, table, partition_key, output_path, range_count, profile)
+
+        job = {
+            "job_id": job_id,
+            "operation": operation,
+            "keyspace": keyspace,
+            "table": table,
+            "partition_key": partition_key,
+            "output_path": output_path,
+            "csv_path": csv_path,
+            "profile": profile,
+            "max_parallel": max(1, max_parallel),
+            "max_retries": max(0, max_retries),
+            "backoff_seconds": backoff_seconds,
+            "status": "pending",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "run_started_at": None,
+            "active_seconds": 0.0,
+            "sub_jobs": sub_jobs
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save(job)
+        return self.get_job(job_id)
+
+    def _plan_ranges(self, operation: str, keyspace: str, table: str, partition_key: str,
+                     output_path: Optional[str], range_count: int, profile: Optional[str]) -> List[Dict[str, Any]]:
+        sub_jobs = []
+        for index, (start, end) in enumerate(split_token_ring(range_count)):
+            range_output_path = os.path.join(output_path, f"range-{index:04d}") if output_path else None
+            sub_jobs.append(self._new_sub_job(index, self.dsbulk_manager.generate_range_command(
+                operation=operation,
+                keyspace=keyspace,
+                table=table,
+                partition_key=partition_key,
+                start_token=start,
+                end_token=end,
+                output_path=range_output_path,
+                profile=profile
+            ), start_token=str(start), end_token=str(end), output_path=range_output_path))
+        return sub_jobs
+
+    def _plan_load(self, job_dir: str, keyspace: str, table: str, csv_path: str,
+                   part_count: int, profile: Optional[str]) -> List[Dict[str, Any]]:
+        if os.path.isfile(csv_path):
+            files = [csv_path]
+        else:
+            files = sorted(glob.glob(os.path.join(csv_path, "**", "*.csv"), recursive=True))
+        if not files:
+            raise ValueError(f"No CSV files found under {csv_path}")
+
+        # Deal files round-robin into at most part_count parts, each listed in a urlfile
+        part_count = max(1, min(part_count, len(files)))
+        parts = [files[i::part_count] for i in range(part_count)]
+
+        sub_jobs = []
+        for index, part_files in enumerate(parts):
+            urlfile = os.path.join(job_dir, f"part-{index:04d}.txt")
+            with open(urlfile, 'w') as f:
+                f.write("\n".join(os.path.abspath(path) for path in part_files) + "\n")
+            sub_jobs.append(self._new_sub_job(index, self.dsbulk_manager.generate_load_urlfile_command(
+                keyspace=keyspace,
+                table=table,
+                urlfile=urlfile,
+                profile=profile
+            ), files=len(part_files)))
+        return sub_jobs
+
+    def _new_sub_job(self, index: int, command: str, **fields) -> Dict[str, Any]:
+        sub_job = {
+            "index": index,
+            "status": "pending",
+            "attempts": 0,
+            "rows": None,
+            "rows_per_second": None,
+            "duration_seconds": None,
+            "error": None,
+            "command": command
+        }
+        sub_job.update(fields)
+        return sub_job
+
+    def start(self, job_id: str) -> Dict[str, Any]:
+        """Run (or resume) a job in a background thread"""
+        with self._lock:
+            job = self._load(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            thread = self._threads.get(job_id)
+            if thread is not None and thread.is_alive():
+                raise ValueError(f"Job {job_id} is already running")
+
+            # Sub-jobs caught mid-run by an interruption start over
+            for sub_job in job["sub_jobs"]:
+                if sub_job["status"] in ("running", "failed"):
+                    sub_job["status"] = "pending"
+                    sub_job["attempts"] = 0
+            job["status"] = "running"
+            job["started_at"] = job["started_at"] or time.time()
+            job["finished_at"] = None
+            job["run_started_at"] = time.time()
+            self._cancelled.discard(job_id)
+            self._save(job)
+
+            thread = threading.Thread(target=self._run, args=(job_id,))
+            thread.daemon = True
+            self._threads[job_id] = thread
+            thread.start()
+
+        return self.get_job(job_id)
+
+    def resume(self, job_id: str) -> Dict[str, Any]:
+        """Resume an interrupted, failed or cancelled job from its checkpoint"""
+        return self.start(job_id)
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """
+        Stop scheduling new sub-jobs; running sub-jobs finish first.
+
+        A job that is not running is marked cancelled right away. Completed
+        jobs cannot be cancelled.
+        """
+        with self._lock:
+            job = self._load(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job["status"] == "completed":
+                raise ValueError(f"Job {job_id} has already completed")
+            self._cancelled.add(job_id)
+
+            thread = self._threads.get(job_id)
+            if (thread is None or not thread.is_alive()) and job["status"] != "cancelled":
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+                self._save(job)
+        return self.get_job(job_id)
+
+    def _run(self, job_id: str):
+        with self._lock:
+            job = self._load(job_id)
+            pending = [sub_job["index"] for sub_job in job["sub_jobs"] if sub_job["status"] != "completed"]
+            max_parallel = job["max_parallel"]
+
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            list(executor.map(lambda index: self._run_sub_job(job_id, index), pending))
+
+        with self._lock:
+            job = self._jobs[job_id]
+            statuses = {sub_job["status"] for sub_job in job["sub_jobs"]}
+            if statuses == {"completed"}:
+                job["status"] = "completed"
+            elif job_id in self._cancelled:
+                job["status"] = "cancelled"
+            else:
+                job["status"] = "failed"
+            job["finished_at"] = time.time()
+            job["active_seconds"] = round(job["active_seconds"] + job["finished_at"] - job["run_started_at"], 3)
+            job["run_started_at"] = None
+            self._save(job)
+
+    def _run_sub_job(self, job_id: str, index: int):
+        with self._lock:
+            job = self._jobs[job_id]
+            sub_job = job["sub_jobs"][index]
+            max_attempts = job["max_retries"] + 1
+            backoff_seconds = job["backoff_seconds"]
+
+        while sub_job["attempts"] < max_attempts:
+            if job_id in self._cancelled:
+                return
+
+            with self._lock:
+                sub_job["status"] = "running"
+                sub_job["attempts"] += 1
+                self._save(job)
+
+            # A partial unload from an earlier attempt would be duplicated
+            if sub_job.get("output_path"):
+                shutil.rmtree(sub_job["output_path"], ignore_errors=True)
+
+            start_time = time.time()
+            result = self.dsbulk_manager.execute_command(sub_job["command"])
+            summary = result.get("summary") or {}
+
+            with self._lock:
+                sub_job["duration_seconds"] = round(time.time() - start_time, 3)
+                if result["success"]:
+                    sub_job["status"] = "completed"
+                    sub_job["error"] = None
+                    sub_job["rows"] = summary.get("count", summary.get("total_rows"))
+                    sub_job["rows_per_second"] = summary.get("rows_per_second")
+                    sub_job["summary"] = summary
+                    self._save(job)
+                    return
+                sub_job["status"] = "failed"
+                sub_job["error"] = result.get("stderr") or result.get("error")
+                self._save(job)
+
+            if sub_job["attempts"] < max_attempts:
+                time.sleep(min(MAX_BACKOFF_SECONDS, backoff_seconds * 2 ** (sub_job["attempts"] - 1)))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job with its aggregate progress and throughput"""
+        with self._lock:
+            job = self._load(job_id)
+            if job is None:
+                return None
+            job = json.loads(json.dumps(job))
+
+        sub_jobs = job["sub_jobs"]
+        completed = [sub_job for sub_job in sub_jobs if sub_job["status"] == "completed"]
+        rows = sum(sub_job["rows"] or 0 for sub_job in completed)
+
+        # Wall-clock time across all runs of the job, including the current one
+        active_seconds = job["active_seconds"]
+        if job["status"] == "running" and job["run_started_at"]:
+            active_seconds += time.time() - job["run_started_at"]
+
+        job["progress"] = {
+            "total": len(sub_jobs),
+            "completed": len(completed),
+            "running": sum(1 for sub_job in sub_jobs if sub_job["status"] == "running"),
+            "failed": sum(1 for sub_job in sub_jobs if sub_job["status"] == "failed"),
+            "pending": sum(1 for sub_job in sub_jobs if sub_job["status"] == "pending"),
+            "percent": round(100.0 * len(completed) / len(sub_jobs), 1) if sub_jobs else 100.0
+        }
+        job["throughput"] = {
+            "rows": rows,
+            "active_seconds": round(active_seconds, 3),
+            "rows_per_second": round(rows / active_seconds, 1) if active_seconds > 0 else None,
+            "sum_of_sub_job_rows_per_second": sum(sub_job["rows_per_second"] or 0 for sub_job in completed)
+        }
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List known jobs (from memory and checkpoints), most recent first"""
+        job_ids = set(self._jobs)
+        if os.path.isdir(self.checkpoint_dir):
+            job_ids.update(
+                name for name in os.listdir(self.checkpoint_dir)
+                if os.path.exists(self._checkpoint_path(name))
+            )
+        jobs = [job for job in (self.get_job(job_id) for job_id in job_ids) if job]
+        for job in jobs:
+            del job["sub_jobs"]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def _checkpoint_path(self, job_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, job_id, "checkpoint.json")
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # Called with the lock held
+        if job_id in self._jobs:
+            return self._jobs[job_id]
+        try:
+            with open(self._checkpoint_path(job_id), 'r') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # A job checkpointed as running was interrupted by a restart
+        if job["status"] == "running":
+            job["status"] = "interrupted"
+        self._jobs[job_id] = job
+        return job
+
+    def _save(self, job: Dict[str, Any]):
+        # Called with the lock held
+        checkpoint_path = self._checkpoint_path(job["job_id"])
+        temp_path = checkpoint_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(job, f, indent=2)
+        os.replace(temp_path, checkpoint_path)
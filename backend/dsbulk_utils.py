@@ -1,7 +1,173 @@
 # backend/dsbulk_utils.py
+import csv
+import glob
+import math
 import os
+import re
 import subprocess
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+
+import metrics
+
+# Token bounds of the Murmur3Partitioner ring
+MIN_TOKEN = -2**63
+MAX_TOKEN = 2**63 - 1
+
+# Extra keys unloaded per token range so sparse ranges can be compensated
+RANGE_OVERSAMPLE_FACTOR = 1.5
+
+# Named throughput tuning profiles; "default" leaves every DSBulk setting alone
+TUNING_PROFILES = {
+    "default": {},
+    "conservative": {
+        "max_concurrent_queries": 8,
+        "max_per_second": 5000,
+        "batch_mode": "DISABLED",
+        "max_concurrent_files": 1,
+        "pool_local_size": 1,
+        "pool_remote_size": 1
+    },
+    "balanced": {
+        "max_concurrent_queries": 32,
+        "batch_mode": "PARTITION_KEY",
+        "max_batch_statements": 32,
+        "max_concurrent_files": "AUTO",
+        "pool_local_size": 2,
+        "pool_remote_size": 1
+    },
+    "throughput": {
+        "max_concurrent_queries": 128,
+        "max_per_second": -1,
+        "batch_mode": "REPLICA_SET",
+        "max_batch_statements": 64,
+        "max_concurrent_files": "2C",
+        "pool_local_size": 4,
+        "pool_remote_size": 2
+    }
+}
+
+# DSBulk setting behind each profile field and the operations it applies to
+TUNING_SETTINGS = {
+    "max_concurrent_queries": ("--engine.maxConcurrentQueries", ("load", "unload", "count")),
+    "max_per_second": ("--executor.maxPerSecond", ("load", "unload", "count")),
+    "batch_mode": ("--batch.mode", ("load",)),
+    "max_batch_statements": ("--batch.maxBatchStatements", ("load",)),
+    "max_concurrent_files": ("--connector.csv.maxConcurrentFiles", ("load", "unload")),
+    "pool_local_size": ("--datastax-java-driver.advanced.connection.pool.local.size", ("load", "unload", "count")),
+    "pool_remote_size": ("--datastax-java-driver.advanced.connection.pool.remote.size", ("load", "unload", "count"))
+}
+
+# Columns of the summary table DSBulk prints at the end of an operation
+_SUMMARY_COLUMNS = {
+    "total": "total_rows",
+    "failed": "failed_rows",
+    "rows/s": "rows_per_second",
+    "p50ms": "p50_ms",
+    "p99ms": "p99_ms",
+    "p999ms": "p999_ms",
+    "batches": "avg_batch_size"
+}
+
+_OPERATION_RESULT_PATTERN = re.compile(
+    r"Operation (?P<operation_id>[A-Z]+_[\w-]+) "
+    r"(?P<result>completed successfully|completed with (?P<errors>\d+) errors?|failed|interrupted|aborted)"
+    r"(?:.* in (?P<duration>\d[\w ,]*?)\.?\s*$)?"
+)
+_OPERATION_DIRECTORY_PATTERN = re.compile(r"Operation directory: (?P<directory>\S+)")
+_DURATION_PATTERN = re.compile(r"(\d+)\s*(hour|minute|second|millisecond)s?")
+_DURATION_UNITS = {"hour": 3600, "minute": 60, "second": 1, "millisecond": 0.001}
+
+def get_tuning_profile(profile: Optional[str]) -> Dict[str, Any]:
+    """Return the settings of a named tuning profile; empty means default"""
+    name = profile or "default"
+    if name not in TUNING_PROFILES:
+        raise ValueError(f"Unknown tuning profile: {name}. Expected one of {', '.join(TUNING_PROFILES)}")
+    return TUNING_PROFILES[name]
+
+def tuning_options(profile: Optional[str], operation: str) -> List[str]:
+    """Command line options a tuning profile adds to an operation"""
+    settings = get_tuning_profile(profile)
+    return [
+        f"{flag} {settings[name]}"
+        for name, (flag, operations) in TUNING_SETTINGS.items()
+        if name in settings and operation in operations
+    ]
+
+def _parse_number(value: str) -> Optional[float]:
+    try:
+        number = float(value.replace(',', ''))
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
+
+def _parse_duration(duration: str) -> float:
+    return round(sum(int(amount) * _DURATION_UNITS[unit] for amount, unit in _DURATION_PATTERN.findall(duration)), 3)
+
+def parse_operation_summary(output: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract DSBulk's final operation summary from its console output.
+    
+    Reads the last row of the "total | failed | rows/s | ..." table (progress
+    updates overwrite it in place), the closing "Operation ... completed"
+    line and, for counts, the count printed after the table. Returns None
+    when the output holds no summary.
+    """
+    lines = [line.strip() for line in re.split(r'[\r\n]+', output or '')]
+    summary = {}
+    columns = None
+    table_end = None
+    
+    for index, line in enumerate(lines):
+        if '|' in line:
+            cells = [cell.strip() for cell in line.split('|')]
+            if cells[0] == "total":
+                columns = cells
+            elif columns and len(cells) == len(columns):
+                values = [_parse_number(cell) for cell in cells]
+                if all(value is not None for value in values):
+                    for column, value in zip(columns, values):
+                        summary[_SUMMARY_COLUMNS.get(column, column)] = value
+                    table_end = index
+            continue
+        
+        directory_match = _OPERATION_DIRECTORY_PATTERN.search(line)
+        if directory_match:
+            summary["operation_directory"] = directory_match.group("directory")
+            continue
+        
+        result_match = _OPERATION_RESULT_PATTERN.search(line)
+        if result_match:
+            operation_id = result_match.group("operation_id")
+            result = result_match.group("result")
+            summary["operation_id"] = operation_id
+            summary["operation"] = operation_id.split('_', 1)[0].lower()
+            summary["status"] = "completed_with_errors" if result_match.group("errors") else result.split()[0]
+            summary["errors"] = int(result_match.group("errors") or 0)
+            if result_match.group("duration"):
+                summary["duration_seconds"] = _parse_duration(result_match.group("duration"))
+    
+    if not summary:
+        return None
+    
+    # dsbulk count prints the result on its own after the summary table
+    if table_end is not None and summary.get("operation") == "count":
+        for line in lines[table_end + 1:]:
+            if line.isdigit():
+                summary["count"] = int(line)
+                break
+    
+    return summary
+
+def split_token_ring(range_count: int) -> List[Tuple[int, int]]:
+    """Split the token ring into contiguous (start exclusive, end inclusive) ranges"""
+    if range_count < 1:
+        raise ValueError("range_count must be at least 1")
+    
+    ring_size = MAX_TOKEN - MIN_TOKEN
+    bounds = [MIN_TOKEN + (ring_size * i) // range_count for i in range(range_count)] + [MAX_TOKEN]
+    return [(bounds[i], bounds[i + 1]) for i in range(range_count)]
 
 class DSBulkManager:
     def __init__(self, dsbulk_path: str = None):
@@ -12,21 +178,81 @@ class DSBulkManager:
         """Validate that the DSBulk JAR file exists"""
         return os.path.exists(self.dsbulk_path)
     
+    def _executable(self) -> str:
+        """Command prefix running DSBulk; paths that are not JARs are run directly"""
+        if self.dsbulk_path.endswith('.jar'):
+            return f'java -jar {self.dsbulk_path}'
+        return self.dsbulk_path
+    
+    def generate_range_command(self,
+                             operation: str,
+                             keyspace: str,
+                             table: str,
+                             partition_key: str,
+                             start_token: int,
+                             end_token: int,
+                             output_path: Optional[str] = None,
+                             profile: Optional[str] = None) -> str:
+        """
+        Generate an unload or count command restricted to one token range.
+        
+        partition_key is the comma-separated partition key; the range is
+        (start_token, end_token].
+        """
+        if operation not in ("unload", "count"):
+            raise ValueError(f"Token ranges apply to unload and count, not {operation}")
+        
+        keyspace = self._sanitize_input(keyspace)
+        table = self._sanitize_input(table)
+        key_columns = [self._sanitize_input(col.strip()) for col in partition_key.split(',') if col.strip()]
+        if not key_columns:
+            raise ValueError("At least one partition key column is required")
+        
+        quoted_columns = ', '.join(f'\\"{col}\\"' for col in key_columns)
+        selected = '*' if operation == "unload" else quoted_columns
+        query = (f'SELECT {selected} FROM {keyspace}.{table} '
+                 f'WHERE token({quoted_columns}) > {start_token} AND token({quoted_columns}) <= {end_token};')
+        
+        command = f'{self._executable()} {operation} \\\n'
+        command += f'  -query "{query}"'
+        if operation == "unload":
+            command += f' \\\n  -url {output_path}'
+        
+        return self._with_tuning(command, profile, operation)
+    
+    def generate_load_urlfile_command(self,
+                                    keyspace: str,
+                                    table: str,
+                                    urlfile: str,
+                                    profile: Optional[str] = None) -> str:
+        """Generate a load command reading the CSV files listed in urlfile"""
+        keyspace = self._sanitize_input(keyspace)
+        table = self._sanitize_input(table)
+        
+        command = f'{self._executable()} load \\\n'
+        command += f'  -k {keyspace} -t {table} \\\n'
+        command += f'  --connector.csv.urlfile {urlfile}'
+        
+        return self._with_tuning(command, profile, "load")
+    
     def generate_unload_command(self, 
                               keyspace: str, 
                               table: str, 
                               primary_key: str,
                               output_path: str,
-                              limit: int = 1000000) -> str:
+                              limit: int = 1000000,
+                              profile: Optional[str] = None) -> str:
         """Generate a DSBulk unload command string for export"""
         
         # Sanitize inputs to prevent command injection
         keyspace = self._sanitize_input(keyspace)
         table = self._sanitize_input(table)
-        primary_key = self._sanitize_input(primary_key)
+        key_columns = [self._sanitize_input(col.strip()) for col in primary_key.split(',') if col.strip()]
         
-        # Build the query with proper quoting
-        query = f'SELECT "{primary_key}" FROM {keyspace}.{table}'
+        # primary_key may list several key columns; quotes are escaped because
+        # the query is itself double-quoted on the command line
+        quoted_columns = ', '.join(f'\\"{col}\\"' for col in key_columns)
+        query = f'SELECT {quoted_columns} FROM {keyspace}.{table}'
         
         if limit and limit > 0:
             query += f" LIMIT {limit};"
@@ -34,16 +260,231 @@ class DSBulkManager:
             query += ";"
             
         # Build the command
-        command = f'java -jar {self.dsbulk_path} unload \\\n'
+        command = f'{self._executable()} unload \\\n'
         command += f'  -query "{query}" \\\n'
         command += f'  -url {output_path}'
         
-        return command
+        return self._with_tuning(command, profile, "unload")
+    
+    def generate_token_range_unload_commands(self,
+                                           keyspace: str,
+                                           table: str,
+                                           primary_key: str,
+                                           output_path: str,
+                                           limit: int = 1000000,
+                                           range_count: int = 16,
+                                           profile: Optional[str] = None) -> List[Dict]:
+        """
+        Generate one bounded DSBulk unload per token range.
+        
+        primary_key is the comma-separated partition key. Each range unloads
+        its share of the limit (plus some headroom) into its own directory
+        under output_path, so the merged sample covers the whole ring.
+        """
+        keyspace = self._sanitize_input(keyspace)
+        table = self._sanitize_input(table)
+        key_columns = [self._sanitize_input(col.strip()) for col in primary_key.split(',') if col.strip()]
+        if not key_columns:
+            raise ValueError("At least one partition key column is required")
+        
+        # Quotes are escaped because the query is itself double-quoted on the command line
+        quoted_columns = ', '.join(f'\\"{col}\\"' for col in key_columns)
+        per_range_limit = math.ceil(limit / range_count * RANGE_OVERSAMPLE_FACTOR) if limit and limit > 0 else 0
+        
+        commands = []
+        for range_index, (start, end) in enumerate(split_token_ring(range_count)):
+            query = (f'SELECT {quoted_columns} FROM {keyspace}.{table} '
+                     f'WHERE token({quoted_columns}) > {start} AND token({quoted_columns}) <= {end}')
+            if per_range_limit:
+                query += f" LIMIT {per_range_limit};"
+            else:
+                query += ";"
+            
+            range_output_path = os.path.join(output_path, f"range-{range_index:04d}")
+            
+            command = f'{self._executable()} unload \\\n'
+            command += f'  -query "{query}" \\\n'
+            command += f'  -url {range_output_path}'
+            command = self._with_tuning(command, profile, "unload")
+            
+            commands.append({
+                "range_index": range_index,
+                "start_token": str(start),
+                "end_token": str(end),
+                "output_path": range_output_path,
+                "command": command
+            })
+        
+        return commands
+    
+    def execute_limit_unload(self,
+                           keyspace: str,
+                           table: str,
+                           primary_key: str,
+                           output_path: str,
+                           limit: int = 1000000,
+                           profile: Optional[str] = None) -> Dict:
+        """
+        Run a single LIMITed unload and collect it into output_path/sample.csv.
+        """
+        unload_path = os.path.join(output_path, "unload")
+        command = self.generate_unload_command(
+            keyspace=keyspace,
+            table=table,
+            primary_key=primary_key,
+            output_path=unload_path,
+            limit=limit,
+            profile=profile
+        )
+        
+        result = self.execute_command(command)
+        if not result["success"]:
+            return {
+                "success": False,
+                "error": result.get("error", "Unload failed"),
+                "results": [result]
+            }
+        
+        sample_path = os.path.join(output_path, "sample.csv")
+        merge_stats = self.merge_range_samples([unload_path], sample_path, limit)
+        
+        return {
+            "success": True,
+            "sample_path": sample_path,
+            "summary": result["summary"],
+            **merge_stats
+        }
+    
+    def execute_token_range_unload(self,
+                                 keyspace: str,
+                                 table: str,
+                                 primary_key: str,
+                                 output_path: str,
+                                 limit: int = 1000000,
+                                 range_count: int = 16,
+                                 max_parallel: int = 4,
+                                 profile: Optional[str] = None) -> Dict:
+        """
+        Run the per-range unloads in parallel and merge them into one sample.
+        
+        The merged CSV is written to output_path/sample.csv.
+        """
+        range_commands = self.generate_token_range_unload_commands(
+            keyspace=keyspace,
+            table=table,
+            primary_key=primary_key,
+            output_path=output_path,
+            limit=limit,
+            range_count=range_count,
+            profile=profile
+        )
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            results = list(executor.map(lambda rc: self.execute_command(rc["command"]), range_commands))
+        
+        failed_ranges = [rc["range_index"] for rc, result in zip(range_commands, results) if not result["success"]]
+        if failed_ranges:
+            return {
+                "success": False,
+                "error": f"Unload failed for token ranges {failed_ranges}",
+                "failed_ranges": failed_ranges,
+                "results": results
+            }
+        
+        sample_path = os.path.join(output_path, "sample.csv")
+        merge_stats = self.merge_range_samples(
+            [rc["output_path"] for rc in range_commands],
+            sample_path,
+            limit
+        )
+        
+        return {
+            "success": True,
+            "sample_path": sample_path,
+            "range_count": range_count,
+            "range_summaries": [result["summary"] for result in results],
+            **merge_stats
+        }
+    
+    def merge_range_samples(self, range_paths: List[str], merged_path: str, sample_size: int) -> Dict:
+        """
+        Merge per-range unload CSVs into one sample of at most sample_size rows.
+        
+        Rows are taken round-robin across ranges so every slice of the ring is
+        equally represented; ranges with fewer keys leave their share to the
+        others.
+        """
+        header = None
+        range_rows = []
+        for range_path in range_paths:
+            rows = []
+            for csv_file in sorted(glob.glob(os.path.join(range_path, "output-*.csv"))):
+                with open(csv_file, 'r', newline='') as f:
+                    reader = csv.reader(f)
+                    file_header = next(reader, None)
+                    if file_header is None:
+                        continue
+                    header = header or file_header
+                    rows.extend(row for row in reader if row)
+            range_rows.append(rows)
+        
+        os.makedirs(os.path.dirname(merged_path) or '.', exist_ok=True)
+        written = 0
+        per_range_counts = [len(rows) for rows in range_rows]
+        
+        with open(merged_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(header)
+            
+            position = 0
+            while (not sample_size or written < sample_size) and any(position < len(rows) for rows in range_rows):
+                for rows in range_rows:
+                    if position < len(rows):
+                        writer.writerow(rows[position])
+                        written += 1
+                        if sample_size and written >= sample_size:
+                            break
+                position += 1
+        
+        return {
+            "rows_written": written,
+            "rows_per_range": per_range_counts
+        }
+    
+    def generate_unload_script(self,
+                             keyspace: str,
+                             table: str,
+                             primary_key: str,
+                             output_path: str,
+                             limit: int = 1000000,
+                             profile: Optional[str] = None) -> str:
+        """Generate a shell script wrapping a DSBulk unload command"""
+        command = self.generate_unload_command(
+            keyspace=keyspace,
+            table=table,
+            primary_key=primary_key,
+            output_path=output_path,
+            limit=limit,
+            profile=profile
+        )
+        
+        script_content = "#!/bin/bash\n\n"
+        script_content += "# DSBulk unload script generated by NoSQLBench Schema Generator\n"
+        script_content += f"# Exports data from {keyspace}.{table}\n"
+        if profile and profile != "default":
+            script_content += f"# Tuning profile: {profile}\n"
+        script_content += "\n"
+        script_content += command
+        script_content += "\n\n# End of script\n"
+        
+        return script_content
     
     def generate_load_command(self,
                             keyspace: str,
                             table: str,
-                            csv_path: str) -> str:
+                            csv_path: str,
+                            profile: Optional[str] = None) -> str:
         """Generate a DSBulk load command string for import"""
         
         # Sanitize inputs to prevent command injection
@@ -51,15 +492,16 @@ class DSBulkManager:
         table = self._sanitize_input(table)
         
         # Build the command
-        command = f'java -jar {self.dsbulk_path} load \\\n'
+        command = f'{self._executable()} load \\\n'
         command += f'  -k {keyspace} -t {table} \\\n'
         command += f'  -url {csv_path}'
         
-        return command
+        return self._with_tuning(command, profile, "load")
     
     def generate_count_command(self,
                              keyspace: str,
-                             table: str) -> str:
+                             table: str,
+                             profile: Optional[str] = None) -> str:
         """Generate a DSBulk count command string"""
         
         # Sanitize inputs to prevent command injection
@@ -67,9 +509,15 @@ class DSBulkManager:
         table = self._sanitize_input(table)
         
         # Build the command
-        command = f'java -jar {self.dsbulk_path} count \\\n'
+        command = f'{self._executable()} count \\\n'
         command += f'  -k {keyspace} -t {table}'
         
+        return self._with_tuning(command, profile, "count")
+    
+    def _with_tuning(self, command: str, profile: Optional[str], operation: str) -> str:
+        """Append a tuning profile's options to a generated command"""
+        for option in tuning_options(profile, operation):
+            command += f' \\\n  {option}'
         return command
     
     def _sanitize_input(self, input_str: str) -> str:
@@ -79,21 +527,33 @@ class DSBulkManager:
     
     def execute_command(self, command: str) -> Dict:
         """Execute a DSBulk command and return results"""
+        start_time = time.perf_counter()
+        outcome = "error"
+        metrics.DSBULK_ACTIVE_COMMANDS.inc()
         try:
             # Execute the command and capture output
             result = subprocess.run(command, shell=True, check=True, 
                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                                    text=True)
             
+            outcome = "success"
             return {
                 "success": True,
                 "stdout": result.stdout,
-                "stderr": result.stderr
+                "stderr": result.stderr,
+                "summary": parse_operation_summary(f"{result.stdout}\n{result.stderr}")
             }
         except subprocess.CalledProcessError as e:
+            outcome = "failed"
+            stdout = e.stdout if hasattr(e, 'stdout') else ""
+            stderr = e.stderr if hasattr(e, 'stderr') else ""
             return {
                 "success": False,
                 "error": str(e),
-                "stdout": e.stdout if hasattr(e, 'stdout') else "",
-                "stderr": e.stderr if hasattr(e, 'stderr') else ""
-            }
\ No newline at end of file
+                "stdout": stdout,
+                "stderr": stderr,
+                "summary": parse_operation_summary(f"{stdout or ''}\n{stderr or ''}")
+            }
+        finally:
+            metrics.DSBULK_ACTIVE_COMMANDS.dec()
+            metrics.DSBULK_COMMAND_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start_time)
\ No newline at end of file
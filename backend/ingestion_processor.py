@@ -0,0 +1,285 @@
+# backend/ingestion_processor.py
+import json
+import os
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Any, Iterator
+
+import metrics
+from read_yaml_generator import generate_read_yaml_from_text
+
+# Limits applied to uploaded ingestion bundles
+MAX_BUNDLE_MEMBERS = 20000
+MAX_MEMBER_SIZE = 16 * 1024 * 1024
+MAX_TOTAL_UNCOMPRESSED_SIZE = 1024 * 1024 * 1024
+MAX_COMPRESSION_RATIO = 100
+
+# Chunk size used when spooling uploads and decompressing members
+READ_CHUNK_SIZE = 64 * 1024
+
+# Number of worker processes converting YAML files
+CONVERSION_WORKERS = os.cpu_count() or 1
+
+# Members decompressed ahead of the workers; bounds memory use
+MAX_PENDING_CONVERSIONS = CONVERSION_WORKERS * 4
+
+_conversion_pool = None
+
+
+class BundleLimitError(ValueError):
+    """Raised when an uploaded bundle exceeds the configured safety limits"""
+
+
+def get_conversion_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool used for YAML conversions"""
+    global _conversion_pool
+    if _conversion_pool is None:
+        _conversion_pool = ProcessPoolExecutor(max_workers=CONVERSION_WORKERS)
+    return _conversion_pool
+
+
+def shutdown_conversion_pool():
+    """Shut down the shared process pool, if it was started"""
+    global _conversion_pool
+    if _conversion_pool is not None:
+        _conversion_pool.shutdown(cancel_futures=True)
+        _conversion_pool = None
+
+
+def read_filename_for(source_name: str) -> str:
+    """Name of the read YAML generated from an ingestion YAML file"""
+    base_name = os.path.splitext(os.path.basename(source_name))[0]
+    return f"{base_name}_read.yaml"
+
+
+def failed_record(source_name: str, error: str) -> Dict[str, Any]:
+    """Result record for a file that could not be handed to a converter"""
+    return {
+        "source": source_name,
+        "filename": read_filename_for(source_name),
+        "success": False,
+        "content": None,
+        "error": error,
+        "conversion_ms": 0.0
+    }
+
+
+def convert_ingestion_yaml(source_name: str, ingestion_yaml: str, csv_path: Optional[str] = None,
+                           skew_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convert one ingestion YAML into a read YAML.
+
+    Runs in a worker process and never raises; failures are reported in the
+    returned record.
+    """
+    start_time = time.perf_counter()
+    try:
+        read_yaml = generate_read_yaml_from_text(ingestion_yaml, csv_path, skew_profile=skew_profile)
+        return {
+            "source": source_name,
+            "filename": read_filename_for(source_name),
+            "success": True,
+            "content": read_yaml,
+            "error": None,
+            "conversion_ms": round((time.perf_counter() - start_time) * 1000, 3)
+        }
+    except Exception as e:
+        return {
+            "source": source_name,
+            "filename": read_filename_for(source_name),
+            "success": False,
+            "content": None,
+            "error": str(e),
+            "conversion_ms": round((time.perf_counter() - start_time) * 1000, 3)
+        }
+
+
+def validate_bundle(input_zip: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """
+    Check a bundle's central directory against the safety limits.
+
+    Returns the YAML members to convert.
+    """
+    yaml_members = [
+        info for info in input_zip.infolist()
+        if not info.is_dir() and info.filename.endswith(('.yaml', '.yml'))
+    ]
+
+    if len(yaml_members) > MAX_BUNDLE_MEMBERS:
+        raise BundleLimitError(f"Bundle contains {len(yaml_members)} YAML files; the limit is {MAX_BUNDLE_MEMBERS}")
+
+    total_size = 0
+    for info in yaml_members:
+        if info.file_size > MAX_MEMBER_SIZE:
+            raise BundleLimitError(f"{info.filename} is {info.file_size} bytes uncompressed; the limit is {MAX_MEMBER_SIZE}")
+        if info.compress_size and info.file_size / info.compress_size > MAX_COMPRESSION_RATIO:
+            raise BundleLimitError(f"{info.filename} has a suspicious compression ratio")
+        total_size += info.file_size
+
+    if total_size > MAX_TOTAL_UNCOMPRESSED_SIZE:
+        raise BundleLimitError(f"Bundle is {total_size} bytes uncompressed; the limit is {MAX_TOTAL_UNCOMPRESSED_SIZE}")
+
+    return yaml_members
+
+
+def read_member(input_zip: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    """
+    Decompress a single member in chunks.
+
+    The declared size in the central directory is not trusted: reading stops
+    as soon as more data than declared (or allowed) comes out.
+    """
+    limit = min(info.file_size, MAX_MEMBER_SIZE)
+    chunks = []
+    size = 0
+    with input_zip.open(info, 'r') as member:
+        while True:
+            chunk = member.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                raise BundleLimitError(f"{info.filename} decompresses to more than its declared size")
+            chunks.append(chunk)
+    return b"".join(chunks).decode('utf-8')
+
+
+def convert_bundle(zip_path: str, csv_path: Optional[str] = None,
+                   skew_profile: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Convert every YAML member of a zip bundle stored on disk.
+
+    Members are decompressed one at a time and handed to the conversion
+    pool; at most MAX_PENDING_CONVERSIONS members are held in memory. Result
+    records are yielded in completion order.
+    """
+    pool = get_conversion_pool()
+
+    with zipfile.ZipFile(zip_path, 'r') as input_zip:
+        yaml_members = validate_bundle(input_zip)
+        if not yaml_members:
+            raise BundleLimitError("No YAML files found in the zip file")
+
+        pending = set()
+        for info in yaml_members:
+            if len(pending) >= MAX_PENDING_CONVERSIONS:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+            # Errors found while decompressing may come after the response has started,
+            # so they are reported per member rather than raised
+            try:
+                ingestion_yaml = read_member(input_zip, info)
+            except UnicodeDecodeError as e:
+                yield failed_record(info.filename, f"File is not valid UTF-8: {str(e)}")
+                continue
+            except BundleLimitError as e:
+                yield failed_record(info.filename, str(e))
+                continue
+            except (zipfile.BadZipFile, zlib.error) as e:
+                yield failed_record(info.filename, f"File cannot be decompressed: {str(e)}")
+                continue
+
+            pending.add(pool.submit(convert_ingestion_yaml, info.filename, ingestion_yaml, csv_path, skew_profile))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def stream_ndjson(results: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode result records as newline-delimited JSON, followed by a summary line"""
+    processed = 0
+    failed = 0
+    for result in results:
+        processed += 1
+        if not result["success"]:
+            failed += 1
+        yield (json.dumps(result) + "\n").encode('utf-8')
+
+    yield (json.dumps({
+        "summary": True,
+        "message": f"Successfully processed {processed - failed} files",
+        "processed": processed,
+        "failed": failed
+    }) + "\n").encode('utf-8')
+
+
+class _ZipStreamBuffer:
+    """Write-only file object collecting the bytes zipfile produces"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(results: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode result records as a ZIP archive produced incrementally.
+
+    Converted files keep their directory inside the bundle; a _results.json
+    member lists every record without its content.
+    """
+    buffer = _ZipStreamBuffer()
+    records = []
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as output_zip:
+        for result in results:
+            if result["success"]:
+                arcname = os.path.join(os.path.dirname(result["source"]), result["filename"])
+                output_zip.writestr(arcname, result["content"])
+            records.append({key: value for key, value in result.items() if key != "content"})
+            data = buffer.drain()
+            if data:
+                yield data
+
+        output_zip.writestr("_results.json", json.dumps(records, indent=2))
+
+    yield buffer.drain()
+
+
+def spooled_results(zip_path: str, csv_path: Optional[str] = None,
+                    skew_profile: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Convert a spooled bundle and remove it from disk once done"""
+    try:
+        for record in convert_bundle(zip_path, csv_path, skew_profile):
+            metrics.observe_conversion(record)
+            yield record
+    finally:
+        try:
+            os.unlink(zip_path)
+        except OSError:
+            pass
+
+
+def prime_results(results: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Pull the first record so bundle errors surface before a response starts.
+
+    Returns an iterator over all records, including the first one.
+    """
+    try:
+        first = next(results)
+    except StopIteration:
+        return iter(())
+
+    def chained():
+        yield first
+        yield from results
+
+    return chained()
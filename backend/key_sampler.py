@@ -0,0 +1,173 @@
+# backend/key_sampler.py
+import csv
+import glob
+import os
+import tempfile
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+from skew_profiles import is_skewed, sampler_weight, weight_column
+
+WEIGHT_MODES = ("uniform", "zipfian", "frequency")
+
+# Keys are deduplicated per hash bucket; each bucket is sized so that its
+# distinct keys comfortably fit in memory
+TARGET_BUCKET_BYTES = 64 * 1024 * 1024
+MIN_BUCKET_COUNT = 16
+MAX_BUCKET_COUNT = 512
+
+
+def find_unload_files(unload_path: str) -> List[str]:
+    """Return the CSV files of a DSBulk unload (a directory tree or a single file)"""
+    if os.path.isfile(unload_path):
+        return [unload_path]
+    files = glob.glob(os.path.join(unload_path, "**", "output-*.csv"), recursive=True)
+    if not files:
+        raise ValueError(f"No DSBulk output-*.csv files found under {unload_path}")
+    return sorted(files)
+
+
+def iter_unload_keys(csv_files: List[str], key_columns: Optional[List[str]] = None) -> Iterator[Tuple[str, ...]]:
+    """
+    Stream key tuples from DSBulk unload files one row at a time.
+
+    Every file starts with a header row. All of its columns form the key
+    unless key_columns names a subset of them.
+    """
+    for csv_file in csv_files:
+        with open(csv_file, 'r', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                continue
+            column_indexes = list(range(len(header)))
+            if key_columns:
+                missing = [column for column in key_columns if column not in header]
+                if missing:
+                    raise ValueError(f"Column(s) {', '.join(missing)} not found in {csv_file}")
+                column_indexes = [header.index(column) for column in key_columns]
+            last_index = max(column_indexes)
+            for row in reader:
+                if len(row) > last_index:
+                    yield tuple(row[index] for index in column_indexes)
+
+
+def _bucket_count_for(csv_files: List[str]) -> int:
+    total_bytes = sum(os.path.getsize(csv_file) for csv_file in csv_files)
+    return max(MIN_BUCKET_COUNT, min(MAX_BUCKET_COUNT, total_bytes // TARGET_BUCKET_BYTES + 1))
+
+
+def _bucket_counts(bucket_path: str) -> Dict[Tuple[str, ...], int]:
+    counts = {}
+    with open(bucket_path, 'r', newline='') as bucket_file:
+        for row in csv.reader(bucket_file):
+            if row:
+                key = tuple(row)
+                counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def _key_weight(weight_mode: str, count: int, rank: int, zipf_exponent: float) -> str:
+    if weight_mode == "frequency":
+        return str(count)
+    if weight_mode == "zipfian":
+        return f"{1.0 / rank ** zipf_exponent:.6g}"
+    return "1"
+
+
+def build_sampler_csv(unload_path: str,
+                      output_path: str,
+                      key_columns: Optional[List[str]] = None,
+                      weight_mode: str = "uniform",
+                      zipf_exponent: float = 1.0,
+                      bucket_count: Optional[int] = None,
+                      skew_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a CSVSampler-ready file (<k1>,<k2>,...,<k1>-weight) from a DSBulk unload.
+
+    The key is every column of the unload, or the key_columns subset, so
+    composite keys keep all their columns; the weights are named after the
+    first one. Keys are streamed once into hash buckets on disk and each
+    bucket is then deduplicated on the full key on its own, so memory use is
+    bounded by the largest bucket rather than by the size of the unload.
+    Weights are:
+      - uniform: every distinct key has weight 1
+      - frequency: number of times the key appeared in the unload
+      - zipfian: 1/rank^exponent, ranks assigned in hash order
+    
+    A skew profile (see skew_profiles) overrides weight_mode and writes one
+    weight column per hot-set rotation phase.
+    """
+    if weight_mode not in WEIGHT_MODES:
+        raise ValueError(f"Unsupported weight mode: {weight_mode}. Expected one of {', '.join(WEIGHT_MODES)}")
+
+    start_time = time.perf_counter()
+    csv_files = find_unload_files(unload_path)
+    bucket_count = bucket_count or _bucket_count_for(csv_files)
+
+    # Key columns default to the first file's header; the first one labels the weights
+    with open(csv_files[0], 'r', newline='') as f:
+        header = next(csv.reader(f), None) or ["key"]
+    columns = list(key_columns) if key_columns else header
+    label = columns[0]
+
+    rows_read = 0
+    unique_keys = 0
+
+    with tempfile.TemporaryDirectory(prefix="sampler_buckets_") as bucket_dir:
+        bucket_paths = [os.path.join(bucket_dir, f"bucket-{i:04d}.csv") for i in range(bucket_count)]
+
+        # Pass 1: partition keys into buckets by a stable hash
+        bucket_files = [open(path, 'w', newline='') for path in bucket_paths]
+        try:
+            bucket_writers = [csv.writer(bucket_file) for bucket_file in bucket_files]
+            for key in iter_unload_keys(csv_files, key_columns):
+                bucket = zlib.crc32("\x1f".join(key).encode('utf-8')) % bucket_count
+                bucket_writers[bucket].writerow(key)
+                rows_read += 1
+        finally:
+            for bucket_file in bucket_files:
+                bucket_file.close()
+
+        # Skew profiles need the number of distinct keys up front
+        skewed = is_skewed(skew_profile)
+        key_count = 0
+        if skewed:
+            weight_mode = skew_profile["type"]
+            for bucket_path in bucket_paths:
+                key_count += len(_bucket_counts(bucket_path))
+        phases = range(skew_profile["rotations"]) if skewed else range(1)
+
+        # Pass 2: deduplicate each bucket and write the weighted keys
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'w', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(columns + [weight_column(label, phase) for phase in phases])
+
+            for bucket_path in bucket_paths:
+                for key, count in _bucket_counts(bucket_path).items():
+                    if skewed:
+                        weights = [f"{sampler_weight(skew_profile, unique_keys, key_count, phase):.6g}"
+                                   for phase in phases]
+                    else:
+                        weights = [_key_weight(weight_mode, count, unique_keys + 1, zipf_exponent)]
+                    unique_keys += 1
+                    writer.writerow(list(key) + weights)
+
+                os.unlink(bucket_path)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "output_path": output_path,
+        "label_column": label,
+        "key_columns": columns,
+        "weight_columns": [weight_column(label, phase) for phase in phases],
+        "weight_mode": weight_mode,
+        "files": len(csv_files),
+        "rows_read": rows_read,
+        "unique_keys": unique_keys,
+        "buckets": bucket_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_read / elapsed, 1) if elapsed > 0 else None
+    }
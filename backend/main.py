@@ -1,15 +1,52 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends, Query
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Request, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from typing import List, Dict, Any, Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse, FileResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import hmac
 import io
 import zipfile
 import json
 import os
+import re
+import threading
+import time
 from schema_parser import CQLParser
-from dsbulk_utils import DSBulkManager
+from dsbulk_utils import DSBulkManager, TUNING_PROFILES, TUNING_SETTINGS, get_tuning_profile
 import tempfile
-from nb5_executor import NB5Executor
+from nb5_executor import NB5Executor, parse_timer_summary
+from key_sampler import WEIGHT_MODES, build_sampler_csv
+from skew_profiles import parse_skew_profile_json
+from partition_model import parse_partition_json
+from read_patterns import parse_read_patterns_json
+from scenario_builder import build_mixed_scenario, normalize_scenario_spec, parse_scenario_json
+import query_capture
+from schema_advisor import advise_schema
+from sizing_planner import measured_write_rate, parse_sizing_json, plan_table_sizing, sizing_command_params
+from table_variants import build_variant_workloads, parse_variant_json, run_variant_comparison
+from row_sizing import parse_row_size_json
+from vector_search import DEFAULT_MAX_RECALL_QUERIES, check_recall, load_dataset, parse_vector_json, sample_queries
+from workload_linter import lint_workload, schema_covers_workload
+from sample_cache import DEFAULT_CLUSTER, KeySampleCache
+from dsbulk_coordinator import DSBulkRangeCoordinator
+import cdm_planner
+import metrics
+from profiling import DEFAULT_TOP, DEFAULT_TRACEMALLOC_FRAMES, ProfilingManager
+from read_yaml_generator import extract_table_info_from_ingest_yaml
+from ingestion_processor import (
+    BundleLimitError,
+    READ_CHUNK_SIZE,
+    convert_ingestion_yaml,
+    failed_record,
+    get_conversion_pool,
+    prime_results,
+    shutdown_conversion_pool,
+    spooled_results,
+    stream_ndjson,
+    stream_zip,
+)
 
 
 app = FastAPI(title="NoSQLBench Schema Generator")
@@ -32,9 +69,77 @@ dsbulk_manager = DSBulkManager()
 # Initialize the NB5 executor
 nb5_executor = NB5Executor()
 
+# Initialize the key sample cache
+sample_cache = KeySampleCache()
+
+# Initialize the coordinator for resumable DSBulk jobs
+dsbulk_coordinator = DSBulkRangeCoordinator(dsbulk_manager)
+
 # In-memory cache for the latest parsed schema
 SCHEMA_CACHE = {}
 
+# Initialize the on-demand profiler of the admin endpoints
+profiler = ProfilingManager()
+
+# Token the admin endpoints require in X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.environ.get("BENCHWAVE_ADMIN_TOKEN")
+
+# Store CDM migration plans by plan ID
+CDM_PLANS = {}
+
+# Store table option A/B comparisons by comparison ID
+VARIANT_COMPARISONS = {}
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every API request per route template; streamed bodies are timed to their first byte"""
+    start_time = time.perf_counter()
+    status = 500
+    metrics.HTTP_REQUESTS_IN_PROGRESS.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_REQUESTS_IN_PROGRESS.dec()
+        route = request.scope.get("route")
+        route_path = route.path if route else "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.labels(method=request.method, route=route_path,
+                                            status=str(status)).observe(time.perf_counter() - start_time)
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            metrics.HTTP_REQUEST_BYTES.labels(method=request.method, route=route_path).observe(int(content_length))
+
+def _route_template(request: Request) -> Optional[str]:
+    """Path template of the route a request will be handled by"""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+@app.middleware("http")
+async def profile_armed_routes(request: Request, call_next):
+    """Profile requests to routes armed through /api/admin/profile/route"""
+    if not profiler.has_armed():
+        return await call_next(request)
+    route_path = _route_template(request)
+    session = profiler.claim(route_path) if route_path else None
+    if session is None:
+        return await call_next(request)
+    with profiler.profiling(session):
+        return await call_next(request)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Backend metrics in the Prometheus text format"""
+    return Response(content=metrics.render(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """Stop the YAML conversion worker processes"""
+    shutdown_conversion_pool()
+
 @app.post("/api/parse-schema")
 async def parse_schema(schema_file: UploadFile = File(...)):
     """Parse a CQL schema file and return structured information"""
@@ -47,19 +152,88 @@ async def parse_schema(schema_file: UploadFile = File(...)):
     try:
         schema_info = parser.parse_cql(schema_text)
         
-        # Store the schema in cache for later use
+        # Store the schema in cache for later use; the CQL can be replayed by the profiler
         SCHEMA_CACHE['latest'] = schema_info
+        SCHEMA_CACHE['latest_cql'] = schema_text
         
         return JSONResponse(content=schema_info)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing schema: {str(e)}")
 
+@app.post("/api/schema/advise")
+async def advise_on_schema(
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema")
+):
+    """Flag likely performance problems per table and keyspace, each with a benchmark that can confirm it"""
+    schema_info = _schema_for_request(schema_json)
+    try:
+        return advise_schema(parser, schema_info)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analysing schema: {str(e)}")
+
+@app.post("/api/sizing/plan")
+async def plan_dataset_sizing(
+    sizing: str = Form(..., description="Dataset sizing as JSON, e.g. {\"target_size\": \"500GB\", \"scope\": \"node\", \"nodes\": 6}"),
+    table_selection: Optional[str] = Form(None, description="Tables as a JSON list; defaults to every table"),
+    row_size: Optional[str] = Form(None, description="Row-size options as JSON"),
+    rate_execution_id: Optional[str] = Form(None, description="NB5 execution whose rampup write rate to plan with"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema"),
+    host: str = Form("localhost", description="Cassandra host for the execute commands"),
+    datacenter: str = Form("datacenter1", description="Cassandra datacenter for the execute commands"),
+    keyspace: str = Form("baselines", description="Cassandra keyspace for the execute commands")
+):
+    """Rampup cycles and estimated duration per table for a target dataset size"""
+    schema_info = _schema_for_request(schema_json)
+    size_options = _parse_row_size(row_size)
+    sizing_options = _parse_sizing(sizing)
+    
+    if rate_execution_id:
+        try:
+            status = nb5_executor.get_execution_status(rate_execution_id)
+        except Exception as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        rate = measured_write_rate(parse_timer_summary(status["stdout"]))
+        if not rate:
+            raise HTTPException(status_code=400, detail=f"No rampup write rate in the summary of {rate_execution_id}")
+        sizing_options = _parse_sizing(json.dumps(dict(
+            sizing_options, write_rate=rate, rate_source=f"measured by {rate_execution_id}"
+        )))
+    
+    tables = json.loads(table_selection) if table_selection else list(schema_info["tables"])
+    plans = []
+    for table_name in tables:
+        full_name, table_info = parser.find_table(schema_info, table_name)
+        if not table_info:
+            raise HTTPException(status_code=400, detail=f"Table {table_name} not found in the schema")
+        try:
+            dataset = plan_table_sizing(schema_info, full_name, table_info, sizing_options, size_options)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        filename = f"{full_name.replace('.', '_')}.yaml"
+        plans.append(dict(dataset, table=full_name, filename=filename,
+                          command=nb5_executor.generate_execution_command(
+                              yaml_file=filename,
+                              host=host,
+                              datacenter=datacenter,
+                              keyspace=table_info["keyspace"] or keyspace,
+                              additional_params=sizing_command_params(dataset)
+                          )))
+    return {"tables": plans}
+
 @app.post("/api/generate-yaml")
 async def generate_yaml(
     schema_json: str = Form(...),
     table_selection: str = Form(...),
+    row_size: Optional[str] = Form(None, description="Row-size options as JSON, e.g. {\"target_row_bytes\": 4096, \"distribution\": \"uniform\"}"),
+    partitioning: Optional[str] = Form(None, description="Partition options as JSON, e.g. {\"rows_per_partition\": 100, \"distribution\": \"fixed\"}"),
+    vectors: Optional[str] = Form(None, description="Vector options as JSON, e.g. {\"distribution\": \"clustered\", \"clusters\": 100}"),
+    sizing: Optional[str] = Form(None, description="Dataset sizing as JSON, e.g. {\"target_size\": \"500GB\", \"nodes\": 6}"),
 ):
     """Generate NoSQLBench YAML files for selected tables"""
+    size_options = _parse_row_size(row_size)
+    partition_options = _parse_partitioning(partitioning)
+    vector_options = _parse_vectors(vectors)
+    sizing_options = _parse_sizing(sizing)
     try:
         schema_info = json.loads(schema_json)
         selected_tables = json.loads(table_selection)
@@ -73,17 +247,26 @@ async def generate_yaml(
         # Process the tables and return them in JSON format
         processed_files = []
         for table_name in selected_tables:
-            yaml_content = parser.generate_nosqlbench_yaml(schema_info, table_name)
+            # Clustered vector datasets are written on first use, off the event loop
+            yaml_content = await run_in_threadpool(parser.generate_nosqlbench_yaml, schema_info, table_name,
+                                                   size_options, partition_options, vector_options, sizing_options)
             
             # Clean the table name for the filename
             safe_name = table_name.replace('.', '_')
             filename = f"{safe_name}.yaml"
             
-            processed_files.append({
+            processed_file = {
                 "filename": filename,
                 "content": yaml_content,
                 "table_name": table_name
-            })
+            }
+            if sizing_options:
+                full_name, table_info = parser.find_table(schema_info, table_name)
+                if table_info:
+                    dataset = plan_table_sizing(schema_info, full_name, table_info, sizing_options, size_options)
+                    processed_file["sizing"] = dataset
+                    processed_file["params"] = sizing_command_params(dataset)
+            processed_files.append(processed_file)
         
         # Return a JSON response with all files
         return JSONResponse(content={
@@ -93,120 +276,236 @@ async def generate_yaml(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating YAML files: {str(e)}")
 
+def _parse_row_size(row_size: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a row-size options form field, rejecting invalid options"""
+    try:
+        return parse_row_size_json(row_size)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid row size options: {str(e)}")
+
+def _parse_partitioning(partitioning: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a partition options form field, rejecting invalid options"""
+    try:
+        return parse_partition_json(partitioning)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid partition options: {str(e)}")
+
+def _parse_vectors(vectors: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a vector options form field, rejecting invalid options"""
+    try:
+        return parse_vector_json(vectors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid vector options: {str(e)}")
+
+def _parse_sizing(sizing: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a dataset sizing options form field, rejecting invalid options"""
+    try:
+        return parse_sizing_json(sizing)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sizing options: {str(e)}")
+
+def _parse_read_patterns(read_patterns: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a read pattern options form field, rejecting invalid options"""
+    try:
+        return parse_read_patterns_json(read_patterns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid read patterns: {str(e)}")
+
+def _parse_skew_profile(skew_profile: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a skew profile form field, rejecting invalid profiles"""
+    try:
+        return parse_skew_profile_json(skew_profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid skew profile: {str(e)}")
+
+def _cached_sample_path(cluster: str, write_yaml: str, pk_columns: List[str]) -> Optional[str]:
+    """Path of a fresh cached sampler CSV for the table a write YAML targets, if any"""
+    try:
+        table_info = extract_table_info_from_ingest_yaml(write_yaml)
+    except ValueError:
+        return None
+    
+    entry = sample_cache.find(cluster, table_info["keyspace"], table_info["table_name"], pk_columns)
+    return entry["csv_path"] if entry else None
+
+async def _spool_upload_to_disk(upload: UploadFile, suffix: str) -> str:
+    """Copy an uploaded file to a temporary file in chunks and return its path"""
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = await upload.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    return temp_path
+
 @app.post("/api/process-ingestion-files")
-async def process_ingestion_files(ingestion_zip: UploadFile = File(...)):
+async def process_ingestion_files(
+    ingestion_zip: UploadFile = File(...),
+    output_format: str = Form("json", description="Response format: json (one document), or ndjson / zip to stream results as they complete"),
+    csv_path: Optional[str] = Form(None, description="Path to DSBulk CSV output used by all read YAMLs"),
+    skew_profile: Optional[str] = Form(None, description="Key skew profile as JSON, e.g. {\"type\": \"zipf\", \"exponent\": 1.1}")
+):
     """Process a zip file containing ingestion YAML files and generate read YAML files"""
     if not ingestion_zip.filename.endswith('.zip'):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a .zip file")
     
+    if output_format not in ("ndjson", "zip", "json"):
+        raise HTTPException(status_code=400, detail=f"Unsupported output format: {output_format}")
+    
+    profile = _parse_skew_profile(skew_profile)
+    
     try:
-        # Read the uploaded zip file
-        content = await ingestion_zip.read()
-        input_zip_buffer = io.BytesIO(content)
+        # Spool the upload to disk; members are decompressed one at a time from there
+        zip_path = await _spool_upload_to_disk(ingestion_zip, '.zip')
         
         try:
-            # Process the files and store them in memory
-            processed_files = []
-            
-            with zipfile.ZipFile(input_zip_buffer, 'r') as input_zip:
-                # Check for valid YAML files
-                yaml_files = [f for f in input_zip.namelist() if f.endswith(('.yaml', '.yml'))]
-                
-                if not yaml_files:
-                    raise HTTPException(status_code=400, detail="No YAML files found in the zip file")
-                
-                for yaml_file in yaml_files:
-                    # Read the ingestion YAML
-                    ingestion_yaml = input_zip.read(yaml_file).decode('utf-8')
-                    
-                    # Convert ingestion YAML to read YAML
-                    read_yaml = parser.convert_ingestion_to_read_yaml(ingestion_yaml)
-                    
-                    # Generate the output filename
-                    base_name = os.path.splitext(os.path.basename(yaml_file))[0]
-                    read_filename = f"{base_name}_read.yaml"
-                    
-                    # Store the processed file information
-                    processed_files.append({
-                        "filename": read_filename,
-                        "content": read_yaml
-                    })
-            
-            # Return a JSON response with all processed files
-            return JSONResponse(content={
-                "message": f"Successfully processed {len(processed_files)} files",
-                "files": processed_files
-            })
-            
+            # Validate the bundle and start converting before the response begins
+            results = await run_in_threadpool(prime_results, spooled_results(zip_path, csv_path, profile))
         except zipfile.BadZipFile:
-            # If the input can't be read as a ZIP file, return an error
             raise HTTPException(status_code=400, detail="The uploaded file is not a valid ZIP file")
+        except BundleLimitError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if output_format == "zip":
+            base_name = os.path.splitext(os.path.basename(ingestion_zip.filename))[0]
+            return StreamingResponse(
+                stream_zip(results),
+                media_type="application/zip",
+                headers={"Content-Disposition": f"attachment; filename={base_name}_read.zip"}
+            )
         
+        if output_format == "ndjson":
+            return StreamingResponse(stream_ndjson(results), media_type="application/x-ndjson")
+        
+        # Legacy single JSON document
+        processed_files = await run_in_threadpool(list, results)
+        return JSONResponse(content={
+            "message": f"Successfully processed {sum(1 for f in processed_files if f['success'])} files",
+            "files": processed_files
+        })
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing ingestion files: {str(e)}")
 
+async def _convert_upload(upload: UploadFile, content: bytes, csv_path: Optional[str],
+                          skew_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Convert one uploaded ingestion YAML in the conversion pool"""
+    if not upload.filename.endswith(('.yaml', '.yml')):
+        return failed_record(upload.filename, "Invalid file type. Expected a .yaml or .yml file")
+    
+    try:
+        ingestion_yaml = content.decode('utf-8')
+    except UnicodeDecodeError as e:
+        return failed_record(upload.filename, f"File is not valid UTF-8: {str(e)}")
+    
+    loop = asyncio.get_running_loop()
+    record = await loop.run_in_executor(
+        get_conversion_pool(), convert_ingestion_yaml, upload.filename, ingestion_yaml, csv_path, skew_profile
+    )
+    metrics.observe_conversion(record)
+    return record
+
 @app.post("/api/process-multiple-files")
 async def process_multiple_files(
-    files: List[UploadFile] = File(..., description="Multiple YAML files to process")
+    files: List[UploadFile] = File(..., description="Multiple YAML files to process"),
+    csv_path: Optional[str] = Form(None, description="Path to DSBulk CSV output used by all read YAMLs"),
+    stream: bool = Form(False, description="Stream NDJSON result records as conversions finish"),
+    skew_profile: Optional[str] = Form(None, description="Key skew profile as JSON, e.g. {\"type\": \"zipf\", \"exponent\": 1.1}")
 ):
     """Process multiple individual YAML files and convert them to read files"""
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
     
-    processed_files = []
+    profile = _parse_skew_profile(skew_profile)
     
-    for file in files:
-        if not file.filename.endswith(('.yaml', '.yml')):
-            continue  # Skip non-YAML files
-        
-        try:
-            # Read the uploaded YAML file
-            content = await file.read()
-            ingestion_yaml = content.decode('utf-8')
-            
-            # Convert ingestion YAML to read YAML
-            read_yaml = parser.convert_ingestion_to_read_yaml(ingestion_yaml)
-            
-            # Generate the output filename
-            base_name = os.path.splitext(os.path.basename(file.filename))[0]
-            read_filename = f"{base_name}_read.yaml"
+    # Read all uploads concurrently, then fan the conversions out to the pool
+    contents = await asyncio.gather(*(file.read() for file in files))
+    conversions = [
+        _convert_upload(file, content, csv_path, profile)
+        for file, content in zip(files, contents)
+    ]
+    
+    if stream:
+        async def stream_results():
+            processed = 0
+            failed = 0
+            for conversion in asyncio.as_completed(conversions):
+                result = await conversion
+                processed += 1
+                if not result["success"]:
+                    failed += 1
+                yield json.dumps(result) + "\n"
             
-            # Store the processed file information
-            processed_files.append({
-                "filename": read_filename,
-                "content": read_yaml
-            })
-        except Exception as e:
-            # Log the error but continue processing other files
-            print(f"Error processing file {file.filename}: {str(e)}")
+            yield json.dumps({
+                "summary": True,
+                "message": f"Successfully processed {processed - failed} files",
+                "processed": processed,
+                "failed": failed
+            }) + "\n"
+        
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+    
+    results = await asyncio.gather(*conversions)
+    
+    # Keep the original response shape for successful files
+    processed_files = [
+        {"filename": result["filename"], "content": result["content"]}
+        for result in results if result["success"]
+    ]
     
     if not processed_files:
-        raise HTTPException(status_code=400, detail="No valid YAML files were processed")
+        errors = "; ".join(f"{result['source']}: {result['error']}" for result in results)
+        raise HTTPException(status_code=400, detail=f"No valid YAML files were processed. {errors}")
         
-    # Return a JSON response with all processed files
+    # Return a JSON response with all processed files and per-file records
     return JSONResponse(content={
         "message": f"Successfully processed {len(processed_files)} files",
-        "files": processed_files
+        "files": processed_files,
+        "results": [
+            {key: value for key, value in result.items() if key != "content"}
+            for result in results
+        ]
     })
 
 @app.get("/api/generate-yaml-single")
 async def generate_yaml_single_get(
     table_name: str = Query(..., description="Table name to generate YAML for"),
-    schema_json: Optional[str] = Query(None, description="Schema JSON data")
+    schema_json: Optional[str] = Query(None, description="Schema JSON data"),
+    row_size: Optional[str] = Query(None, description="Row-size options as JSON"),
+    partitioning: Optional[str] = Query(None, description="Partition options as JSON"),
+    vectors: Optional[str] = Query(None, description="Vector options as JSON"),
+    sizing: Optional[str] = Query(None, description="Dataset sizing options as JSON")
 ):
     """Generate a single NoSQLBench YAML file for a specific table (GET method)"""
-    return await _generate_yaml_single(table_name, schema_json)
+    return await _generate_yaml_single(table_name, schema_json, row_size, partitioning, vectors, sizing)
 
 @app.post("/api/generate-yaml-single")
 async def generate_yaml_single_post(
     table_name: str = Form(..., description="Table name to generate YAML for"),
-    schema_json: Optional[str] = Form(None, description="Schema JSON data")
+    schema_json: Optional[str] = Form(None, description="Schema JSON data"),
+    row_size: Optional[str] = Form(None, description="Row-size options as JSON"),
+    partitioning: Optional[str] = Form(None, description="Partition options as JSON"),
+    vectors: Optional[str] = Form(None, description="Vector options as JSON"),
+    sizing: Optional[str] = Form(None, description="Dataset sizing options as JSON")
 ):
     """Generate a single NoSQLBench YAML file for a specific table (POST method)"""
-    return await _generate_yaml_single(table_name, schema_json)
+    return await _generate_yaml_single(table_name, schema_json, row_size, partitioning, vectors, sizing)
 
-async def _generate_yaml_single(table_name: str, schema_json: Optional[str] = None):
+async def _generate_yaml_single(table_name: str, schema_json: Optional[str] = None, row_size: Optional[str] = None,
+                                partitioning: Optional[str] = None, vectors: Optional[str] = None,
+                                sizing: Optional[str] = None):
     """Internal function to handle YAML generation for both GET and POST methods"""
+    size_options = _parse_row_size(row_size)
+    partition_options = _parse_partitioning(partitioning)
+    vector_options = _parse_vectors(vectors)
+    sizing_options = _parse_sizing(sizing)
     try:
         # Validate required parameters
         if not table_name:
@@ -228,7 +527,8 @@ async def _generate_yaml_single(table_name: str, schema_json: Optional[str] = No
             )
         
         # Generate the YAML content
-        yaml_content = parser.generate_nosqlbench_yaml(schema_info, table_name)
+        yaml_content = await run_in_threadpool(parser.generate_nosqlbench_yaml, schema_info, table_name,
+                                               size_options, partition_options, vector_options, sizing_options)
         
         # Clean the table name for the filename
         safe_name = table_name.replace('.', '_')
@@ -248,19 +548,25 @@ async def _generate_yaml_single(table_name: str, schema_json: Optional[str] = No
 
 @app.post("/api/process-ingestion-file")
 async def process_ingestion_file(
-    ingestion_file: UploadFile = File(..., description="Ingestion YAML file")
+    ingestion_file: UploadFile = File(..., description="Ingestion YAML file"),
+    csv_path: Optional[str] = Form(None, description="Path to DSBulk CSV output"),
+    skew_profile: Optional[str] = Form(None, description="Key skew profile as JSON, e.g. {\"type\": \"zipf\", \"exponent\": 1.1}"),
+    read_patterns: Optional[str] = Form(None, description="Read pattern ratios as JSON, e.g. {\"ratios\": {\"point\": 3, \"partition\": 1}}")
 ):
     """Process a single ingestion YAML file and generate a read YAML file"""
     if not ingestion_file.filename.endswith(('.yaml', '.yml')):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a .yaml or .yml file")
     
+    profile = _parse_skew_profile(skew_profile)
+    patterns = _parse_read_patterns(read_patterns)
+    
     try:
         # Read the uploaded YAML file
         content = await ingestion_file.read()
         ingestion_yaml = content.decode('utf-8')
         
         # Convert ingestion YAML to read YAML
-        read_yaml = parser.convert_ingestion_to_read_yaml(ingestion_yaml)
+        read_yaml = parser.convert_ingestion_to_read_yaml(ingestion_yaml, csv_path, profile, patterns)
         
         # Generate the output filename
         base_name = os.path.splitext(os.path.basename(ingestion_file.filename))[0]
@@ -275,19 +581,27 @@ async def process_ingestion_file(
                 "Content-Type": "text/plain; charset=utf-8"
             }
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing ingestion file: {str(e)}")
 
 @app.post("/api/generate-read-yaml")
 async def generate_read_yaml(
     write_yaml_file: UploadFile = File(..., description="Write mode YAML file"),
-    csv_path: str = Form(..., description="Path to DSBulk CSV output"),
-    primary_key_columns: str = Form(..., description="Comma-separated list of primary key columns")
+    csv_path: Optional[str] = Form(None, description="Path to DSBulk CSV output; empty derives keys from the write bindings"),
+    primary_key_columns: str = Form(..., description="Comma-separated list of primary key columns"),
+    skew_profile: Optional[str] = Form(None, description="Key skew profile as JSON, e.g. {\"type\": \"zipf\", \"exponent\": 1.1}"),
+    cluster: str = Form(DEFAULT_CLUSTER, description="Cluster whose cached key sample is used when csv_path is empty"),
+    read_patterns: Optional[str] = Form(None, description="Read pattern ratios as JSON, e.g. {\"ratios\": {\"point\": 3, \"partition\": 1, \"range\": 1}}")
 ):
     """Generate a read YAML file from a write YAML file, DSBulk CSV path, and primary key columns"""
     if not write_yaml_file.filename.endswith(('.yaml', '.yml')):
         raise HTTPException(status_code=400, detail="Invalid write YAML file type. Please upload a .yaml or .yml file")
     
+    profile = _parse_skew_profile(skew_profile)
+    patterns = _parse_read_patterns(read_patterns)
+    
     try:
         # Read the uploaded YAML file
         content = await write_yaml_file.read()
@@ -299,8 +613,12 @@ async def generate_read_yaml(
         if not pk_columns:
             raise HTTPException(status_code=400, detail="No primary key columns provided")
         
+        # Reuse a cached key sample for the table when no CSV path is given
+        if not csv_path:
+            csv_path = _cached_sample_path(cluster, write_yaml, pk_columns)
+        
         # Generate read YAML
-        read_yaml = parser.generate_read_yaml_from_write_and_csv(write_yaml, csv_path, pk_columns)
+        read_yaml = parser.generate_read_yaml_from_write_and_csv(write_yaml, csv_path, pk_columns, profile, patterns)
         
         # Generate the output filename
         base_name = os.path.splitext(os.path.basename(write_yaml_file.filename))[0]
@@ -315,19 +633,29 @@ async def generate_read_yaml(
                 "Content-Type": "text/plain; charset=utf-8"
             }
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating read YAML: {str(e)}")
 
 @app.post("/api/generate-read-yaml-json")
 async def generate_read_yaml_json(
     write_yaml_file: UploadFile = File(..., description="Write mode YAML file"),
-    csv_path: str = Form(..., description="Path to DSBulk CSV output"),
-    primary_key_columns: str = Form(..., description="Comma-separated list of primary key columns")
+    csv_path: Optional[str] = Form(None, description="Path to DSBulk CSV output; empty derives keys from the write bindings"),
+    primary_key_columns: str = Form(..., description="Comma-separated list of primary key columns"),
+    skew_profile: Optional[str] = Form(None, description="Key skew profile as JSON, e.g. {\"type\": \"zipf\", \"exponent\": 1.1}"),
+    cluster: str = Form(DEFAULT_CLUSTER, description="Cluster whose cached key sample is used when csv_path is empty"),
+    read_patterns: Optional[str] = Form(None, description="Read pattern ratios as JSON, e.g. {\"ratios\": {\"point\": 3, \"partition\": 1, \"range\": 1}}")
 ):
     """Generate a read YAML file and return as JSON response"""
     if not write_yaml_file.filename.endswith(('.yaml', '.yml')):
         raise HTTPException(status_code=400, detail="Invalid write YAML file type. Please upload a .yaml or .yml file")
     
+    profile = _parse_skew_profile(skew_profile)
+    patterns = _parse_read_patterns(read_patterns)
+    
     try:
         # Read the uploaded YAML file
         content = await write_yaml_file.read()
@@ -339,8 +667,12 @@ async def generate_read_yaml_json(
         if not pk_columns:
             raise HTTPException(status_code=400, detail="No primary key columns provided")
         
+        # Reuse a cached key sample for the table when no CSV path is given
+        if not csv_path:
+            csv_path = _cached_sample_path(cluster, write_yaml, pk_columns)
+        
         # Generate read YAML
-        read_yaml = parser.generate_read_yaml_from_write_and_csv(write_yaml, csv_path, pk_columns)
+        read_yaml = parser.generate_read_yaml_from_write_and_csv(write_yaml, csv_path, pk_columns, profile, patterns)
         
         # Generate the output filename
         base_name = os.path.splitext(os.path.basename(write_yaml_file.filename))[0]
@@ -354,6 +686,10 @@ async def generate_read_yaml_json(
             "primary_key_columns": pk_columns,
             "csv_path": csv_path
         })
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating read YAML: {str(e)}")
 
@@ -366,6 +702,16 @@ async def validate_dsbulk():
         "path": dsbulk_manager.dsbulk_path
     }
 
+@app.get("/api/dsbulk/profiles")
+async def list_dsbulk_profiles():
+    """List the DSBulk tuning profiles and the settings each one sets"""
+    return {
+        "profiles": {
+            name: {TUNING_SETTINGS[key][0]: value for key, value in settings.items()}
+            for name, settings in TUNING_PROFILES.items()
+        }
+    }
+
 @app.post("/api/dsbulk/generate-commands")
 async def generate_dsbulk_commands(
     keyspace: str = Form(..., description="Keyspace name"),
@@ -374,23 +720,71 @@ async def generate_dsbulk_commands(
     primary_key: Optional[str] = Form(None, description="Primary key column for unload"),
     output_path: Optional[str] = Form(None, description="Output path for unload"),
     csv_path: Optional[str] = Form(None, description="CSV path for load"),
-    limit: Optional[int] = Form(1000000, description="Limit for unload query")
+    limit: Optional[int] = Form(1000000, description="Limit for unload query"),
+    sampling: str = Form("limit", description="Key sampling mode for unload: limit or token_range"),
+    token_ranges: int = Form(16, description="Number of token ranges for token_range sampling"),
+    cluster: str = Form(DEFAULT_CLUSTER, description="Cluster name or contact point used to look up cached key samples"),
+    profile: Optional[str] = Form(None, description="Tuning profile: default, conservative, balanced or throughput")
 ):
     """Generate DSBulk command(s) based on given parameters"""
     
+    try:
+        get_tuning_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         if operation == "unload":
             if not primary_key:
                 raise HTTPException(status_code=400, detail="Primary key is required for unload operations")
             if not output_path:
                 raise HTTPException(status_code=400, detail="Output path is required for unload operations")
+            
+            # A fresh cached sample makes the unload unnecessary
+            if cluster:
+                strategy = f"token_range:{token_ranges}" if sampling == "token_range" else "limit"
+                spec = sample_cache.make_spec(cluster, keyspace, table, primary_key.split(','), limit, strategy)
+                entry = sample_cache.get(spec)
+                if entry:
+                    return {
+                        "command": None,
+                        "operation": operation,
+                        "cached": True,
+                        "csv_path": entry["csv_path"],
+                        "cache_entry": entry,
+                        "description": (f"A fresh sample of {primary_key} values from {keyspace}.{table} "
+                                        f"is cached at {entry['csv_path']}; no unload is needed")
+                    }
+            
+            if sampling == "token_range":
+                range_commands = dsbulk_manager.generate_token_range_unload_commands(
+                    keyspace=keyspace,
+                    table=table,
+                    primary_key=primary_key,
+                    output_path=output_path,
+                    limit=limit,
+                    range_count=token_ranges,
+                    profile=profile
+                )
+                
+                return {
+                    "command": "\n\n".join(rc["command"] for rc in range_commands),
+                    "commands": range_commands,
+                    "operation": operation,
+                    "sampling": sampling,
+                    "description": (f"Exports {primary_key} values from {keyspace}.{table} in {token_ranges} "
+                                    f"token ranges under {output_path}; merge them with /api/dsbulk/sample-keys")
+                }
+            elif sampling != "limit":
+                raise HTTPException(status_code=400, detail=f"Unsupported sampling mode: {sampling}")
                 
             command = dsbulk_manager.generate_unload_command(
                 keyspace=keyspace,
                 table=table,
                 primary_key=primary_key,
                 output_path=output_path,
-                limit=limit
+                limit=limit,
+                profile=profile
             )
             
             return {
@@ -406,7 +800,8 @@ async def generate_dsbulk_commands(
             command = dsbulk_manager.generate_load_command(
                 keyspace=keyspace,
                 table=table,
-                csv_path=csv_path
+                csv_path=csv_path,
+                profile=profile
             )
             
             return {
@@ -418,7 +813,8 @@ async def generate_dsbulk_commands(
         elif operation == "count":
             command = dsbulk_manager.generate_count_command(
                 keyspace=keyspace,
-                table=table
+                table=table,
+                profile=profile
             )
             
             return {
@@ -462,33 +858,233 @@ async def execute_dsbulk_command(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error executing DSBulk command: {str(e)}")
 
+@app.post("/api/dsbulk/sample-keys")
+async def sample_dsbulk_keys(
+    keyspace: str = Form(..., description="Keyspace name"),
+    table: str = Form(..., description="Table name"),
+    primary_key: str = Form(..., description="Comma-separated partition key columns"),
+    output_path: str = Form(..., description="Output directory for the unloads and merged sample"),
+    limit: int = Form(1000000, description="Number of keys in the merged sample"),
+    sampling: str = Form("token_range", description="Key sampling mode: limit or token_range"),
+    token_ranges: int = Form(16, description="Number of token ranges to unload"),
+    max_parallel: int = Form(4, description="Maximum concurrent DSBulk processes"),
+    cluster: str = Form(DEFAULT_CLUSTER, description="Cluster name or contact point, part of the cache key"),
+    use_cache: bool = Form(True, description="Reuse a fresh cached sample instead of unloading again"),
+    profile: Optional[str] = Form(None, description="Tuning profile for the unloads")
+):
+    """Unload a key sample, build a sampler CSV from it and cache the result"""
+    if sampling not in ("limit", "token_range"):
+        raise HTTPException(status_code=400, detail=f"Unsupported sampling mode: {sampling}")
+    try:
+        get_tuning_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    strategy = f"token_range:{token_ranges}" if sampling == "token_range" else "limit"
+    spec = sample_cache.make_spec(cluster, keyspace, table, primary_key.split(','), limit, strategy)
+    
+    try:
+        if use_cache:
+            entry = await run_in_threadpool(sample_cache.get, spec)
+            if entry:
+                return {
+                    "success": True,
+                    "cached": True,
+                    "sampler_path": entry["csv_path"],
+                    "cache_entry": entry
+                }
+        
+        if sampling == "token_range":
+            result = await run_in_threadpool(
+                dsbulk_manager.execute_token_range_unload,
+                keyspace=keyspace,
+                table=table,
+                primary_key=primary_key,
+                output_path=output_path,
+                limit=limit,
+                range_count=token_ranges,
+                max_parallel=max_parallel,
+                profile=profile
+            )
+        else:
+            result = await run_in_threadpool(
+                dsbulk_manager.execute_limit_unload,
+                keyspace=keyspace,
+                table=table,
+                primary_key=primary_key,
+                output_path=output_path,
+                limit=limit,
+                profile=profile
+            )
+        
+        if not result["success"]:
+            return result
+        
+        # Turn the merged sample into a CSVSampler file and cache it
+        sampler_stats = await run_in_threadpool(
+            build_sampler_csv,
+            result["sample_path"],
+            os.path.join(output_path, "sampler.csv"),
+            key_columns=spec["primary_key"]
+        )
+        entry = await run_in_threadpool(sample_cache.put, spec, sampler_stats["output_path"], sampler_stats)
+        
+        result["cached"] = False
+        result["sampler_path"] = entry["csv_path"]
+        result["cache_entry"] = entry
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error sampling keys: {str(e)}")
+
+@app.get("/api/dsbulk/sample-cache")
+async def list_sample_cache():
+    """List cached key samples"""
+    try:
+        return {"entries": sample_cache.list_entries()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing key sample cache: {str(e)}")
+
+@app.delete("/api/dsbulk/sample-cache/{key}")
+async def invalidate_sample_cache_entry(key: str):
+    """Remove a cached key sample"""
+    if not sample_cache.is_valid_key(key):
+        raise HTTPException(status_code=400, detail="Cache key must be 32 lowercase hex characters")
+    if not sample_cache.invalidate(key):
+        raise HTTPException(status_code=404, detail=f"Cache entry {key} not found")
+    return {"removed": key}
+
+@app.post("/api/dsbulk/build-sampler-csv")
+async def build_dsbulk_sampler_csv(
+    unload_path: str = Form(..., description="DSBulk unload directory (or a single CSV file)"),
+    output_path: str = Form(..., description="Path of the sampler CSV to write"),
+    key_columns: Optional[str] = Form(None, description="Comma-separated key columns to sample (defaults to every column of the unload)"),
+    weight_mode: str = Form("uniform", description="Weighting: uniform, zipfian or frequency"),
+    zipf_exponent: float = Form(1.0, description="Exponent for zipfian weights"),
+    skew_profile: Optional[str] = Form(None, description="Key skew profile as JSON; overrides weight_mode")
+):
+    """Build a CSVSampler weight file (<k1>,<k2>,...,<k1>-weight) from DSBulk unload output"""
+    if weight_mode not in WEIGHT_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported weight mode: {weight_mode}")
+    
+    profile = _parse_skew_profile(skew_profile)
+    
+    try:
+        return await run_in_threadpool(
+            build_sampler_csv,
+            unload_path,
+            output_path,
+            key_columns=[col.strip() for col in key_columns.split(',') if col.strip()] if key_columns else None,
+            weight_mode=weight_mode,
+            zipf_exponent=zipf_exponent,
+            skew_profile=profile
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building sampler CSV: {str(e)}")
+
+@app.post("/api/dsbulk/jobs")
+async def create_dsbulk_job(
+    operation: str = Form(..., description="Operation type (unload, load, count)"),
+    keyspace: str = Form(..., description="Keyspace name"),
+    table: str = Form(..., description="Table name"),
+    partition_key: Optional[str] = Form(None, description="Comma-separated partition key columns (unload, count)"),
+    output_path: Optional[str] = Form(None, description="Output directory for unloads; one subdirectory per range"),
+    csv_path: Optional[str] = Form(None, description="CSV file or directory for loads"),
+    range_count: int = Form(16, description="Number of token ranges (or file groups for loads)"),
+    max_parallel: int = Form(4, description="Maximum concurrent DSBulk processes"),
+    max_retries: int = Form(3, description="Retries per failed sub-job"),
+    backoff_seconds: float = Form(5.0, description="Initial retry delay, doubled on every retry"),
+    profile: Optional[str] = Form(None, description="Tuning profile for every sub-job")
+):
+    """Split a DSBulk operation into checkpointed sub-jobs and start running them"""
+    try:
+        get_tuning_profile(profile)
+        job = await run_in_threadpool(
+            dsbulk_coordinator.create_job,
+            operation=operation,
+            keyspace=keyspace,
+            table=table,
+            partition_key=partition_key,
+            output_path=output_path,
+            csv_path=csv_path,
+            range_count=range_count,
+            max_parallel=max_parallel,
+            max_retries=max_retries,
+            backoff_seconds=backoff_seconds,
+            profile=profile
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return dsbulk_coordinator.start(job["job_id"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting DSBulk job: {str(e)}")
+
+@app.get("/api/dsbulk/jobs")
+async def list_dsbulk_jobs():
+    """List DSBulk jobs with their progress and throughput"""
+    try:
+        return {"jobs": await run_in_threadpool(dsbulk_coordinator.list_jobs)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing DSBulk jobs: {str(e)}")
+
+@app.get("/api/dsbulk/jobs/{job_id}")
+async def get_dsbulk_job(job_id: str):
+    """Get a DSBulk job with every sub-job, its progress and aggregated throughput"""
+    job = dsbulk_coordinator.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.post("/api/dsbulk/jobs/{job_id}/resume")
+async def resume_dsbulk_job(job_id: str):
+    """Resume a job from its checkpoint, re-running only unfinished sub-jobs"""
+    try:
+        return dsbulk_coordinator.resume(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/dsbulk/jobs/{job_id}/cancel")
+async def cancel_dsbulk_job(job_id: str):
+    """Stop scheduling sub-jobs; running ones finish and the job can be resumed later"""
+    try:
+        return dsbulk_coordinator.cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/dsbulk/download-script")
 async def download_dsbulk_script(
     keyspace: str = Form(..., description="Keyspace name"),
     table: str = Form(..., description="Table name"),
     primary_key: str = Form(..., description="Primary key column"),
     output_path: str = Form(..., description="Output path for CSV"),
-    limit: Optional[int] = Form(1000000, description="Limit for unload query")
+    limit: Optional[int] = Form(1000000, description="Limit for unload query"),
+    profile: Optional[str] = Form(None, description="Tuning profile for the unload")
 ):
     """Generate a DSBulk unload script and return it for download"""
     
     try:
-        # Generate the command
-        command = dsbulk_manager.generate_unload_command(
+        get_tuning_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Create a shell script with the unload command
+        script_content = dsbulk_manager.generate_unload_script(
             keyspace=keyspace,
             table=table,
             primary_key=primary_key,
             output_path=output_path,
-            limit=limit
+            limit=limit,
+            profile=profile
         )
         
-        # Create a shell script with the command
-        script_content = "#!/bin/bash\n\n"
-        script_content += "# DSBulk unload script generated by NoSQLBench Schema Generator\n"
-        script_content += f"# Exports data from {keyspace}.{table}\n\n"
-        script_content += command
-        script_content += "\n\n# End of script\n"
-        
         # Return the script for download
         filename = f"dsbulk_unload_{keyspace}_{table}.sh"
         
@@ -504,6 +1100,415 @@ async def download_dsbulk_script(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating DSBulk script: {str(e)}")
 
+def _parse_schema_json(schema_json: str) -> Dict[str, Any]:
+    """Schema passed with a request as JSON"""
+    try:
+        schema_info = json.loads(schema_json)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid schema_json: {str(e)}")
+    if not isinstance(schema_info, dict) or not isinstance(schema_info.get("tables", {}), dict):
+        raise HTTPException(status_code=400, detail="Invalid schema_json: expected a parsed schema object")
+    return schema_info
+
+def _schema_for_request(schema_json: Optional[str]) -> Dict[str, Any]:
+    """Schema passed with a request, or the most recently uploaded one"""
+    if schema_json:
+        return _parse_schema_json(schema_json)
+    if 'latest' in SCHEMA_CACHE:
+        return SCHEMA_CACHE['latest']
+    raise HTTPException(
+        status_code=400,
+        detail="Schema information not available. Please upload a schema first or provide schema_json."
+    )
+
+def _cdm_runs() -> List[Dict[str, Any]]:
+    """Status of every CDM run started through the process supervisor"""
+    return [
+        nb5_executor.get_execution_status(execution["execution_id"])
+        for execution in nb5_executor.list_executions()
+        if execution["execution_id"].startswith("cdm_")
+    ]
+
+@app.post("/api/cdm/plan")
+async def plan_cdm_migration(
+    source_keyspace: str = Form(..., description="Source keyspace"),
+    source_table: str = Form(..., description="Source table"),
+    target_keyspace: str = Form(..., description="Target keyspace"),
+    target_table: str = Form(..., description="Target table"),
+    migration_type: str = Form("full", description="Migration type (full, incremental)"),
+    batch_size: int = Form(1000, description="Rows per token-range partition; CDM's write batch size is left at its default"),
+    filter_condition: Optional[str] = Form(None, description="WHERE condition applied to the source"),
+    row_estimate_method: str = Form("tablestats", description="Row count source: tablestats (estimate), dsbulk (exact, scans the whole table) or manual"),
+    estimated_rows: Optional[int] = Form(None, description="Row count for the manual method"),
+    rows_per_partition: float = Form(1.0, description="Rows per partition for the tablestats method"),
+    nodes: int = Form(1, description="Nodes of the source cluster, to scale the per-node tablestats estimate"),
+    rows_per_second: Optional[float] = Form(None, description="Migration rate; defaults to the last measured rate"),
+    origin_host: Optional[str] = Form(None, description="Source cluster contact point"),
+    target_host: Optional[str] = Form(None, description="Target cluster contact point"),
+    properties_file: Optional[str] = Form(None, description="CDM properties file with connection settings"),
+    cdm_jar: Optional[str] = Form(None, description="Path to the Cassandra Data Migrator JAR"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema")
+):
+    """Plan a CDM migration: row estimate, duration and token-range partitions"""
+    schema_info = _schema_for_request(schema_json)
+    
+    if row_estimate_method not in cdm_planner.ROW_ESTIMATE_METHODS:
+        raise HTTPException(status_code=400, detail=f"Unsupported row estimate method: {row_estimate_method}")
+    if row_estimate_method == "manual" and estimated_rows is None:
+        raise HTTPException(status_code=400, detail="estimated_rows is required for the manual method")
+    
+    try:
+        # Validate the tables before scanning anything
+        cdm_planner.find_table(schema_info, source_keyspace, source_table)
+        cdm_planner.find_table(schema_info, target_keyspace, target_table)
+        
+        if row_estimate_method == "dsbulk":
+            row_estimate = await run_in_threadpool(
+                cdm_planner.estimate_rows_with_dsbulk, dsbulk_manager, source_keyspace, source_table
+            )
+        elif row_estimate_method == "tablestats":
+            row_estimate = await run_in_threadpool(
+                cdm_planner.estimate_rows_from_tablestats, source_keyspace, source_table,
+                rows_per_partition=rows_per_partition, nodes=nodes,
+                replication_factor=cdm_planner.replication_factor(schema_info, source_keyspace)
+            )
+        else:
+            row_estimate = {"rows": estimated_rows, "method": "manual", "exact": False}
+        
+        rate_source = "configured"
+        if not rows_per_second:
+            rows_per_second = cdm_planner.measured_rows_per_second(_cdm_runs(), source_keyspace, source_table)
+            rate_source = "measured"
+        if not rows_per_second:
+            rows_per_second = cdm_planner.DEFAULT_ROWS_PER_SECOND
+            rate_source = "default"
+        
+        plan_id = f"cdm_plan_{int(time.time() * 1000)}"
+        plan = await run_in_threadpool(
+            cdm_planner.build_migration_plan,
+            schema_info,
+            source_keyspace,
+            source_table,
+            target_keyspace,
+            target_table,
+            row_estimate=row_estimate,
+            rows_per_second=rows_per_second,
+            rate_source=rate_source,
+            partition_file=os.path.join(tempfile.gettempdir(), f"{plan_id}_partitions.csv"),
+            migration_type=migration_type,
+            batch_size=batch_size,
+            filter_condition=filter_condition,
+            origin_host=origin_host,
+            target_host=target_host
+        )
+        
+        command_args, command = cdm_planner.generate_cdm_command(
+            plan, cdm_jar or cdm_planner.DEFAULT_CDM_JAR, properties_file=properties_file
+        )
+        plan["plan_id"] = plan_id
+        plan["command"] = command
+        CDM_PLANS[plan_id] = {"plan": plan, "command_args": command_args}
+        
+        return plan
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error planning CDM migration: {str(e)}")
+
+@app.post("/api/cdm/run")
+async def run_cdm_migration(
+    plan_id: str = Form(..., description="Plan ID returned by /api/cdm/plan"),
+    timeout: int = Form(3600, description="Maximum execution time in seconds")
+):
+    """Run a planned CDM migration under the process supervisor used for NB5 runs"""
+    if plan_id not in CDM_PLANS:
+        raise HTTPException(status_code=404, detail=f"Plan {plan_id} not found")
+    
+    plan = CDM_PLANS[plan_id]["plan"]
+    try:
+        return nb5_executor.launch_process(
+            execution_id=f"cdm_{int(time.time() * 1000)}",
+            command_args=CDM_PLANS[plan_id]["command_args"],
+            command_string=plan["command"],
+            timeout=timeout,
+            metadata={
+                "plan_id": plan_id,
+                "source": plan["source"],
+                "target": plan["target"],
+                "estimated_rows": plan["estimatedRows"],
+                "estimated_seconds": plan["estimated_seconds"]
+            }
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting CDM migration: {str(e)}")
+
+@app.get("/api/cdm/status/{execution_id}")
+async def get_cdm_status(execution_id: str):
+    """Get the status, logs and record-count progress of a CDM run"""
+    if not execution_id.startswith("cdm_"):
+        raise HTTPException(status_code=404, detail=f"CDM run {execution_id} not found")
+    try:
+        status = nb5_executor.get_execution_status(execution_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    metadata = status["metadata"]
+    status["progress"] = cdm_planner.parse_cdm_progress(
+        status["stdout"] + status["stderr"], metadata.get("estimated_rows", 0)
+    )
+    end_time = status["end_time"] or time.time()
+    status["elapsed_seconds"] = round(end_time - status["start_time"], 1) if status["start_time"] else None
+    return status
+
+@app.post("/api/cdm/terminate/{execution_id}")
+async def terminate_cdm_run(execution_id: str):
+    """Terminate a running CDM migration"""
+    if not execution_id.startswith("cdm_"):
+        raise HTTPException(status_code=404, detail=f"CDM run {execution_id} not found")
+    try:
+        return nb5_executor.terminate_execution(execution_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/api/cdm/list")
+async def list_cdm_runs():
+    """List CDM runs with their status"""
+    return {"runs": [
+        {key: value for key, value in run.items() if key not in ("stdout", "stderr")}
+        for run in _cdm_runs()
+    ]}
+
+@app.post("/api/scenarios/mixed")
+async def generate_mixed_scenario(
+    scenario: str = Form(..., description="Scenario spec as JSON, e.g. {\"tables\": [{\"table\": \"ks.t\", \"write\": 1, \"read\": 3}], \"cyclerate\": 5000}"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema"),
+    host: str = Form("localhost", description="Cassandra host for the execute command"),
+    datacenter: str = Form("datacenter1", description="Cassandra datacenter for the execute command"),
+    keyspace: str = Form("baselines", description="Cassandra keyspace for the execute command")
+):
+    """Generate one nb5 workload mixing writes, reads and updates at a target rate, with its execute command"""
+    schema_info = _schema_for_request(schema_json)
+    
+    try:
+        spec = parse_scenario_json(scenario)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scenario: {str(e)}")
+    
+    try:
+        result = await run_in_threadpool(build_mixed_scenario, parser, schema_info, spec)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating scenario: {str(e)}")
+    
+    filename = "mixed_" + "_".join(table.replace('.', '_') for table in result["key_counts"]) + ".yaml"
+    command = nb5_executor.generate_execution_command(
+        yaml_file=filename,
+        host=host,
+        datacenter=datacenter,
+        keyspace=keyspace
+    )
+    
+    return {
+        "filename": filename,
+        "content": result["yaml"],
+        "command": command,
+        "cyclerate": result["cyclerate"],
+        "ops": result["ops"],
+        "phases": result["phases"],
+        "key_counts": result["key_counts"]
+    }
+
+def _summarize_captures(schema_info: Dict[str, Any], fql_path: Optional[str], counts_path: Optional[str],
+                        default_keyspace: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Stream the capture files into an fql summary and table counts"""
+    fql_summary = None
+    table_counts = None
+    if fql_path:
+        with query_capture.open_capture(fql_path) as f:
+            fql_summary = query_capture.summarize_fql(schema_info, f, default_keyspace)
+    if counts_path:
+        with query_capture.open_capture(counts_path) as f:
+            table_counts = query_capture.read_table_counts(f, default_keyspace)
+    return fql_summary, table_counts
+
+@app.post("/api/scenarios/capture")
+async def generate_capture_scenario(
+    fql_path: Optional[str] = Form(None, description="Path of an fqltool dump text file (.gz allowed)"),
+    counts_path: Optional[str] = Form(None, description="Path of nodetool tablestats output or a table,reads,writes CSV"),
+    options: Optional[str] = Form(None, description="Capture options as JSON, e.g. {\"default_keyspace\": \"shop\", \"rate_scale\": 6}"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema"),
+    host: str = Form("localhost", description="Cassandra host for the execute command"),
+    datacenter: str = Form("datacenter1", description="Cassandra datacenter for the execute command"),
+    keyspace: str = Form("baselines", description="Cassandra keyspace for the execute command")
+):
+    """Generate a mixed scenario whose op mix and table rates match captured production traffic"""
+    schema_info = _schema_for_request(schema_json)
+    if not fql_path and not counts_path:
+        raise HTTPException(status_code=400, detail="Provide fql_path, counts_path or both")
+    for path in (fql_path, counts_path):
+        if path and not os.path.exists(path):
+            raise HTTPException(status_code=404, detail=f"Capture not found: {path}")
+    
+    try:
+        capture_options = query_capture.normalize_capture_options(json.loads(options) if options else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid capture options: {str(e)}")
+    
+    try:
+        fql_summary, table_counts = await run_in_threadpool(
+            _summarize_captures, schema_info, fql_path, counts_path, capture_options["default_keyspace"]
+        )
+        capture = query_capture.build_capture_scenario(schema_info, fql_summary, table_counts, capture_options)
+        result = await run_in_threadpool(build_mixed_scenario, parser, schema_info,
+                                         normalize_scenario_spec(capture["spec"]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating capture scenario: {str(e)}")
+    
+    filename = "capture_" + "_".join(table.replace('.', '_') for table in result["key_counts"]) + ".yaml"
+    return {
+        "filename": filename,
+        "content": result["yaml"],
+        "command": nb5_executor.generate_execution_command(
+            yaml_file=filename,
+            host=host,
+            datacenter=datacenter,
+            keyspace=keyspace
+        ),
+        "spec": capture["spec"],
+        "cyclerate": result["cyclerate"],
+        "rate_source": capture["rate_source"],
+        "replayed_share": capture["replayed_share"],
+        "ops": result["ops"],
+        "shares": capture["shares"],
+        "skipped": capture["skipped"],
+        "unknown_tables": capture["unknown_tables"],
+        "statements": fql_summary["statements"] if fql_summary else None,
+        "duration_seconds": fql_summary["duration_seconds"] if fql_summary else None
+    }
+
+@app.post("/api/vectors/recall-queries")
+async def vector_recall_queries(
+    dataset_path: str = Form(..., description="Path of a clustered vector dataset (.fvec) a write workload reads"),
+    count: int = Form(100, description="Number of query vectors to sample"),
+    seed: int = Form(42, description="Sampling seed")
+):
+    """Sample dataset vectors to run as ANN queries for a recall check"""
+    if not os.path.exists(dataset_path):
+        raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_path}")
+    
+    dataset = await run_in_threadpool(load_dataset, dataset_path)
+    query_ids = sample_queries(dataset, count, seed)
+    return {
+        "dataset_path": dataset_path,
+        "queries": [{"query_id": i, "vector": [float(value) for value in dataset[i]]} for i in query_ids]
+    }
+
+@app.post("/api/vectors/recall")
+async def vector_recall(
+    dataset_path: str = Form(..., description="Path of the vector dataset (.fvec) the table was written from"),
+    results: str = Form(..., description="ANN results as JSON, e.g. [{\"query_id\": 7, \"ids\": [7, 912, 44]}] or with \"vectors\" instead of ids"),
+    k: int = Form(10, description="Number of neighbours to compare"),
+    similarity: str = Form("cosine", description="Similarity function of the index: cosine, dot_product or euclidean"),
+    max_queries: int = Form(DEFAULT_MAX_RECALL_QUERIES, description="Results beyond this many are sampled down before the brute-force search"),
+    seed: int = Form(42, description="Seed for sampling the checked queries")
+):
+    """Recall@k of ANN query results against a brute-force top-k over the dataset"""
+    if not os.path.exists(dataset_path):
+        raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_path}")
+    if k < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+    if max_queries < 1:
+        raise HTTPException(status_code=400, detail="max_queries must be at least 1")
+    
+    try:
+        ann_results = json.loads(results)
+        return await run_in_threadpool(check_recall, dataset_path, ann_results, k, similarity.lower(),
+                                       max_queries, seed)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid recall request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error checking recall: {str(e)}")
+
+def _variant_workloads(variants: str, schema_json: Optional[str]) -> List[Dict[str, Any]]:
+    """Workloads of a variant spec, with spec errors reported as 400"""
+    schema_info = _schema_for_request(schema_json)
+    try:
+        spec = parse_variant_json(variants)
+        return build_variant_workloads(parser, schema_info, spec)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid variants: {str(e)}")
+
+@app.post("/api/variants/generate")
+async def generate_table_variants(
+    variants: str = Form(..., description="Variant spec as JSON, e.g. {\"table\": \"ks.t\", \"variants\": {\"lcs\": {\"compaction\": {\"class\": \"LeveledCompactionStrategy\"}}}}"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema")
+):
+    """Generate one workload per table option variant, each writing to its own copy of the table"""
+    workloads = _variant_workloads(variants, schema_json)
+    return {"workloads": [
+        {"variant": w["variant"], "table": w["table"], "with_options": w["with_options"],
+         "filename": w["filename"], "content": w["yaml"]}
+        for w in workloads
+    ]}
+
+@app.post("/api/variants/run")
+async def run_table_variants(
+    variants: str = Form(..., description="Variant spec as JSON (see /api/variants/generate)"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema"),
+    host: str = Form("localhost", description="Cassandra host"),
+    datacenter: str = Form("datacenter1", description="Cassandra datacenter"),
+    keyspace: str = Form("baselines", description="Cassandra keyspace"),
+    additional_params: Optional[str] = Form(None, description="Additional NB5 parameters"),
+    timeout: int = Form(3600, description="Maximum execution time of each variant in seconds")
+):
+    """Run the variants back to back and compare their write and read throughput and tail latency"""
+    workloads = _variant_workloads(variants, schema_json)
+    
+    comparison_id = f"variants_{int(time.time() * 1000)}"
+    comparison = {
+        "comparison_id": comparison_id,
+        "status": "pending",
+        "start_time": time.time(),
+        "end_time": None,
+        "runs": [dict(workload, status="pending") for workload in workloads],
+        "comparison": []
+    }
+    VARIANT_COMPARISONS[comparison_id] = comparison
+    
+    thread = threading.Thread(
+        target=run_variant_comparison,
+        args=(nb5_executor, comparison, host, datacenter, keyspace, additional_params, timeout)
+    )
+    thread.daemon = True
+    thread.start()
+    
+    return {"comparison_id": comparison_id, "variants": [w["variant"] for w in workloads]}
+
+@app.get("/api/variants/{comparison_id}")
+async def get_table_variants(comparison_id: str):
+    """Progress of a variant comparison with the side-by-side metrics of the finished runs"""
+    if comparison_id not in VARIANT_COMPARISONS:
+        raise HTTPException(status_code=404, detail=f"Comparison {comparison_id} not found")
+    comparison = VARIANT_COMPARISONS[comparison_id]
+    return dict(comparison, runs=[
+        {key: value for key, value in run.items() if key != "yaml"} for run in comparison["runs"]
+    ])
+
+@app.post("/api/variants/{comparison_id}/cancel")
+async def cancel_table_variants(comparison_id: str):
+    """Stop a variant comparison after the running variant; later variants are skipped"""
+    if comparison_id not in VARIANT_COMPARISONS:
+        raise HTTPException(status_code=404, detail=f"Comparison {comparison_id} not found")
+    comparison = VARIANT_COMPARISONS[comparison_id]
+    comparison["cancelled"] = True
+    for run in comparison["runs"]:
+        if run["status"] == "running" and run.get("execution_id"):
+            nb5_executor.terminate_execution(run["execution_id"])
+    return {"comparison_id": comparison_id, "status": "cancelling"}
+
 @app.get("/api/nb5/validate")
 async def validate_nb5():
     """Validate that the NB5 JAR exists"""
@@ -537,6 +1542,30 @@ async def generate_nb5_command(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating NB5 command: {str(e)}")
 
+def _lint_schema(yaml_content: str, schema_json: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Schema to lint a workload against, and where it came from. The last
+    uploaded schema may belong to another workload, so it is only used
+    when it has every table the workload uses.
+    """
+    if schema_json:
+        return _parse_schema_json(schema_json), "request"
+    latest = SCHEMA_CACHE.get('latest')
+    if latest and schema_covers_workload(yaml_content, latest):
+        return latest, "latest"
+    return None, None
+
+@app.post("/api/nb5/lint")
+async def lint_nb5_workload(
+    yaml_content: str = Form(..., description="YAML content"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data; defaults to the last uploaded schema when it has the workload's tables")
+):
+    """Report performance anti-patterns of a workload, checked against the schema's keys and indexes"""
+    schema_info, schema_source = _lint_schema(yaml_content, schema_json)
+    lint = lint_workload(yaml_content, schema_info)
+    lint["schema"] = schema_source
+    return lint
+
 @app.post("/api/nb5/execute")
 async def execute_nb5(
     yaml_content: str = Form(..., description="YAML content"),
@@ -544,9 +1573,21 @@ async def execute_nb5(
     datacenter: str = Form(..., description="Cassandra datacenter"),
     keyspace: str = Form(..., description="Cassandra keyspace"),
     additional_params: Optional[str] = Form(None, description="Additional parameters"),
-    timeout: Optional[int] = Form(600, description="Execution timeout in seconds")
+    timeout: Optional[int] = Form(600, description="Execution timeout in seconds"),
+    schema_json: Optional[str] = Form(None, description="Schema JSON data for the lint check; defaults to the last uploaded schema when it has the workload's tables"),
+    force: bool = Form(False, description="Execute even when the lint check reports errors")
 ):
     """Execute a NB5 command with the provided YAML and parameters"""
+    # Refuse workloads with lint errors unless forced
+    schema_info, schema_source = _lint_schema(yaml_content, schema_json)
+    lint = lint_workload(yaml_content, schema_info)
+    lint["schema"] = schema_source
+    if not lint["ok"] and not force:
+        raise HTTPException(status_code=400, detail={
+            "message": "Workload has lint errors; fix them or pass force=true to execute anyway",
+            "lint": lint
+        })
+    
     try:
         result = nb5_executor.execute_nb5_command(
             yaml_content=yaml_content,
@@ -556,6 +1597,7 @@ async def execute_nb5(
             additional_params=additional_params,
             timeout=timeout
         )
+        result["lint"] = lint
         
         return result
     except Exception as e:
@@ -600,8 +1642,8 @@ async def download_nb5_script(
 ):
     """Generate a NB5 execution script and return it for download"""
     try:
-        # Generate the command
-        command = nb5_executor.generate_execution_command(
+        # Create a shell script with the execution command
+        script_content = nb5_executor.generate_execution_script(
             yaml_file=yaml_file,
             host=host,
             datacenter=datacenter,
@@ -609,13 +1651,6 @@ async def download_nb5_script(
             additional_params=additional_params
         )
         
-        # Create a shell script with the command
-        script_content = "#!/bin/bash\n\n"
-        script_content += "# NoSQLBench 5 execution script generated by NoSQLBench Schema Generator\n"
-        script_content += f"# Executes workload against {host}\n\n"
-        script_content += command
-        script_content += "\n\n# End of script\n"
-        
         # Return the script for download
         yaml_file_basename = os.path.basename(yaml_file)
         filename = f"nb5_execute_{yaml_file_basename}.sh"
@@ -632,6 +1667,179 @@ async def download_nb5_script(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating NB5 script: {str(e)}")
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without the admin token; admin endpoints are disabled when none is set"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set BENCHWAVE_ADMIN_TOKEN to enable them")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def _profiler_error(e: Exception) -> HTTPException:
+    """HTTP error of a failed profiler call"""
+    if isinstance(e, KeyError):
+        return HTTPException(status_code=404, detail=str(e.args[0]) if e.args else str(e))
+    if isinstance(e, RuntimeError):
+        return HTTPException(status_code=409, detail=str(e))
+    if isinstance(e, (ValueError, re.error)):
+        return HTTPException(status_code=400, detail=str(e))
+    return HTTPException(status_code=500, detail=f"Error profiling: {str(e)}")
+
+def _replay_parse_schema(schema_text: str) -> int:
+    """Parse a schema and encode the result the way /api/parse-schema does"""
+    schema_info = parser.parse_cql(schema_text)
+    return len(JSONResponse(content=schema_info).body)
+
+def _replay_generate_yaml(schema_text: str) -> int:
+    """Parse a schema and generate the write workload of every table"""
+    schema_info = parser.parse_cql(schema_text)
+    generated = 0
+    for table_name in schema_info["tables"]:
+        parser.generate_nosqlbench_yaml(schema_info, table_name)
+        generated += 1
+    return generated
+
+REPLAY_OPERATIONS = {
+    "parse_schema": _replay_parse_schema,
+    "generate_yaml": _replay_generate_yaml
+}
+
+@app.post("/api/admin/profile/route", dependencies=[Depends(require_admin)])
+async def arm_route_profile(
+    route: str = Form(..., description="Route template, e.g. /api/parse-schema or /api/dsbulk/jobs/{job_id}"),
+    count: int = Form(1, description="Number of requests to profile")
+):
+    """Profile the next requests to a route with cProfile"""
+    if not any(getattr(r, "path", None) == route for r in app.router.routes):
+        raise HTTPException(status_code=400, detail=f"Unknown route: {route}")
+    try:
+        return profiler.arm_route(route, count)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.post("/api/admin/profile/replay", dependencies=[Depends(require_admin)])
+async def replay_profile(
+    operation: str = Form("parse_schema", description=f"One of {', '.join(REPLAY_OPERATIONS)}"),
+    schema_file: Optional[UploadFile] = File(None, description="CQL schema; defaults to the last uploaded schema"),
+    sort: str = Form("cumulative"),
+    top: int = Form(DEFAULT_TOP),
+    pattern: Optional[str] = Form(None, description="Regex restricting the summary, e.g. _extract_with_clause|re.py|json")
+):
+    """Profile one replayed request and return its top functions"""
+    if operation not in REPLAY_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported operation: {operation}. Expected one of {', '.join(REPLAY_OPERATIONS)}")
+    if schema_file is not None:
+        schema_text = (await schema_file.read()).decode('utf-8')
+    elif 'latest_cql' in SCHEMA_CACHE:
+        schema_text = SCHEMA_CACHE['latest_cql']
+    else:
+        raise HTTPException(status_code=400, detail="No schema uploaded; upload one or pass schema_file")
+    try:
+        session, _ = await run_in_threadpool(profiler.profile_call, f"replay:{operation}",
+                                             REPLAY_OPERATIONS[operation], schema_text)
+        return profiler.summary(session["session_id"], sort, top, pattern)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List profile sessions"""
+    return {"sessions": profiler.list_sessions()}
+
+@app.get("/api/admin/profile/{session_id}", dependencies=[Depends(require_admin)])
+async def get_profile_summary(
+    session_id: str,
+    sort: str = Query("cumulative", description="cumulative, tottime or ncalls"),
+    top: int = Query(DEFAULT_TOP),
+    pattern: Optional[str] = Query(None, description="Regex restricting the rows, e.g. _extract_with_clause|re.py|json"),
+    format: str = Query("json", description="json, or text for the pstats printout")
+):
+    """Top functions of a profile session"""
+    try:
+        if format == "text":
+            return Response(content=profiler.text_report(session_id, sort, top), media_type="text/plain")
+        return profiler.summary(session_id, sort, top, pattern)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.get("/api/admin/profile/{session_id}/download", dependencies=[Depends(require_admin)])
+async def download_profile(session_id: str):
+    """Download the pstats file of a completed or cancelled session"""
+    try:
+        session = profiler.get_session(session_id)
+    except KeyError as e:
+        raise _profiler_error(e)
+    if not session["path"]:
+        raise HTTPException(status_code=409, detail=f"Profile session {session_id} has not completed")
+    return FileResponse(session["path"], media_type="application/octet-stream",
+                        filename=os.path.basename(session["path"]))
+
+@app.post("/api/admin/profile/{session_id}/cancel", dependencies=[Depends(require_admin)])
+async def cancel_profile(session_id: str):
+    """Stop an armed session, keeping the requests profiled so far"""
+    try:
+        return profiler.cancel(session_id)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.post("/api/admin/tracemalloc/start", dependencies=[Depends(require_admin)])
+async def start_tracemalloc(frames: int = Form(DEFAULT_TRACEMALLOC_FRAMES, description="Frames kept per allocation")):
+    """Start tracing allocations"""
+    return profiler.start_tracemalloc(frames)
+
+@app.post("/api/admin/tracemalloc/stop", dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    """Stop tracing allocations; snapshots are kept"""
+    return profiler.stop_tracemalloc()
+
+@app.get("/api/admin/tracemalloc", dependencies=[Depends(require_admin)])
+async def tracemalloc_status():
+    """Tracing state, traced memory and snapshots"""
+    return profiler.tracemalloc_status()
+
+@app.post("/api/admin/tracemalloc/snapshot", dependencies=[Depends(require_admin)])
+async def take_tracemalloc_snapshot(save: bool = Form(False, description="Also dump the snapshot to disk")):
+    """Take an allocation snapshot"""
+    try:
+        return await run_in_threadpool(profiler.take_snapshot, save)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.get("/api/admin/tracemalloc/diff", dependencies=[Depends(require_admin)])
+async def diff_tracemalloc_snapshots(
+    before: str = Query(...),
+    after: str = Query(...),
+    key_type: str = Query("lineno", description="lineno, filename or traceback"),
+    top: int = Query(DEFAULT_TOP)
+):
+    """Allocation sites that changed the most between two snapshots"""
+    try:
+        return await run_in_threadpool(profiler.snapshot_diff, before, after, key_type, top)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.get("/api/admin/tracemalloc/{snapshot_id}", dependencies=[Depends(require_admin)])
+async def get_tracemalloc_snapshot(
+    snapshot_id: str,
+    key_type: str = Query("lineno", description="lineno, filename or traceback"),
+    top: int = Query(DEFAULT_TOP)
+):
+    """Largest allocation sites of a snapshot"""
+    try:
+        return await run_in_threadpool(profiler.snapshot_top, snapshot_id, key_type, top)
+    except Exception as e:
+        raise _profiler_error(e)
+
+@app.get("/api/admin/tracemalloc/{snapshot_id}/download", dependencies=[Depends(require_admin)])
+async def download_tracemalloc_snapshot(snapshot_id: str):
+    """Download a snapshot saved to disk, readable with tracemalloc.Snapshot.load"""
+    try:
+        path = profiler.snapshot_path(snapshot_id)
+    except KeyError as e:
+        raise _profiler_error(e)
+    if not path:
+        raise HTTPException(status_code=409, detail=f"Snapshot {snapshot_id} was not saved; take it with save=true")
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
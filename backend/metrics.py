@@ -0,0 +1,115 @@
+# backend/metrics.py
+"""
+Prometheus metrics of the backend, served on /metrics.
+
+Metrics are prometheus_client collectors in its default registry, so the
+exposition also carries the client's process and platform metrics. They
+are thread-safe: generators run in the threadpool and NB5Executor
+captures output in its own threads. Conversions in the YAML conversion
+pool are recorded from the conversion time their records report; CLI
+workers are not counted.
+
+Rates are derived at query time, e.g. tables generated per second:
+
+    rate(benchwave_tables_generated_total[1m])
+
+and captured log lines per second:
+
+    rate(benchwave_nb5_log_lines_total[1m])
+"""
+import functools
+import time
+from typing import Dict
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Seconds; generation of a single table is fast, nb5 runs and unloads are long
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COMMAND_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456, 1073741824)
+
+# Generators report a missing table or a failure as a YAML comment instead of raising
+FAILED_GENERATION_PREFIXES = ("# Error", "# Table ")
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    return generate_latest().decode("utf-8")
+
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram(
+    "benchwave_http_request_duration_seconds", "Time to handle an API request",
+    ("method", "route", "status"), buckets=DEFAULT_BUCKETS)
+HTTP_REQUEST_BYTES = Histogram(
+    "benchwave_http_request_size_bytes", "Declared body size of API requests, including uploads",
+    ("method", "route"), buckets=SIZE_BUCKETS)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "benchwave_http_requests_in_progress", "API requests being handled")
+
+# Schema parsing and generation
+SCHEMA_PARSE_SECONDS = Histogram(
+    "benchwave_schema_parse_duration_seconds", "Time to parse a CQL schema",
+    buckets=DEFAULT_BUCKETS)
+SCHEMA_PARSE_SECONDS_PER_KB = Histogram(
+    "benchwave_schema_parse_seconds_per_kb", "Schema parse time per KB of CQL",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01))
+SCHEMA_BYTES = Counter(
+    "benchwave_schema_parsed_bytes_total", "Bytes of CQL schema parsed")
+GENERATION_SECONDS = Histogram(
+    "benchwave_yaml_generation_duration_seconds", "Time to generate one workload YAML",
+    ("generator",), buckets=DEFAULT_BUCKETS)
+TABLES_GENERATED = Counter(
+    "benchwave_tables_generated_total", "Workload YAMLs generated per table",
+    ("generator",))
+
+# Child processes
+NB5_ACTIVE_EXECUTIONS = Gauge(
+    "benchwave_nb5_active_executions", "Supervised nb5 and CDM processes still running")
+NB5_EXECUTIONS = Counter(
+    "benchwave_nb5_executions_total", "Supervised processes by final status",
+    ("status",))
+NB5_LOG_LINES = Counter(
+    "benchwave_nb5_log_lines_total", "Output lines captured from supervised processes",
+    ("stream",))
+NB5_LOG_BUFFER_LINES = Gauge(
+    "benchwave_nb5_log_buffer_lines", "Captured output lines held in memory")
+NB5_LOG_BUFFER_BYTES = Gauge(
+    "benchwave_nb5_log_buffer_bytes", "Approximate memory of captured output lines")
+DSBULK_COMMAND_SECONDS = Histogram(
+    "benchwave_dsbulk_command_duration_seconds", "Time of DSBulk commands by outcome",
+    ("outcome",), buckets=COMMAND_BUCKETS)
+DSBULK_ACTIVE_COMMANDS = Gauge(
+    "benchwave_dsbulk_active_commands", "DSBulk commands running")
+
+
+def observe_schema_parse(size_bytes: int, seconds: float):
+    """Record one schema parse of size_bytes of CQL"""
+    SCHEMA_PARSE_SECONDS.observe(seconds)
+    SCHEMA_BYTES.inc(size_bytes)
+    if size_bytes:
+        SCHEMA_PARSE_SECONDS_PER_KB.observe(seconds * 1024.0 / size_bytes)
+
+
+def observe_conversion(record: Dict[str, object]):
+    """Record an ingestion-to-read conversion reported by a conversion pool worker"""
+    if record.get("success") and record.get("conversion_ms") is not None:
+        GENERATION_SECONDS.labels(generator="ingestion").observe(record["conversion_ms"] / 1000.0)
+        TABLES_GENERATED.labels(generator="ingestion").inc()
+
+
+def timed_generation(generator: str):
+    """Decorate a function generating one table's workload to time and count its successful results"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            if not (isinstance(result, str) and result.startswith(FAILED_GENERATION_PREFIXES)):
+                GENERATION_SECONDS.labels(generator=generator).observe(time.perf_counter() - start)
+                TABLES_GENERATED.labels(generator=generator).inc()
+            return result
+        return wrapper
+    return decorator
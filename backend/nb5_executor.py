@@ -1,12 +1,64 @@
 # backend/nb5_executor.py
 import os
+import re
 import subprocess
+import sys
 import tempfile
 import threading
 import time
 import json
 from typing import Dict, List, Optional, Tuple, Any
 
+import metrics
+
+# Makes nb5 print a metrics summary on exit, read back by parse_timer_summary
+SUMMARY_REPORT_PARAMS = "--report-summary-to stdout:0"
+
+# Seconds to wait for a finished process's output to be drained before its status is set
+OUTPUT_DRAIN_TIMEOUT = 30
+
+# Timer fields of the summary, e.g. "count = 1000", "99% <= 8.33 milliseconds"
+_TIMER_FIELD_PATTERN = re.compile(r"^\s+([\w.% -]+?)\s*<?=\s*([\d.,]+)\s*([\w/]*)")
+_TIME_UNIT_MS = {"nanoseconds": 1e-6, "microseconds": 1e-3, "milliseconds": 1.0, "seconds": 1000.0}
+_TIMER_FIELDS = {
+    "count": "count",
+    "mean rate": "ops_per_second",
+    "mean": "mean_ms",
+    "median": "p50_ms",
+    "99%": "p99_ms",
+    "99.9%": "p999_ms",
+    "max": "max_ms"
+}
+
+def parse_timer_summary(lines: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Extract the timers of nb5's exit summary (see SUMMARY_REPORT_PARAMS).
+    
+    Returns count, mean rate (ops/s) and latencies in milliseconds per
+    timer name, e.g. "write.cycles.servicetime".
+    """
+    timers = {}
+    current = None
+    in_timers = False
+    for line in lines:
+        if line.startswith("-- "):
+            in_timers = line.startswith("-- Timers")
+            current = None
+            continue
+        if not in_timers or not line.strip():
+            continue
+        if not line[0].isspace():
+            current = timers.setdefault(line.strip(), {})
+            continue
+        match = _TIMER_FIELD_PATTERN.match(line)
+        if current is None or not match or match.group(1) not in _TIMER_FIELDS:
+            continue
+        value = float(match.group(2).replace(',', ''))
+        if match.group(3) in _TIME_UNIT_MS:
+            value *= _TIME_UNIT_MS[match.group(3)]
+        current[_TIMER_FIELDS[match.group(1)]] = int(value) if match.group(1) == "count" else round(value, 3)
+    return timers
+
 class NB5Executor:
     def __init__(self, nb5_path: str = None):
         # Default to a common location if not specified
@@ -39,6 +91,29 @@ class NB5Executor:
         
         return command
     
+    def generate_execution_script(self,
+                              yaml_file: str,
+                              host: str,
+                              datacenter: str,
+                              keyspace: str,
+                              additional_params: Optional[str] = None) -> str:
+        """Generate a shell script wrapping a NB5 execution command"""
+        command = self.generate_execution_command(
+            yaml_file=yaml_file,
+            host=host,
+            datacenter=datacenter,
+            keyspace=keyspace,
+            additional_params=additional_params
+        )
+        
+        script_content = "#!/bin/bash\n\n"
+        script_content += "# NoSQLBench 5 execution script generated by NoSQLBench Schema Generator\n"
+        script_content += f"# Executes workload against {host}\n\n"
+        script_content += command
+        script_content += "\n\n# End of script\n"
+        
+        return script_content
+    
     def execute_nb5_command(self,
                         yaml_content: str,
                         host: str, 
@@ -83,60 +158,14 @@ class NB5Executor:
                 yaml_path, host, datacenter, keyspace, additional_params
             )
             
-            # Start the process
-            process = subprocess.Popen(
-                command_args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
+            return self.launch_process(
+                execution_id=execution_id,
+                command_args=command_args,
+                command_string=command_string,
+                timeout=timeout,
+                cleanup_paths=[yaml_path]
             )
             
-            # Store the process and related information
-            self.active_executions[execution_id] = {
-                'process': process,
-                'command': command_string,
-                'yaml_path': yaml_path,
-                'start_time': time.time(),
-                'timeout': timeout
-            }
-            
-            # Initialize logs for this execution
-            self.execution_logs[execution_id] = {
-                'stdout': [],
-                'stderr': [],
-                'status': 'running'
-            }
-            
-            # Start threads to capture stdout and stderr
-            stdout_thread = threading.Thread(
-                target=self._capture_output,
-                args=(process.stdout, execution_id, 'stdout')
-            )
-            stderr_thread = threading.Thread(
-                target=self._capture_output,
-                args=(process.stderr, execution_id, 'stderr')
-            )
-            
-            stdout_thread.daemon = True
-            stderr_thread.daemon = True
-            stdout_thread.start()
-            stderr_thread.start()
-            
-            # Start a thread to monitor the process
-            monitor_thread = threading.Thread(
-                target=self._monitor_process,
-                args=(execution_id,)
-            )
-            monitor_thread.daemon = True
-            monitor_thread.start()
-            
-            return {
-                'execution_id': execution_id,
-                'command': command_string,
-                'status': 'running'
-            }
-            
         except Exception as e:
             # Clean up the temporary file if it exists
             if 'yaml_path' in locals():
@@ -147,12 +176,87 @@ class NB5Executor:
             
             raise Exception(f"Error executing NB5 command: {str(e)}")
     
+    def launch_process(self,
+                       execution_id: str,
+                       command_args: List[str],
+                       command_string: str,
+                       timeout: int = 600,
+                       cleanup_paths: Optional[List[str]] = None,
+                       metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Start a supervised process and capture its output.
+        
+        The process is tracked like an NB5 run: its status and logs are
+        available through get_execution_status, it can be terminated, and
+        cleanup_paths are removed once it exits.
+        """
+        # Start the process
+        process = subprocess.Popen(
+            command_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        metrics.NB5_ACTIVE_EXECUTIONS.inc()
+        
+        # Store the process and related information
+        self.active_executions[execution_id] = {
+            'process': process,
+            'command': command_string,
+            'cleanup_paths': cleanup_paths or [],
+            'metadata': metadata or {},
+            'start_time': time.time(),
+            'timeout': timeout
+        }
+        
+        # Initialize logs for this execution
+        self.execution_logs[execution_id] = {
+            'stdout': [],
+            'stderr': [],
+            'status': 'running'
+        }
+        
+        # Start threads to capture stdout and stderr
+        stdout_thread = threading.Thread(
+            target=self._capture_output,
+            args=(process.stdout, execution_id, 'stdout')
+        )
+        stderr_thread = threading.Thread(
+            target=self._capture_output,
+            args=(process.stderr, execution_id, 'stderr')
+        )
+        
+        stdout_thread.daemon = True
+        stderr_thread.daemon = True
+        stdout_thread.start()
+        stderr_thread.start()
+        self.active_executions[execution_id]['capture_threads'] = [stdout_thread, stderr_thread]
+        
+        # Start a thread to monitor the process
+        monitor_thread = threading.Thread(
+            target=self._monitor_process,
+            args=(execution_id,)
+        )
+        monitor_thread.daemon = True
+        monitor_thread.start()
+        
+        return {
+            'execution_id': execution_id,
+            'command': command_string,
+            'status': 'running'
+        }
+    
     def _capture_output(self, stream, execution_id: str, stream_type: str):
         """Capture output from stdout or stderr stream"""
         try:
             for line in stream:
                 if execution_id in self.execution_logs:
-                    self.execution_logs[execution_id][stream_type].append(line.rstrip())
+                    line = line.rstrip()
+                    self.execution_logs[execution_id][stream_type].append(line)
+                    metrics.NB5_LOG_LINES.labels(stream=stream_type).inc()
+                    metrics.NB5_LOG_BUFFER_LINES.inc()
+                    metrics.NB5_LOG_BUFFER_BYTES.inc(sys.getsizeof(line))
         except Exception as e:
             print(f"Error capturing {stream_type} for execution {execution_id}: {str(e)}")
         finally:
@@ -188,6 +292,11 @@ class NB5Executor:
             
             # Get the return code
             return_code = process.poll()
+            execution['end_time'] = time.time()
+            
+            # nb5 prints its summary last; keep the run "running" until both streams are read
+            for thread in execution.get('capture_threads', []):
+                thread.join(timeout=OUTPUT_DRAIN_TIMEOUT)
             
             # Update status based on return code
             if execution_id in self.execution_logs:
@@ -198,10 +307,10 @@ class NB5Executor:
                         self.execution_logs[execution_id]['status'] = 'failed'
                         self.execution_logs[execution_id]['stderr'].append(f"Process exited with return code {return_code}")
             
-            # Clean up the temporary YAML file
-            if 'yaml_path' in execution:
+            # Clean up temporary files
+            for path in execution.get('cleanup_paths', []):
                 try:
-                    os.unlink(execution['yaml_path'])
+                    os.unlink(path)
                 except:
                     pass
             
@@ -222,6 +331,10 @@ class NB5Executor:
             if execution_id in self.execution_logs:
                 self.execution_logs[execution_id]['status'] = 'error'
                 self.execution_logs[execution_id]['stderr'].append(f"Error monitoring process: {str(e)}")
+        finally:
+            metrics.NB5_ACTIVE_EXECUTIONS.dec()
+            metrics.NB5_EXECUTIONS.labels(
+                status=self.execution_logs.get(execution_id, {}).get('status', 'error')).inc()
     
     def get_execution_status(self, execution_id: str) -> Dict[str, Any]:
         """Get the status and logs of an execution"""
@@ -244,10 +357,19 @@ class NB5Executor:
             'status': logs['status'],
             'command': command,
             'is_running': is_running,
+            'start_time': self.active_executions.get(execution_id, {}).get('start_time'),
+            'end_time': self.active_executions.get(execution_id, {}).get('end_time'),
+            'metadata': self.active_executions.get(execution_id, {}).get('metadata', {}),
             'stdout': logs['stdout'],
             'stderr': logs['stderr']
         }
     
+    def wait_for_execution(self, execution_id: str, poll_interval: float = 1.0) -> Dict[str, Any]:
+        """Block until an execution has finished and return its final status"""
+        while self.execution_logs.get(execution_id, {}).get('status') == 'running':
+            time.sleep(poll_interval)
+        return self.get_execution_status(execution_id)
+    
     def terminate_execution(self, execution_id: str) -> Dict[str, Any]:
         """Terminate a running execution"""
         if execution_id not in self.active_executions:
@@ -0,0 +1,199 @@
+# backend/partition_model.py
+"""
+Wide-partition modelling for generated write workloads.
+
+Options (all optional):
+    {
+        "rows_per_partition": 100,
+        "distribution": "fixed",
+        "exponent": 1.1,
+        "key_count": 1000000,
+        "tables": {"telemetry.events": {"rows_per_partition": 1000}}
+    }
+
+"fixed" writes exactly rows_per_partition consecutive cycles to each
+partition. "uniform" hashes every cycle to one of key_count /
+rows_per_partition partitions, so partition sizes vary around the average;
+"zipf" picks the partition from a Zipf distribution, giving a few very wide
+partitions and a long tail of narrow ones. key_count is the number of rampup
+cycles the averages are computed for.
+
+Clustering keys follow the cycle in the declared clustering order: rampup
+appends rows in the order they are stored, so partitions grow the way a
+time-series table does.
+"""
+import json
+from typing import Dict, List, Optional, Any
+
+PARTITION_DISTRIBUTIONS = ("fixed", "uniform", "zipf")
+
+DEFAULT_KEY_COUNT = 1000000
+DEFAULT_ZIPF_EXPONENT = 1.1
+
+# Start of generated clustering timestamps; one row per second after it
+CLUSTERING_EPOCH = "2025-01-01 00:00:00"
+
+# Offset giving numeric text clustering keys a fixed width, so they sort as numbers
+TEXT_KEY_OFFSET = 10 ** 12
+
+
+def normalize_partition_options(options: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Validate partition options and fill in defaults; empty means one row per key"""
+    if not options:
+        return None
+
+    distribution = options.get("distribution", "fixed")
+    if distribution not in PARTITION_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported partition distribution: {distribution}. "
+                         f"Expected one of {', '.join(PARTITION_DISTRIBUTIONS)}")
+
+    normalized = {
+        "rows_per_partition": int(options.get("rows_per_partition", 1)),
+        "distribution": distribution,
+        "exponent": float(options.get("exponent", DEFAULT_ZIPF_EXPONENT)),
+        "key_count": int(options.get("key_count", DEFAULT_KEY_COUNT)),
+        "tables": options.get("tables", {})
+    }
+
+    if normalized["rows_per_partition"] < 1:
+        raise ValueError("rows_per_partition must be at least 1")
+    if normalized["key_count"] < normalized["rows_per_partition"]:
+        raise ValueError("key_count must be at least rows_per_partition")
+    if normalized["exponent"] <= 0:
+        raise ValueError("Zipf exponent must be positive")
+
+    return normalized
+
+
+def parse_partition_json(options_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse partition options passed as a JSON form field"""
+    if not options_json:
+        return None
+    return normalize_partition_options(json.loads(options_json))
+
+
+def resolve_partition_options(options: Optional[Dict[str, Any]], full_table_name: str,
+                              table_name: str) -> Optional[Dict[str, Any]]:
+    """Merge a table's entry under "tables" over the top-level options"""
+    if not options:
+        return None
+    table_options = options["tables"].get(full_table_name) or options["tables"].get(table_name)
+    if not table_options:
+        return options
+
+    merged = {key: value for key, value in options.items() if key != "tables"}
+    merged.update(table_options)
+    return normalize_partition_options(merged)
+
+
+def partition_count(options: Dict[str, Any]) -> int:
+    return max(1, options["key_count"] // options["rows_per_partition"])
+
+
+def partition_key_prefix(options: Dict[str, Any]) -> str:
+    """Functions mapping a cycle to its partition, prepended to partition key bindings"""
+    rows = options["rows_per_partition"]
+    if options["distribution"] == "fixed":
+        return f"Div({rows}L); "
+    if options["distribution"] == "uniform":
+        return f"HashRange(0L,{partition_count(options) - 1}L); "
+    return f"Zipf({partition_count(options)},{options['exponent']}); "
+
+
+def clustering_binding(cql_type: str, order: str, options: Dict[str, Any]) -> Optional[str]:
+    """
+    Binding for a clustering column that follows the declared order.
+
+    With fixed partitions the row index within the partition drives the
+    value; otherwise the cycle does, which is still increasing within every
+    partition. Returns None for types without an ordered generator.
+    """
+    cql_type = cql_type.strip().rstrip(',').strip().lower()
+    if options["distribution"] == "fixed":
+        index = f"Mod({options['rows_per_partition']}L); "
+        span = options["rows_per_partition"]
+    else:
+        index = ""
+        span = options["key_count"]
+
+    # DESC columns count down so rows are still written in clustering order
+    def ordered(scale: int = 1, offset: int = 0) -> str:
+        if order.upper() == "DESC":
+            return f"{index}Mul(-{scale}L); Add({(span - 1) * scale + offset}L); "
+        if scale != 1 or offset:
+            return f"{index}Mul({scale}L); Add({offset}L); "
+        return index
+
+    if cql_type == "timestamp":
+        return f"{ordered(1000)}StartingEpochMillis('{CLUSTERING_EPOCH}'); ToJavaInstant()"
+    if cql_type == "date":
+        return f"{ordered()}LongToLocalDateDays()"
+    if cql_type == "timeuuid":
+        return f"{ordered(1000)}ToEpochTimeUUID('{CLUSTERING_EPOCH}')"
+    if cql_type in ("bigint", "counter", "varint"):
+        return f"{ordered()}Identity()"
+    if cql_type == "int":
+        return f"{ordered()}ToInt()"
+    if cql_type == "smallint":
+        return f"{ordered()}ToShort()"
+    if cql_type == "tinyint":
+        return f"{ordered()}ToByte()"
+    if cql_type == "double":
+        return f"{ordered()}ToDouble()"
+    if cql_type == "decimal":
+        return f"{ordered()}ToBigDecimal()"
+    if cql_type == "float":
+        return f"{ordered()}ToFloat()"
+    if cql_type in ("text", "varchar", "ascii"):
+        return f"{ordered(1, TEXT_KEY_OFFSET)}ToString()"
+    return None
+
+
+def partition_bindings(columns: Dict[str, str], primary_key: List[List[str]],
+                       clustering_order: Dict[str, str], base_bindings: Dict[str, str],
+                       options: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Rewrite the key column bindings of a table so partitions hold the
+    configured number of rows.
+
+    Partition key bindings keep their value function but are fed the
+    partition number instead of the cycle. Clustering columns without an
+    ordered generator keep their binding, fed the row index, which keeps
+    them unique within a fixed partition.
+    """
+    if not options or not primary_key:
+        return dict(base_bindings)
+
+    bindings = dict(base_bindings)
+    prefix = partition_key_prefix(options)
+    for column in primary_key[0]:
+        bindings[column] = prefix + base_bindings[column]
+
+    for part in primary_key[1:]:
+        for column in part:
+            ordered = clustering_binding(columns[column], clustering_order.get(column, "ASC"), options)
+            if ordered:
+                bindings[column] = ordered
+            elif options["distribution"] == "fixed":
+                bindings[column] = f"Mod({options['rows_per_partition']}L); " + base_bindings[column]
+
+    return bindings
+
+
+def describe_partitioning(options: Dict[str, Any], primary_key: List[List[str]],
+                          clustering_order: Dict[str, str]) -> List[str]:
+    """YAML comment lines describing the partition layout"""
+    rows = options["rows_per_partition"]
+    if options["distribution"] == "fixed":
+        layout = f"{rows} rows per partition"
+    elif options["distribution"] == "uniform":
+        layout = f"about {rows} rows per partition, {partition_count(options)} partitions hashed uniformly"
+    else:
+        layout = (f"{rows} rows per partition on average, {partition_count(options)} partitions "
+                  f"sized by Zipf({options['exponent']})")
+
+    lines = [f"# Partitioning: {layout} over {options['key_count']} rampup cycles"]
+    clustering = [f"{col} {clustering_order.get(col, 'ASC')}" for part in primary_key[1:] for col in part]
+    if clustering:
+        lines.append(f"# Clustering keys written in order: {', '.join(clustering)}")
+    return lines
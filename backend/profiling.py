@@ -0,0 +1,312 @@
+# backend/profiling.py
+"""
+On-demand CPU profiles and allocation snapshots of the running backend.
+
+A route can be armed to profile its next N requests with cProfile; the
+stats of those requests are merged into one session. A single call (e.g. a
+replayed schema upload) can be profiled the same way. Sessions are saved as
+pstats files that snakeviz, gprof2dot or pstats itself can open, and are
+summarised as their top functions, optionally filtered by a pattern such as
+"_extract_with_clause|re.py|json".
+
+cProfile only sees the thread it runs on. Async endpoints run on the event
+loop thread and are covered, together with anything else the loop handles
+meanwhile; work handed to the threadpool is not. Only one profile runs at
+a time, and a streamed response is profiled up to its first byte.
+
+tracemalloc snapshots are kept in memory, summarised as their top
+allocation sites and compared with each other; they can be saved to disk
+as well.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+SNAPSHOT_KEY_TYPES = ("lineno", "filename", "traceback")
+
+DEFAULT_TOP = 30
+DEFAULT_TRACEMALLOC_FRAMES = 10
+MAX_SNAPSHOTS = 20
+
+
+def _function_label(key: Tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name
+    return f"{filename}:{line}({name})"
+
+
+class ProfilingManager:
+    """
+    Profile sessions and allocation snapshots of one backend process.
+
+    Session files go to output_dir; sessions and snapshots are kept until
+    the process exits.
+    """
+
+    def __init__(self, output_dir: str = None):
+        self.output_dir = output_dir or os.path.join(tempfile.gettempdir(), "benchwave-profiles")
+        self.sessions = {}
+        self.snapshots = {}
+        self._snapshot_count = 0
+        self._lock = threading.Lock()
+        self._profiler_busy = threading.Lock()
+
+    def _new_session(self, target: str, requested: int) -> Dict[str, Any]:
+        session_id = f"profile_{int(time.time() * 1000)}_{len(self.sessions)}"
+        session = {
+            "session_id": session_id,
+            "target": target,
+            "requested": requested,
+            "remaining": requested,
+            "profiled": 0,
+            "status": "armed",
+            "created": time.time(),
+            "seconds": 0.0,
+            "path": None,
+            "_stats": None
+        }
+        self.sessions[session_id] = session
+        return session
+
+    def arm_route(self, route: str, count: int) -> Dict[str, Any]:
+        """Profile the next count requests to a route template, e.g. /api/parse-schema"""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with self._lock:
+            for session in self.sessions.values():
+                if session["target"] == route and session["status"] == "armed":
+                    raise ValueError(f"Route {route} is already armed by {session['session_id']}")
+            return self.public(self._new_session(route, count))
+
+    def has_armed(self) -> bool:
+        return any(session["status"] == "armed" for session in list(self.sessions.values()))
+
+    def claim(self, route: str) -> Optional[Dict[str, Any]]:
+        """Session to profile a request to route with, if one is armed and no profile is running"""
+        with self._lock:
+            session = next((s for s in self.sessions.values()
+                            if s["target"] == route and s["status"] == "armed" and s["remaining"] > 0), None)
+            if not session or not self._profiler_busy.acquire(blocking=False):
+                return None
+            session["remaining"] -= 1
+            return session
+
+    @contextmanager
+    def profiling(self, session: Dict[str, Any]) -> Iterator[None]:
+        """Profile a with block into a claimed session"""
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+        finally:
+            self._profiler_busy.release()
+            self._record(session, profiler, time.perf_counter() - start)
+
+    def _record(self, session: Dict[str, Any], profiler: cProfile.Profile, seconds: float):
+        with self._lock:
+            if session["_stats"] is None:
+                session["_stats"] = pstats.Stats(profiler)
+            else:
+                session["_stats"].add(profiler)
+            session["profiled"] += 1
+            session["seconds"] += seconds
+            if session["profiled"] >= session["requested"]:
+                os.makedirs(self.output_dir, exist_ok=True)
+                session["path"] = os.path.join(self.output_dir, f"{session['session_id']}.prof")
+                session["_stats"].dump_stats(session["path"])
+                session["status"] = "complete"
+
+    def profile_call(self, target: str, func: Callable, *args, **kwargs) -> Tuple[Dict[str, Any], Any]:
+        """Profile one call; returns the completed session and the call's result"""
+        if not self._profiler_busy.acquire(blocking=False):
+            raise RuntimeError("Another profile is running; try again when it completes")
+        with self._lock:
+            session = self._new_session(target, 1)
+            session["remaining"] = 0
+        with self.profiling(session):
+            result = func(*args, **kwargs)
+        return self.public(session), result
+
+    def cancel(self, session_id: str) -> Dict[str, Any]:
+        """Stop an armed session; requests profiled so far are kept"""
+        with self._lock:
+            session = self._session(session_id)
+            if session["status"] == "armed":
+                session["remaining"] = 0
+                session["requested"] = session["profiled"]
+                session["status"] = "cancelled"
+                if session["_stats"] is not None:
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    session["path"] = os.path.join(self.output_dir, f"{session['session_id']}.prof")
+                    session["_stats"].dump_stats(session["path"])
+            return self.public(session)
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        if session_id not in self.sessions:
+            raise KeyError(f"Profile session {session_id} not found")
+        return self.sessions[session_id]
+
+    def get_session(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self.public(self._session(session_id))
+
+    @staticmethod
+    def public(session: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in session.items() if not key.startswith("_")}
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self.public(session) for session in self.sessions.values()]
+
+    def summary(self, session_id: str, sort: str = "cumulative", top: int = DEFAULT_TOP,
+                pattern: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Top functions of a session by cumulative time, own time or calls.
+
+        pattern is a regular expression matched against "file:line(function)"
+        to restrict the rows, e.g. to the parser or to json.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort: {sort}. Expected one of {', '.join(SORT_KEYS)}")
+        matcher = re.compile(pattern) if pattern else None
+        with self._lock:
+            session = self._session(session_id)
+            stats = session["_stats"]
+            result = self.public(session)
+            if stats is None:
+                result["functions"] = []
+                return result
+            rows = [
+                {"function": _function_label(key), "ncalls": calls, "primitive_calls": primitive,
+                 "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)}
+                for key, (primitive, calls, tottime, cumtime, _) in stats.stats.items()
+            ]
+            result["total_calls"] = stats.total_calls
+            result["total_tt"] = round(stats.total_tt, 6)
+
+        field = {"cumulative": "cumtime", "tottime": "tottime", "ncalls": "ncalls"}[sort]
+        if matcher:
+            rows = [row for row in rows if matcher.search(row["function"])]
+        rows.sort(key=lambda row: row[field], reverse=True)
+        result["functions"] = rows[:top]
+        return result
+
+    def text_report(self, session_id: str, sort: str = "cumulative", top: int = DEFAULT_TOP) -> str:
+        """pstats' own printout of a session's top functions"""
+        with self._lock:
+            stats = self._session(session_id)["_stats"]
+            if stats is None:
+                return ""
+            output = io.StringIO()
+            stats.stream = output
+            stats.sort_stats(sort).print_stats(top)
+            stats.stream = None
+        return output.getvalue()
+
+    # Allocation snapshots
+
+    def start_tracemalloc(self, frames: int = DEFAULT_TRACEMALLOC_FRAMES) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.tracemalloc_status()
+
+    def stop_tracemalloc(self) -> Dict[str, Any]:
+        """Stop tracing; snapshots taken so far are kept"""
+        tracemalloc.stop()
+        return self.tracemalloc_status()
+
+    def tracemalloc_status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "snapshots": list(self.snapshots)
+        }
+
+    def take_snapshot(self, save: bool = False) -> Dict[str, Any]:
+        """Take an allocation snapshot; the oldest ones are dropped past MAX_SNAPSHOTS"""
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        with self._lock:
+            self._snapshot_count += 1
+            snapshot_id = f"snapshot_{self._snapshot_count}"
+            path = None
+            if save:
+                os.makedirs(self.output_dir, exist_ok=True)
+                path = os.path.join(self.output_dir, f"{snapshot_id}.tracemalloc")
+                snapshot.dump(path)
+            self.snapshots[snapshot_id] = {"snapshot": snapshot, "path": path, "created": time.time()}
+            for old_id in list(self.snapshots)[:-MAX_SNAPSHOTS]:
+                del self.snapshots[old_id]
+        return {"snapshot_id": snapshot_id, "path": path,
+                "total_bytes": sum(stat.size for stat in snapshot.statistics("filename"))}
+
+    def _snapshot(self, snapshot_id: str) -> Dict[str, Any]:
+        if snapshot_id not in self.snapshots:
+            raise KeyError(f"Snapshot {snapshot_id} not found")
+        return self.snapshots[snapshot_id]
+
+    def snapshot_path(self, snapshot_id: str) -> Optional[str]:
+        """File a snapshot was saved to, if it was"""
+        return self._snapshot(snapshot_id)["path"]
+
+    def snapshot_top(self, snapshot_id: str, key_type: str = "lineno", top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        """Largest allocation sites of a snapshot"""
+        if key_type not in SNAPSHOT_KEY_TYPES:
+            raise ValueError(f"Unsupported key type: {key_type}. Expected one of {', '.join(SNAPSHOT_KEY_TYPES)}")
+        snapshot = self._snapshot(snapshot_id)["snapshot"]
+        stats = snapshot.statistics(key_type)
+        return {
+            "snapshot_id": snapshot_id,
+            "total_bytes": sum(stat.size for stat in stats),
+            "allocations": [
+                {"site": self._site(stat.traceback, key_type), "bytes": stat.size, "count": stat.count}
+                for stat in stats[:top]
+            ]
+        }
+
+    def snapshot_diff(self, before_id: str, after_id: str, key_type: str = "lineno",
+                      top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        """Allocation sites that grew (or shrank) the most between two snapshots"""
+        if key_type not in SNAPSHOT_KEY_TYPES:
+            raise ValueError(f"Unsupported key type: {key_type}. Expected one of {', '.join(SNAPSHOT_KEY_TYPES)}")
+        before = self._snapshot(before_id)["snapshot"]
+        after = self._snapshot(after_id)["snapshot"]
+        stats = after.compare_to(before, key_type)
+        return {
+            "before": before_id,
+            "after": after_id,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "allocations": [
+                {"site": self._site(stat.traceback, key_type), "bytes": stat.size, "size_diff": stat.size_diff,
+                 "count": stat.count, "count_diff": stat.count_diff}
+                for stat in stats[:top]
+            ]
+        }
+
+    @staticmethod
+    def _site(traceback: tracemalloc.Traceback, key_type: str) -> str:
+        if key_type == "traceback":
+            return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in traceback)
+        frame = traceback[0]
+        return frame.filename if key_type == "filename" else f"{frame.filename}:{frame.lineno}"
@@ -0,0 +1,451 @@
+# backend/query_capture.py
+"""
+Op mix and table weights from production query captures.
+
+Two kinds of capture are read, both streamed line by line (optionally
+gzipped), so multi-GB files are processed in constant memory:
+
+    full query log text dumps (fqltool dump), whose "Query:" statements are
+    classified by table and access pattern against a parsed schema
+
+    per-table read/write counts, either nodetool tablestats output
+    ("Local read count" / "Local write count" under each table) or a CSV
+    with table (or keyspace and table), reads and writes columns
+
+Options:
+    {
+        "default_keyspace": "shop",
+        "cyclerate": null,
+        "rate_scale": 1.0,
+        "min_share": 0.001,
+        "key_count": 1000000,
+        "phases": {"measure_seconds": 600},
+        "threads": "auto",
+        "skew_profile": {"type": "zipf", "exponent": 1.1},
+        "row_size": null,
+        "partitioning": null
+    }
+
+The result is a mixed scenario spec (see scenario_builder): per table, write,
+read and update ratios proportional to the captured counts, with the reads
+split over the captured read patterns. Table counts, when given, set the
+relative weight of each table's reads and writes (they count replica-local
+operations, so they compare tables of keyspaces with equal replication);
+the full query log then only sets the mix within a table. Ops below
+min_share of the traffic are dropped.
+
+cyclerate defaults to the statements per second of the full query log
+times rate_scale, scaled down to the share of the logged statements the
+scenario replays. A log only holds the traffic its node coordinated, so set
+rate_scale to the number of nodes logging to replay the cluster's rate.
+Index, ANN and DELETE statements, reads the schema's keys cannot serve
+(full scans, ALLOW FILTERING), statements on tables missing from the schema
+and ops below min_share are counted but not replayed.
+"""
+import csv
+import gzip
+import itertools
+import re
+from typing import Dict, Iterable, Iterator, Optional, Any, Tuple
+
+from read_patterns import READ_PATTERNS
+from workload_linter import restricted_columns
+
+# Read patterns the mixed scenario builder can replay
+REPLAYED_READ_PATTERNS = ("point", "partition", "range")
+
+DEFAULT_MIN_SHARE = 0.001
+
+# Classifications cached per distinct statement text; prepared statements repeat
+MAX_CACHED_STATEMENTS = 10000
+
+# Integer ratios are computed at this resolution before being reduced
+RATIO_RESOLUTION = 10000
+
+_DML_PATTERN = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_HEADER_PATTERN = re.compile(r"^([A-Z][A-Za-z ]*):\s?(.*)$")
+_HEX_DUMP_PATTERN = re.compile(r"^\s*[0-9a-f]{8}(\s+[0-9a-f]{2})+", re.IGNORECASE)
+_TABLE_PATTERNS = {
+    "SELECT": re.compile(r"\bFROM\s+([\w.\"]+)", re.IGNORECASE),
+    "INSERT": re.compile(r"\bINTO\s+([\w.\"]+)", re.IGNORECASE),
+    "UPDATE": re.compile(r"^\s*UPDATE\s+([\w.\"]+)", re.IGNORECASE),
+    "DELETE": re.compile(r"\bFROM\s+([\w.\"]+)", re.IGNORECASE)
+}
+_TABLESTATS_PATTERNS = {
+    "keyspace": re.compile(r"^\s*Keyspace\s*:\s*(\S+)"),
+    "table": re.compile(r"^\s*(?:Table|Column Family)\s*:\s*(\S+)"),
+    "reads": re.compile(r"^\s*Local read count\s*:\s*(\d+)"),
+    "writes": re.compile(r"^\s*Local write count\s*:\s*(\d+)")
+}
+
+
+def normalize_capture_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate capture options and fill in defaults"""
+    options = dict(options or {})
+    normalized = {
+        "default_keyspace": options.get("default_keyspace"),
+        "cyclerate": float(options["cyclerate"]) if options.get("cyclerate") else None,
+        "rate_scale": float(options.get("rate_scale", 1.0)),
+        "min_share": float(options.get("min_share", DEFAULT_MIN_SHARE)),
+        "scenario": {key: options[key] for key in
+                     ("key_count", "phases", "threads", "skew_profile", "row_size", "partitioning", "vectors")
+                     if options.get(key) is not None}
+    }
+    if normalized["cyclerate"] is not None and normalized["cyclerate"] <= 0:
+        raise ValueError("cyclerate must be positive")
+    if normalized["rate_scale"] <= 0:
+        raise ValueError("rate_scale must be positive")
+    if not 0 <= normalized["min_share"] < 1:
+        raise ValueError("min_share must be at least 0 and below 1")
+    return normalized
+
+
+def open_capture(path: str):
+    """Text stream of a capture file, decompressing .gz files"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_fql_statements(lines: Iterable[str]) -> Iterator[Tuple[Optional[int], Optional[str], str]]:
+    """
+    Statements of an fqltool dump, with the start time (ms) and keyspace of
+    their record.
+
+    A record starts at its "Type:" line; batches contribute every statement
+    they hold. Statements end at their "Values:" line, the next header or a
+    blank line.
+    """
+    start_time = None
+    keyspace = None
+    statement = None
+
+    for line in lines:
+        line = line.rstrip("\n")
+        header = _HEADER_PATTERN.match(line)
+        if header and header.group(1) not in ("Query", "Queries"):
+            if statement:
+                yield start_time, keyspace, " ".join(statement)
+                statement = None
+            name, value = header.group(1), header.group(2).strip()
+            if name == "Type":
+                start_time, keyspace = None, None
+            elif name == "Query start time" and value.lstrip("-").isdigit():
+                start_time = int(value)
+            elif name == "Keyspace":
+                keyspace = value or None
+            continue
+
+        text = header.group(2) if header else line
+        if not text.strip() or _HEX_DUMP_PATTERN.match(text) or text.startswith("---"):
+            if statement:
+                yield start_time, keyspace, " ".join(statement)
+                statement = None
+            continue
+        if _DML_PATTERN.match(text):
+            if statement:
+                yield start_time, keyspace, " ".join(statement)
+            statement = [text.strip()]
+        elif statement:
+            statement.append(text.strip())
+
+    if statement:
+        yield start_time, keyspace, " ".join(statement)
+
+
+def _resolve_table(schema_info: Dict[str, Any], table_ref: str,
+                   keyspace: Optional[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Full name and info of the schema table a statement refers to"""
+    table_ref = table_ref.replace('"', '')
+    if '.' in table_ref:
+        keyspace, table_ref = table_ref.split('.', 1)
+    for full_name, info in schema_info.get("tables", {}).items():
+        if info["name"] == table_ref and (keyspace is None or info["keyspace"] in (None, keyspace)):
+            return full_name, info
+    return None
+
+
+def classify_statement(schema_info: Dict[str, Any], statement: str,
+                       keyspace: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    Table and access pattern of a captured statement.
+
+    The op is write, update, delete or read; reads get one of the read
+    patterns (see read_patterns) or "scan" when no key or index serves them.
+    table is the schema's full table name, or None with the captured
+    reference in "unknown".
+    """
+    kind = _DML_PATTERN.match(statement)
+    if not kind:
+        return {"table": None, "op": None, "pattern": None, "unknown": None}
+    kind = kind.group(1).upper()
+    op = {"SELECT": "read", "INSERT": "write", "UPDATE": "update", "DELETE": "delete"}[kind]
+
+    table_match = _TABLE_PATTERNS[kind].search(statement)
+    resolved = _resolve_table(schema_info, table_match.group(1), keyspace) if table_match else None
+    if not resolved:
+        return {"table": None, "op": op, "pattern": None,
+                "unknown": table_match.group(1) if table_match else "?"}
+    full_name, table_info = resolved
+    if op != "read":
+        return {"table": full_name, "op": op, "pattern": None, "unknown": None}
+
+    if re.search(r"\bANN\s+OF\b", statement, re.IGNORECASE):
+        return {"table": full_name, "op": op, "pattern": "ann", "unknown": None}
+    if re.search(r"\bALLOW\s+FILTERING\b", statement, re.IGNORECASE) or not table_info["primary_key"]:
+        return {"table": full_name, "op": op, "pattern": "scan", "unknown": None}
+
+    partition_columns = table_info["primary_key"][0]
+    clustering_columns = [col for part in table_info["primary_key"][1:] for col in part]
+    equal, other = restricted_columns(statement)
+
+    if all(col in equal for col in partition_columns):
+        if all(col in equal for col in clustering_columns):
+            pattern = "point"
+        elif any(col in other for col in clustering_columns):
+            pattern = "range"
+        else:
+            pattern = "partition"
+        return {"table": full_name, "op": op, "pattern": pattern, "unknown": None}
+
+    indexed = {
+        index["column"] for index in schema_info.get("indices", [])
+        if index["table"] in (full_name, table_info["name"])
+    }
+    if set(other) & indexed:
+        pattern = "index_range"
+    elif set(equal) & indexed:
+        pattern = "index"
+    else:
+        pattern = "scan"
+    return {"table": full_name, "op": op, "pattern": pattern, "unknown": None}
+
+
+def _empty_table_counts() -> Dict[str, Any]:
+    return {"write": 0, "update": 0, "delete": 0, "read": {pattern: 0 for pattern in READ_PATTERNS + ("scan",)}}
+
+
+def summarize_fql(schema_info: Dict[str, Any], lines: Iterable[str],
+                  default_keyspace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Count the statements of an fqltool dump per table, op and read pattern.
+
+    Memory is bounded by the number of tables and a capped cache of
+    classified statement texts, not by the size of the dump.
+    """
+    tables = {}
+    unknown = {}
+    cache = {}
+    statements = 0
+    first_time = None
+    last_time = None
+
+    for start_time, keyspace, statement in iter_fql_statements(lines):
+        statements += 1
+        if start_time is not None:
+            first_time = start_time if first_time is None else min(first_time, start_time)
+            last_time = start_time if last_time is None else max(last_time, start_time)
+
+        cache_key = (keyspace, statement)
+        classified = cache.get(cache_key)
+        if classified is None:
+            if len(cache) >= MAX_CACHED_STATEMENTS:
+                cache.clear()
+            classified = classify_statement(schema_info, statement, keyspace or default_keyspace)
+            cache[cache_key] = classified
+
+        if not classified["table"]:
+            if classified["unknown"]:
+                unknown[classified["unknown"]] = unknown.get(classified["unknown"], 0) + 1
+            continue
+        counts = tables.setdefault(classified["table"], _empty_table_counts())
+        if classified["op"] == "read":
+            counts["read"][classified["pattern"]] += 1
+        else:
+            counts[classified["op"]] += 1
+
+    duration = (last_time - first_time) / 1000.0 if first_time is not None and last_time > first_time else None
+    return {
+        "statements": statements,
+        "duration_seconds": duration,
+        "statements_per_second": round(statements / duration, 1) if duration else None,
+        "tables": tables,
+        "unknown_tables": unknown
+    }
+
+
+def read_table_counts(lines: Iterable[str], default_keyspace: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Reads and writes per table ("keyspace.table") from nodetool tablestats
+    output or a CSV with table, reads and writes columns.
+    """
+    lines = iter(lines)
+    first = next((line for line in lines if line.strip()), "")
+    if "," in first and not first.lstrip().startswith("Keyspace"):
+        return _read_counts_csv(first, lines, default_keyspace)
+
+    counts = {}
+    keyspace = None
+    table = None
+    for line in itertools.chain([first], lines):
+        keyspace, table = _tablestats_line(line, counts, keyspace, table)
+    return counts
+
+
+def _tablestats_line(line: str, counts: Dict[str, Dict[str, int]], keyspace: Optional[str],
+                     table: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    for field, pattern in _TABLESTATS_PATTERNS.items():
+        match = pattern.match(line)
+        if not match:
+            continue
+        if field == "keyspace":
+            return match.group(1), None
+        if field == "table":
+            table = f"{keyspace}.{match.group(1)}" if keyspace else match.group(1)
+            counts.setdefault(table, {"reads": 0, "writes": 0})
+        elif table:
+            counts[table][field] += int(match.group(1))
+        break
+    return keyspace, table
+
+
+def _read_counts_csv(header: str, lines: Iterator[str],
+                     default_keyspace: Optional[str]) -> Dict[str, Dict[str, int]]:
+    columns = [column.strip().lower() for column in next(csv.reader([header]))]
+    if "table" not in columns:
+        raise ValueError("Table counts CSV needs a table column")
+
+    def column(*names: str) -> Optional[int]:
+        return next((columns.index(name) for name in names if name in columns), None)
+
+    table_index, keyspace_index = columns.index("table"), column("keyspace")
+    read_index, write_index = column("reads", "read_count"), column("writes", "write_count")
+    if read_index is None and write_index is None:
+        raise ValueError("Table counts CSV needs reads or writes columns")
+
+    counts = {}
+    for row in csv.reader(lines):
+        if len(row) <= table_index or not row[table_index].strip():
+            continue
+        table = row[table_index].strip()
+        keyspace = row[keyspace_index].strip() if keyspace_index is not None else default_keyspace
+        if keyspace and '.' not in table:
+            table = f"{keyspace}.{table}"
+        entry = counts.setdefault(table, {"reads": 0, "writes": 0})
+        for field, index in (("reads", read_index), ("writes", write_index)):
+            if index is not None and index < len(row) and row[index].strip():
+                entry[field] += int(float(row[index]))
+    return counts
+
+
+def build_capture_scenario(schema_info: Dict[str, Any], fql_summary: Optional[Dict[str, Any]],
+                           table_counts: Optional[Dict[str, Dict[str, int]]],
+                           options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mixed scenario spec reproducing a capture's op mix and table weights.
+
+    Returns the spec with the per-op shares it was built from and the
+    captured traffic it leaves out.
+    """
+    if not fql_summary and not table_counts:
+        raise ValueError("A full query log dump or table counts are needed")
+    captured = fql_summary["tables"] if fql_summary else {}
+
+    # Traffic per table and op: captured counts, rescaled to the table counts when given
+    traffic = {}
+    skipped = {}
+    for full_name, counts in captured.items():
+        for pattern, count in counts["read"].items():
+            if count and pattern not in REPLAYED_READ_PATTERNS:
+                skipped[f"{full_name} {pattern} read"] = count
+        if counts["delete"]:
+            skipped[f"{full_name} delete"] = counts["delete"]
+        traffic[full_name] = {
+            "write": counts["write"],
+            "update": counts["update"],
+            "read": {pattern: counts["read"][pattern] for pattern in REPLAYED_READ_PATTERNS}
+        }
+
+    # Table counts include ops that are not replayed; scale by the captured share of each
+    for table_ref, counts in (table_counts or {}).items():
+        resolved = _resolve_table(schema_info, table_ref, options["default_keyspace"])
+        if not resolved:
+            skipped[f"{table_ref} (not in schema)"] = counts["reads"] + counts["writes"]
+            continue
+        full_name = resolved[0]
+        entry = traffic.setdefault(full_name, {"write": 0, "update": 0, "read": {}})
+        if full_name in captured:
+            captured_reads = sum(captured[full_name]["read"].values())
+            captured_writes = sum(captured[full_name][op] for op in ("write", "update", "delete"))
+        else:
+            captured_reads = captured_writes = 0
+
+        if captured_reads:
+            entry["read"] = {pattern: counts["reads"] * count / captured_reads
+                             for pattern, count in entry["read"].items()}
+        else:
+            entry["read"] = {"point": counts["reads"]}
+        if captured_writes:
+            entry["write"] = counts["writes"] * entry["write"] / captured_writes
+            entry["update"] = counts["writes"] * entry["update"] / captured_writes
+        else:
+            entry["write"] = counts["writes"]
+
+    total = sum(entry["write"] + entry["update"] + sum(entry["read"].values()) for entry in traffic.values())
+    if not total:
+        raise ValueError("The captures hold no traffic the schema's tables can replay")
+
+    def ratio(count: float) -> int:
+        share = count / total
+        return int(round(share * RATIO_RESOLUTION)) if share >= options["min_share"] and count else 0
+
+    tables = []
+    shares = {}
+    replayed_statements = 0
+    for full_name, entry in traffic.items():
+        reads = sum(entry["read"].values())
+        spec_entry = {"table": full_name, "write": ratio(entry["write"]), "update": ratio(entry["update"]),
+                      "read": ratio(reads)}
+        pattern_ratios = {pattern: ratio(count) for pattern, count in entry["read"].items()}
+        if spec_entry["read"] and any(pattern_ratios.values()):
+            spec_entry["read_patterns"] = {"ratios": {pattern: pattern_ratios.get(pattern, 0)
+                                                      for pattern in READ_PATTERNS}}
+        elif spec_entry["read"]:
+            spec_entry["read"] = 0
+        if not (spec_entry["write"] or spec_entry["read"] or spec_entry["update"]):
+            continue
+        tables.append(spec_entry)
+        if full_name in captured:
+            replayed_statements += sum(captured[full_name][op] for op in ("write", "update") if spec_entry[op])
+            if spec_entry["read"]:
+                replayed_statements += sum(captured[full_name]["read"][pattern]
+                                           for pattern, count in pattern_ratios.items() if count)
+        shares[full_name] = {
+            "write": round(entry["write"] / total, 4),
+            "update": round(entry["update"] / total, 4),
+            "read": {pattern: round(count / total, 4) for pattern, count in entry["read"].items() if count}
+        }
+    if not tables:
+        raise ValueError(f"No op reaches min_share {options['min_share']} of the captured traffic")
+
+    cyclerate = options["cyclerate"]
+    rate_source = "configured"
+    replayed_share = None
+    if fql_summary and fql_summary["statements"]:
+        replayed_share = round(replayed_statements / fql_summary["statements"], 4)
+    if not cyclerate and replayed_share and fql_summary["statements_per_second"]:
+        # Only the replayed statements run at the target rate; the rest of the logged traffic is dropped
+        cyclerate = round(fql_summary["statements_per_second"] * replayed_share * options["rate_scale"], 1)
+        rate_source = "full query log"
+    if not cyclerate:
+        raise ValueError("No capture duration to derive a rate from; set cyclerate")
+
+    spec = dict(options["scenario"], tables=tables, cyclerate=cyclerate)
+    return {
+        "spec": spec,
+        "rate_source": rate_source,
+        "replayed_share": replayed_share,
+        "shares": shares,
+        "skipped": skipped,
+        "unknown_tables": fql_summary["unknown_tables"] if fql_summary else {}
+    }
@@ -0,0 +1,231 @@
+# backend/read_patterns.py
+"""
+Read access patterns for generated read workloads.
+
+Options (all optional):
+    {
+        "ratios": {"point": 3, "partition": 1, "range": 1, "index": 1, "index_range": 1, "ann": 1},
+        "partition_limit": 100,
+        "range_limit": 10,
+        "index_limit": 10,
+        "ann_limit": 10
+    }
+
+"point" reads one row by its full primary key, "partition" reads the first
+partition_limit rows of a partition and "range" reads range_limit rows of a
+partition starting at a clustering key, in clustering order. Each pattern
+becomes one op whose nb5 ratio is taken from "ratios"; a ratio of 0 drops
+the pattern. Patterns the table's primary key cannot serve (a table without
+clustering columns has no slices or ranges) are left out.
+
+"index" reads up to index_limit rows matching a value of an indexed column,
+one op per index; "index_range" reads rows from a value upwards and is only
+generated for SAI indexes on ordered types, as other indexes cannot serve
+range queries without ALLOW FILTERING. Collection indexes (on set, list or
+map columns, with or without a keys()/values()/entries()/full() target) are
+left out, as they can only be queried with CONTAINS / CONTAINS KEY.
+
+"ann" returns the ann_limit nearest neighbours of a vector through an SAI
+vector index (ORDER BY col ANN OF vec); vector indexes serve no other
+index pattern.
+"""
+import json
+from typing import Dict, List, Optional, Any
+
+from row_sizing import column_kind
+from vector_search import vector_type
+
+READ_PATTERNS = ("point", "partition", "range", "index", "index_range", "ann")
+
+DEFAULT_RATIOS = {"point": 3, "partition": 1, "range": 1, "index": 1, "index_range": 1, "ann": 1}
+DEFAULT_PARTITION_LIMIT = 100
+DEFAULT_RANGE_LIMIT = 10
+DEFAULT_INDEX_LIMIT = 10
+DEFAULT_ANN_LIMIT = 10
+
+# Column types SAI can serve range queries on
+RANGE_INDEX_TYPES = ("int", "bigint", "smallint", "tinyint", "varint", "decimal", "float", "double",
+                     "date", "time", "timestamp")
+
+# Column kinds (see row_sizing.column_kind) whose indexes only serve CONTAINS queries
+COLLECTION_KINDS = ("set", "list", "map")
+
+
+def normalize_read_patterns(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate read pattern options and fill in defaults"""
+    options = dict(options or {})
+    ratios = dict(DEFAULT_RATIOS)
+    for pattern, ratio in (options.get("ratios") or {}).items():
+        if pattern not in READ_PATTERNS:
+            raise ValueError(f"Unsupported read pattern: {pattern}. Expected one of {', '.join(READ_PATTERNS)}")
+        ratios[pattern] = int(ratio)
+
+    normalized = {
+        "ratios": ratios,
+        "partition_limit": int(options.get("partition_limit", DEFAULT_PARTITION_LIMIT)),
+        "range_limit": int(options.get("range_limit", DEFAULT_RANGE_LIMIT)),
+        "index_limit": int(options.get("index_limit", DEFAULT_INDEX_LIMIT)),
+        "ann_limit": int(options.get("ann_limit", DEFAULT_ANN_LIMIT))
+    }
+
+    if any(ratio < 0 for ratio in ratios.values()):
+        raise ValueError("Read pattern ratios must not be negative")
+    if not any(ratios.values()):
+        raise ValueError("At least one read pattern needs a positive ratio")
+    if min(normalized["partition_limit"], normalized["range_limit"], normalized["index_limit"],
+           normalized["ann_limit"]) < 1:
+        raise ValueError("partition_limit, range_limit, index_limit and ann_limit must be at least 1")
+
+    return normalized
+
+
+def parse_read_patterns_json(options_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse read pattern options passed as a JSON form field"""
+    if not options_json:
+        return None
+    return normalize_read_patterns(json.loads(options_json))
+
+
+def plan_read_ops(keyspace: str, table_name: str, columns: List[str],
+                  partition_columns: List[str], clustering_columns: List[str],
+                  clustering_order: Dict[str, str], bound_columns: List[str],
+                  options: Optional[Dict[str, Any]] = None, suffix: str = "",
+                  prefix: str = "", indexes: Optional[List[Dict[str, Any]]] = None,
+                  column_types: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Build the read ops a table supports.
+
+    bound_columns are the key columns the workload has bindings for (named
+    prefix + column + suffix). Index ops are added for the given indexes
+    (see index_ops). Returns one entry per pattern with its op name, ratio
+    and CQL statement.
+    """
+    options = options or normalize_read_patterns(None)
+    ratios = options["ratios"]
+    selected = ", ".join(columns)
+    source = f"FROM <<keyspace:{keyspace}>>.{table_name}"
+
+    def binding(col: str) -> str:
+        return f"{{{prefix}{col}{suffix}}}"
+
+    partition_where = [f"{col} = {binding(col)}" for col in partition_columns]
+    full_key = all(col in bound_columns for col in clustering_columns)
+
+    def statement(where: List[str], limit: int) -> str:
+        lines = [f"SELECT {selected}", source, f"WHERE {where[0]}"]
+        lines.extend(f"AND {condition}" for condition in where[1:])
+        lines.append(f"LIMIT {limit};")
+        return "\n".join(lines)
+
+    ops = []
+    if ratios["point"]:
+        where = list(partition_where)
+        if full_key:
+            where.extend(f"{col} = {binding(col)}" for col in clustering_columns)
+        ops.append({
+            "name": f"read_by_{partition_columns[0]}",
+            "pattern": "point",
+            "ratio": ratios["point"],
+            "stmt": statement(where, 1)
+        })
+
+    if clustering_columns and ratios["partition"]:
+        ops.append({
+            "name": f"read_partition_by_{partition_columns[0]}",
+            "pattern": "partition",
+            "ratio": ratios["partition"],
+            "stmt": statement(partition_where, options["partition_limit"])
+        })
+
+    first_clustering = clustering_columns[0] if clustering_columns else None
+    if first_clustering in bound_columns and ratios["range"]:
+        # Scan forward in clustering order from the sampled row
+        operator = "<=" if clustering_order.get(first_clustering, "ASC").upper() == "DESC" else ">="
+        ops.append({
+            "name": f"read_range_by_{first_clustering}",
+            "pattern": "range",
+            "ratio": ratios["range"],
+            "stmt": statement(partition_where + [f"{first_clustering} {operator} {binding(first_clustering)}"],
+                              options["range_limit"])
+        })
+
+    if indexes:
+        ops.extend(index_ops(keyspace, table_name, columns, column_types or {}, indexes, options, suffix, prefix))
+
+    if not ops:
+        raise ValueError(f"None of the enabled read patterns applies to {table_name}")
+    return ops
+
+
+def index_value_binding(column: str) -> str:
+    """Name of the binding producing values of an indexed column"""
+    return f"{column}_value"
+
+
+def index_ops(keyspace: str, table_name: str, columns: List[str], column_types: Dict[str, str],
+              indexes: List[Dict[str, Any]], options: Dict[str, Any],
+              suffix: str = "", prefix: str = "") -> List[Dict[str, Any]]:
+    """
+    Build the read ops that query through a table's indexes.
+
+    Values are bound to index_value_binding(column) + suffix, which must
+    produce values the write workload wrote. Returns entries like
+    plan_read_ops, plus the indexed column of each op.
+    """
+    ratios = options["ratios"]
+    selected = ", ".join(columns)
+
+    ops = []
+    for index in indexes:
+        column = index["column"]
+        if index.get("target") or column not in column_types:
+            continue
+        if column_kind(column_types[column]) in COLLECTION_KINDS:
+            continue
+        value = f"{{{prefix}{index_value_binding(column)}{suffix}}}"
+
+        def statement(condition: str) -> str:
+            return "\n".join([f"SELECT {selected}", f"FROM <<keyspace:{keyspace}>>.{table_name}",
+                              f"WHERE {condition}", f"LIMIT {options['index_limit']};"])
+
+        if vector_type(column_types[column]):
+            if ratios["ann"] and index.get("kind") == "sai":
+                ops.append({
+                    "name": f"ann_by_index_{index['name']}",
+                    "pattern": "ann",
+                    "label": f"ann {column}",
+                    "column": column,
+                    "ratio": ratios["ann"],
+                    "stmt": "\n".join([f"SELECT {selected}", f"FROM <<keyspace:{keyspace}>>.{table_name}",
+                                       f"ORDER BY {column} ANN OF {value}",
+                                       f"LIMIT {options['ann_limit']};"])
+                })
+            continue
+
+        if ratios["index"]:
+            ops.append({
+                "name": f"read_by_index_{index['name']}",
+                "pattern": "index",
+                "label": f"index {column}",
+                "column": column,
+                "ratio": ratios["index"],
+                "stmt": statement(f"{column} = {value}")
+            })
+        range_type = column_types[column].strip().lower() in RANGE_INDEX_TYPES
+        if ratios["index_range"] and index.get("kind") == "sai" and range_type:
+            ops.append({
+                "name": f"range_by_index_{index['name']}",
+                "pattern": "index_range",
+                "label": f"index range {column}",
+                "column": column,
+                "ratio": ratios["index_range"],
+                "stmt": statement(f"{column} >= {value}")
+            })
+
+    return ops
+
+
+def describe_read_ops(ops: List[Dict[str, Any]]) -> str:
+    """One-line description of the read mix used in generated YAML headers"""
+    total = sum(op["ratio"] for op in ops)
+    return ", ".join(f"{op.get('label', op['pattern'])} {op['ratio'] * 100 / total:.0f}%" for op in ops)
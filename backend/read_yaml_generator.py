@@ -1,16 +1,46 @@
 # read_yaml_generator.py
 
-import yaml
+import os
 import re
+import yaml_utils
 from typing import Dict, Any, Optional, Tuple
+from read_patterns import describe_read_ops, plan_read_ops
+from skew_profiles import (
+    check_sampler_csv,
+    describe_skew_profile,
+    is_skewed,
+    phase_cycles,
+    read_phases,
+    sampler_key_columns,
+    weight_column,
+)
+
+# Directory DSBulk unloads are written to when no CSV path is given
+DEFAULT_CSV_DIR = "dsbulk_output"
+
+def parse_create_statement(create_stmt: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the CREATE TABLE statement of a workload YAML.
+    
+    Returns the table's columns, primary key and clustering order, as
+    CQLParser reports them, or None if the statement does not parse.
+    """
+    # schema_parser imports this module
+    from schema_parser import CQLParser
+    
+    statement = re.sub(r'<<keyspace:([^>]+)>>', r'\1', create_stmt).strip()
+    if not statement.endswith(';'):
+        statement += ';'
+    tables = CQLParser().parse_cql(statement)["tables"]
+    return next(iter(tables.values()), None)
 
 def extract_table_info_from_ingest_yaml(yaml_content: str) -> Dict[str, Any]:
     """
     Extract table information from the ingest YAML file safely.
     """
     try:
-        # First, try to safely parse the YAML
-        data = yaml.safe_load(yaml_content)
+        # First, try to safely parse the YAML (cached by content, repaired if needed)
+        data = yaml_utils.load_tolerant(yaml_content)
         
         if not data or 'blocks' not in data or 'schema1' not in data['blocks']:
             raise ValueError("Invalid YAML structure: Missing expected blocks.schema1 section")
@@ -45,21 +75,10 @@ def extract_table_info_from_ingest_yaml(yaml_content: str) -> Dict[str, Any]:
                 if name_match:
                     table_name = name_match.group(1)
         
-        # Extract primary key
-        pk_match = re.search(r'PRIMARY\s+KEY\s*\(\s*([^)]+)\s*\)', create_stmt)
-        if pk_match:
-            pk_content = pk_match.group(1)
-            pk_parts = [part.strip() for part in pk_content.split(',')]
-            
-            # Check if first part is a composite key
-            if '(' in pk_parts[0] and ')' in pk_parts[0]:
-                composite_match = re.search(r'\(\s*([^)]+)\s*\)', pk_parts[0])
-                if composite_match:
-                    partition_keys = [k.strip() for k in composite_match.group(1).split(',')]
-                    primary_key_columns = partition_keys
-            else:
-                # Single partition key
-                primary_key_columns = [pk_parts[0]]
+        # Extract columns, primary key and clustering order
+        layout = parse_create_statement(create_stmt)
+        if layout and layout["primary_key"]:
+            primary_key_columns = layout["primary_key"][0]
         
         if not table_name:
             raise ValueError("Could not extract table name from the YAML file")
@@ -71,9 +90,13 @@ def extract_table_info_from_ingest_yaml(yaml_content: str) -> Dict[str, Any]:
             "table_name": table_name,
             "keyspace": keyspace,
             "primary_key": primary_key_columns[0],  # Use the first primary key column
+            "partition_key": primary_key_columns,
+            "clustering_columns": [col for part in layout["primary_key"][1:] for col in part],
+            "clustering_order": layout["clustering_order"],
+            "columns": list(layout["columns"])
         }
     
-    except yaml.YAMLError as e:
+    except yaml_utils.YAMLError as e:
         # Try a different approach for problematic YAML
         return extract_table_info_using_regex(yaml_content)
 
@@ -108,12 +131,31 @@ def extract_table_info_using_regex(yaml_content: str) -> Dict[str, Any]:
     return {
         "table_name": table_name,
         "keyspace": keyspace,
-        "primary_key": primary_key
+        "primary_key": primary_key,
+        "partition_key": [primary_key],
+        "clustering_columns": [],
+        "clustering_order": {},
+        "columns": [primary_key]
     }
 
-def generate_read_yaml_from_text(ingest_yaml_text: str, dsbulk_csv_path: str, keyspace: str = None) -> str:
+def default_csv_path(keyspace: str, table_name: str) -> str:
+    """
+    Path of the first CSV file written by a DSBulk unload of a table into DEFAULT_CSV_DIR.
+    """
+    return os.path.join(DEFAULT_CSV_DIR, f"{keyspace}_{table_name}", "output-000001.csv")
+
+def generate_read_yaml_from_text(ingest_yaml_text: str, dsbulk_csv_path: Optional[str] = None, keyspace: str = None,
+                                 skew_profile: Optional[Dict[str, Any]] = None,
+                                 read_patterns: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate a read YAML file from an ingest YAML file.
+    
+    With a skew profile that rotates the hot set, one read block per phase
+    samples its own weight column of the CSV. The CSV holds the full primary
+    key (partition key then clustering columns), every column sampled from
+    the same row, so reads are point reads, partition slices and clustering
+    ranges (see read_patterns). Clustering columns the CSV lacks are not
+    bound, which leaves the reads the partition key supports.
     """
     try:
         # Extract table info
@@ -122,36 +164,66 @@ def generate_read_yaml_from_text(ingest_yaml_text: str, dsbulk_csv_path: str, ke
         # Use provided keyspace if specified, otherwise use the one from the ingest YAML
         ks = keyspace if keyspace else table_info["keyspace"]
         
-        # Get the primary key and table name
-        primary_key = table_info["primary_key"]
+        # Get the key columns and table name
+        partition_columns = table_info["partition_key"]
         table_name = table_info["table_name"]
         
-        # Create the read YAML as a dictionary first
+        if not dsbulk_csv_path:
+            dsbulk_csv_path = default_csv_path(ks, table_name)
+        bound_columns = sampler_key_columns(dsbulk_csv_path, partition_columns,
+                                            partition_columns + table_info["clustering_columns"])
+        csv_warning = check_sampler_csv(dsbulk_csv_path, bound_columns[0], skew_profile)
+        
+        # Create the read YAML as a dictionary first, with one read block per skew phase
+        phases = read_phases(skew_profile, "read1")
+        cycles = phase_cycles(skew_profile, "TEMPLATE(read-cycles,1000)")
+        phase_ops = {
+            phase["block"]: plan_read_ops(
+                ks, table_name, table_info["columns"], partition_columns, table_info["clustering_columns"],
+                table_info["clustering_order"], bound_columns, read_patterns, phase["suffix"]
+            )
+            for phase in phases
+        }
         read_yaml_dict = {
             "scenarios": {
                 "default": {
-                    "read1": "run driver=cql tags='block:read1' cycles==TEMPLATE(read-cycles,1000) threads=auto"
+                    phase["block"]: f"run driver=cql tags='block:{phase['block']}' cycles=={cycles} threads=auto"
+                    for phase in phases
                 }
             },
+            # Key columns in CSVSampler format, all weighted by the first key column
             "bindings": {
-                primary_key: f"CSVSampler('{primary_key}','{primary_key}-weight','{dsbulk_csv_path}')"
+                f"{key_col}{phase['suffix']}": (
+                    f"CSVSampler('{key_col}','{weight_column(bound_columns[0], phase['phase'])}','{dsbulk_csv_path}')"
+                )
+                for phase in phases
+                for key_col in bound_columns
             },
             "blocks": {
-                "read1": {
+                phase["block"]: {
                     "params": {
                         "cl": "TEMPLATE(read_cl,LOCAL_QUORUM)",
                         "instrument": True,
                         "prepared": True
                     },
                     "ops": {
-                        f"read_by_{primary_key}": f"SELECT {primary_key}, insertedtimestamp \nFROM <<keyspace:{ks}>>.{table_name}\nWHERE {primary_key} = {{{primary_key}}}\nLIMIT 1;"
+                        op["name"]: op["stmt"] if len(phase_ops[phase["block"]]) == 1
+                        else {"ratio": op["ratio"], "stmt": op["stmt"]}
+                        for op in phase_ops[phase["block"]]
                     }
                 }
+                for phase in phases
             }
         }
         
         # Convert to YAML
-        read_yaml = yaml.safe_dump(read_yaml_dict, default_flow_style=False, sort_keys=False)
+        read_yaml = yaml_utils.dump(read_yaml_dict)
+        if len(phase_ops[phases[0]["block"]]) > 1:
+            read_yaml = f"# Read mix: {describe_read_ops(phase_ops[phases[0]['block']])}\n" + read_yaml
+        if is_skewed(skew_profile):
+            if csv_warning:
+                read_yaml = f"# Warning: {csv_warning}\n" + read_yaml
+            read_yaml = f"# Key skew: {describe_skew_profile(skew_profile)}\n" + read_yaml
         
         return read_yaml
         
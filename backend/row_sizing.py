@@ -0,0 +1,262 @@
+# backend/row_sizing.py
+"""
+Row-size targeting for generated write workloads.
+
+Options (all optional):
+    {
+        "target_row_bytes": 4096,
+        "distribution": "uniform",
+        "spread": 0.5,
+        "column_bytes": {"payload": 2048, "tags": {"bytes": 512, "distribution": "fixed"}},
+        "rows_per_partition": 1,
+        "tables": {"shop.orders": {"target_row_bytes": 8192}}
+    }
+
+The byte budget left after fixed-size columns and key columns is spread
+evenly over the text, blob and collection columns that have no explicit
+size. "uniform" draws each value's size from avg * (1 +/- spread); "fixed"
+makes every value the average size. Entries under "tables" override the
+top-level options for one table.
+"""
+import json
+import re
+from typing import Dict, List, Optional, Any
+
+from vector_search import vector_type
+
+SIZE_DISTRIBUTIONS = ("fixed", "uniform")
+DEFAULT_SPREAD = 0.5
+
+# Serialized sizes of fixed-width CQL types
+FIXED_TYPE_BYTES = {
+    "uuid": 16, "timeuuid": 16, "timestamp": 8, "bigint": 8, "counter": 8,
+    "int": 4, "date": 4, "time": 8, "smallint": 2, "tinyint": 1,
+    "boolean": 1, "double": 8, "float": 4, "decimal": 8, "varint": 8,
+    "inet": 16, "duration": 12
+}
+
+# Sizes produced by the default (unsized) bindings
+DEFAULT_TEXT_BYTES = 36
+NUMBER_NAME_BYTES = 12
+DEFAULT_COLLECTION_ENTRIES = 3
+
+# Entries per generated collection when its byte budget goes to text values
+SIZED_COLLECTION_ENTRIES = 5
+
+# Character image shared by variable-length text bindings
+TEXT_CHARSET = "A-Za-z0-9 _|/"
+CHARBUF_IMAGE_SIZE = 16 * 1024 * 1024
+
+_TEXT_TYPES = ("text", "varchar", "ascii")
+
+
+def normalize_row_size_options(options: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Validate row-size options and fill in defaults; empty means unsized"""
+    if not options:
+        return None
+
+    distribution = options.get("distribution", "fixed")
+    if distribution not in SIZE_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported size distribution: {distribution}. Expected one of {', '.join(SIZE_DISTRIBUTIONS)}")
+
+    normalized = {
+        "target_row_bytes": int(options["target_row_bytes"]) if options.get("target_row_bytes") else None,
+        "distribution": distribution,
+        "spread": float(options.get("spread", DEFAULT_SPREAD)),
+        "column_bytes": {},
+        "rows_per_partition": int(options.get("rows_per_partition", 1)),
+        "tables": options.get("tables", {})
+    }
+
+    if normalized["target_row_bytes"] is not None and normalized["target_row_bytes"] < 1:
+        raise ValueError("target_row_bytes must be positive")
+    if not 0 <= normalized["spread"] < 1:
+        raise ValueError("spread must be in [0, 1)")
+    if normalized["rows_per_partition"] < 1:
+        raise ValueError("rows_per_partition must be at least 1")
+
+    for column, spec in (options.get("column_bytes") or {}).items():
+        if not isinstance(spec, dict):
+            spec = {"bytes": spec}
+        column_distribution = spec.get("distribution", distribution)
+        if column_distribution not in SIZE_DISTRIBUTIONS:
+            raise ValueError(f"Unsupported size distribution for {column}: {column_distribution}")
+        normalized["column_bytes"][column] = {
+            "bytes": max(1, int(spec["bytes"])),
+            "distribution": column_distribution,
+            "spread": float(spec.get("spread", normalized["spread"]))
+        }
+
+    return normalized
+
+
+def parse_row_size_json(options_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse row-size options passed as a JSON form field"""
+    if not options_json:
+        return None
+    return normalize_row_size_options(json.loads(options_json))
+
+
+def resolve_row_size_options(options: Optional[Dict[str, Any]], full_table_name: str,
+                             table_name: str) -> Optional[Dict[str, Any]]:
+    """Merge a table's entry under "tables" over the top-level options"""
+    if not options:
+        return None
+    table_options = options["tables"].get(full_table_name) or options["tables"].get(table_name)
+    if not table_options:
+        return options
+
+    merged = {key: value for key, value in options.items() if key not in ("tables", "column_bytes")}
+    merged.update({key: value for key, value in table_options.items() if key != "column_bytes"})
+    merged["column_bytes"] = dict(options["column_bytes"])
+    merged["column_bytes"].update(table_options.get("column_bytes", {}))
+    return normalize_row_size_options(merged)
+
+
+def normalize_cql_type(cql_type: str) -> str:
+    return cql_type.strip().rstrip(',').strip().lower()
+
+
+def column_kind(cql_type: str) -> str:
+    """Size class of a column: fixed, text, blob, map, list, set or other"""
+    cql_type = normalize_cql_type(cql_type)
+    if cql_type.startswith("frozen<"):
+        cql_type = cql_type[len("frozen<"):-1].strip()
+    if cql_type in FIXED_TYPE_BYTES or vector_type(cql_type):
+        return "fixed"
+    if cql_type in _TEXT_TYPES:
+        return "text"
+    if cql_type == "blob":
+        return "blob"
+    for kind in ("map", "list", "set"):
+        if cql_type.startswith(f"{kind}<"):
+            return kind
+    return "other"
+
+
+def _value_type(cql_type: str) -> str:
+    """Element type of a list or set, value type of a map"""
+    inner = re.search(r"<(.*)>", normalize_cql_type(cql_type))
+    if not inner:
+        return "text"
+    return inner.group(1).split(',')[-1].strip()
+
+
+def _size_range(average: int, distribution: str, spread: float) -> Optional[tuple]:
+    if distribution == "fixed" or spread == 0:
+        return None
+    return max(1, int(average * (1 - spread))), max(1, int(round(average * (1 + spread))))
+
+
+def _size_spec(average: int, distribution: str, spread: float) -> str:
+    size_range = _size_range(average, distribution, spread)
+    return f"HashRange({size_range[0]},{size_range[1]})" if size_range else str(average)
+
+
+def sized_binding(cql_type: str, size_bytes: int, distribution: str = "fixed", spread: float = DEFAULT_SPREAD) -> Optional[str]:
+    """nb5 binding producing values of about size_bytes for a variable-size column"""
+    kind = column_kind(cql_type)
+
+    if kind == "text":
+        if _size_range(size_bytes, distribution, spread) is None:
+            return f"AlphaNumericString({size_bytes})"
+        return (f"CharBufImage('{TEXT_CHARSET}',{CHARBUF_IMAGE_SIZE},"
+                f"{_size_spec(size_bytes, distribution, spread)}); ToString()")
+
+    if kind == "blob":
+        return f"ByteBufferSizedHashed({_size_spec(size_bytes, distribution, spread)})"
+
+    if kind in ("map", "list", "set"):
+        entries, value_bytes = _collection_layout(kind, cql_type, size_bytes)
+        value_function = (f"AlphaNumericString({value_bytes})"
+                          if column_kind(_value_type(cql_type)) == "text" else "NumberNameToString()")
+        count = _size_spec(entries, distribution, spread)
+        if kind == "map":
+            return f"MapSizedStepped({count}, NumberNameToString(), {value_function})"
+        if kind == "list":
+            return f"ListSizedStepped({count}, {value_function})"
+        return f"SetSizedStepped({count}, {value_function})"
+
+    return None
+
+
+def _collection_layout(kind: str, cql_type: str, size_bytes: int) -> tuple:
+    """Entry count and value size that add up to about size_bytes"""
+    key_bytes = NUMBER_NAME_BYTES if kind == "map" else 0
+    if column_kind(_value_type(cql_type)) == "text":
+        entries = SIZED_COLLECTION_ENTRIES
+        return entries, max(1, size_bytes // entries - key_bytes)
+    return max(1, round(size_bytes / (key_bytes + NUMBER_NAME_BYTES))), NUMBER_NAME_BYTES
+
+
+def _default_bytes(kind: str, cql_type: str) -> int:
+    """Average size produced by the unsized bindings"""
+    if kind == "fixed":
+        vector = vector_type(cql_type)
+        if vector:
+            return vector[1] * FIXED_TYPE_BYTES.get(vector[0], 4)
+        return FIXED_TYPE_BYTES[normalize_cql_type(cql_type).replace("frozen<", "").rstrip(">")]
+    if kind == "map":
+        return DEFAULT_COLLECTION_ENTRIES * 2 * NUMBER_NAME_BYTES
+    if kind in ("list", "set"):
+        return DEFAULT_COLLECTION_ENTRIES * NUMBER_NAME_BYTES
+    return DEFAULT_TEXT_BYTES
+
+
+def plan_column_sizes(columns: Dict[str, str], key_columns: List[str],
+                      options: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Decide the size of every column.
+
+    Returns, per column, its kind, average bytes and, for columns whose size
+    the options control, the sized binding to use.
+    """
+    plan = {}
+    column_bytes = options["column_bytes"] if options else {}
+
+    for column, cql_type in columns.items():
+        kind = column_kind(cql_type)
+        plan[column] = {"kind": kind, "bytes": _default_bytes(kind, cql_type), "binding": None}
+
+        if column in column_bytes and kind not in ("fixed", "other"):
+            spec = column_bytes[column]
+            plan[column].update(bytes=spec["bytes"], binding=sized_binding(
+                cql_type, spec["bytes"], spec["distribution"], spec["spread"]
+            ))
+
+    if not options or not options["target_row_bytes"]:
+        return plan
+
+    # Spread what is left of the target over the remaining variable columns
+    flexible = [
+        column for column, entry in plan.items()
+        if entry["kind"] in ("text", "blob", "map", "list", "set")
+        and column not in column_bytes and column not in key_columns
+    ]
+    if not flexible:
+        return plan
+
+    reserved = sum(entry["bytes"] for column, entry in plan.items() if column not in flexible)
+    share = max(1, (options["target_row_bytes"] - reserved) // len(flexible))
+    for column in flexible:
+        plan[column].update(bytes=share, binding=sized_binding(
+            columns[column], share, options["distribution"], options["spread"]
+        ))
+
+    return plan
+
+
+def size_header(plan: Dict[str, Dict[str, Any]], options: Optional[Dict[str, Any]],
+                rows_per_partition: Optional[int] = None) -> List[str]:
+    """YAML comment lines reporting the estimated row and partition size"""
+    row_bytes = sum(entry["bytes"] for entry in plan.values())
+    variable_bytes = sum(entry["bytes"] for entry in plan.values() if entry["kind"] != "fixed")
+    rows = rows_per_partition or (options["rows_per_partition"] if options else 1)
+
+    lines = [f"# Estimated row size: {row_bytes} bytes of payload "
+             f"({row_bytes - variable_bytes} fixed-width, {variable_bytes} text/blob/collection)"]
+    if options and options["target_row_bytes"]:
+        lines[0] += f", target {options['target_row_bytes']} bytes ({options['distribution']})"
+    lines.append(f"# Estimated partition size: {row_bytes * rows} bytes "
+                 f"({rows} row{'s' if rows != 1 else ''} per partition)")
+    return lines
@@ -0,0 +1,227 @@
+# backend/sample_cache.py
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+# Defaults for cached key samples
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+# Cluster name samples are cached and looked up under when none is given
+DEFAULT_CLUSTER = "default"
+
+SAMPLE_FILENAME = "sampler.csv"
+META_FILENAME = "meta.json"
+
+# Entry keys are the first 32 hex digits of a sha256 (see make_key)
+KEY_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class KeySampleCache:
+    """
+    Local cache of sampler-ready key CSVs produced by DSBulk unloads.
+
+    Entries are keyed by (cluster, keyspace, table, primary key columns,
+    sample size, strategy) and expire after a TTL. When the cache grows past
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str = None, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        # Default to a common location if not specified
+        self.cache_dir = cache_dir or os.path.expanduser("~/workspace/benchwave-cache/key-samples")
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def make_spec(self, cluster: str, keyspace: str, table: str, primary_key_columns: List[str],
+                  sample_size: int, strategy: str) -> Dict[str, Any]:
+        """Normalize the identifying fields of a key sample"""
+        return {
+            "cluster": cluster.strip().lower(),
+            "keyspace": keyspace.strip(),
+            "table": table.strip(),
+            "primary_key": [col.strip() for col in primary_key_columns if col.strip()],
+            "sample_size": int(sample_size or 0),
+            "strategy": strategy
+        }
+
+    def make_key(self, spec: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+    def get(self, spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the fresh entry for a spec, or None"""
+        with self._lock:
+            entry = self._read_entry(self.make_key(spec))
+            if entry is None or self._is_expired(entry):
+                return None
+            self._touch(entry)
+            return entry
+
+    def find(self, cluster: str, keyspace: str, table: str,
+             primary_key_columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the newest fresh entry for a table, whatever its size or strategy.
+
+        When primary_key_columns is given the entry must sample the same columns.
+        """
+        cluster = cluster.strip().lower()
+        pk = [col.strip() for col in primary_key_columns if col.strip()] if primary_key_columns else None
+        with self._lock:
+            candidates = [
+                entry for entry in self._all_entries()
+                if not self._is_expired(entry)
+                and entry["spec"]["cluster"] == cluster
+                and entry["spec"]["keyspace"] == keyspace
+                and entry["spec"]["table"] == table
+                and (pk is None or entry["spec"]["primary_key"] == pk)
+            ]
+            if not candidates:
+                return None
+            entry = max(candidates, key=lambda e: e["created_at"])
+            self._touch(entry)
+            return entry
+
+    def put(self, spec: Dict[str, Any], sample_csv_path: str, stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Copy a sampler CSV into the cache and return its entry"""
+        key = self.make_key(spec)
+        entry_dir = os.path.join(self.cache_dir, key)
+
+        with self._lock:
+            os.makedirs(entry_dir, exist_ok=True)
+            cached_path = os.path.join(entry_dir, SAMPLE_FILENAME)
+            temp_path = cached_path + ".tmp"
+            shutil.copyfile(sample_csv_path, temp_path)
+            os.replace(temp_path, cached_path)
+
+            now = time.time()
+            entry = {
+                "key": key,
+                "spec": spec,
+                "csv_path": cached_path,
+                "size_bytes": os.path.getsize(cached_path),
+                "created_at": now,
+                "last_access": now,
+                "stats": stats or {}
+            }
+            self._write_entry(entry)
+            self._evict()
+            return entry
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove one entry; returns whether it existed.
+
+        Raises ValueError when key is not in the cache's own key format.
+        """
+        if not self.is_valid_key(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        with self._lock:
+            entry_dir = self._entry_dir(key)
+            if not os.path.isdir(entry_dir):
+                return False
+            self._remove_entry(key)
+            return True
+
+    @staticmethod
+    def is_valid_key(key: str) -> bool:
+        return bool(KEY_PATTERN.match(key or ""))
+
+    def list_entries(self) -> List[Dict[str, Any]]:
+        """List all entries with their freshness, most recent first"""
+        with self._lock:
+            entries = self._all_entries()
+        for entry in entries:
+            entry["expired"] = self._is_expired(entry)
+            entry["expires_at"] = entry["created_at"] + self.ttl_seconds
+        return sorted(entries, key=lambda e: e["created_at"], reverse=True)
+
+    def evict(self) -> int:
+        """Drop expired entries and enforce the size limit; returns the number removed"""
+        with self._lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        removed = 0
+        entries = self._all_entries()
+
+        # Expired entries first
+        live = []
+        for entry in entries:
+            if self._is_expired(entry):
+                if self._remove_entry(entry["key"]):
+                    removed += 1
+            else:
+                live.append(entry)
+
+        # Then least recently used until under the size limit
+        total = sum(entry["size_bytes"] for entry in live)
+        for entry in sorted(live, key=lambda e: e["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if self._remove_entry(entry["key"]):
+                total -= entry["size_bytes"]
+                removed += 1
+
+        return removed
+
+    def _entry_dir(self, key: str) -> str:
+        """Resolve an entry directory, refusing anything outside cache_dir"""
+        if not self.is_valid_key(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        root = os.path.realpath(self.cache_dir)
+        entry_dir = os.path.realpath(os.path.join(root, key))
+        if os.path.dirname(entry_dir) != root:
+            raise ValueError(f"Cache entry {key!r} resolves outside {root}")
+        return entry_dir
+
+    def _remove_entry(self, key: str) -> bool:
+        """Delete an entry directory; skips keys that fail validation"""
+        try:
+            entry_dir = self._entry_dir(key)
+        except ValueError:
+            return False
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return True
+
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def _touch(self, entry: Dict[str, Any]):
+        entry["last_access"] = time.time()
+        self._write_entry(entry)
+
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_path = os.path.join(self.cache_dir, key, META_FILENAME)
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or not os.path.exists(entry.get("csv_path", "")):
+            return None
+        return entry
+
+    def _write_entry(self, entry: Dict[str, Any]):
+        meta_path = os.path.join(self.cache_dir, entry["key"], META_FILENAME)
+        temp_path = meta_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temp_path, meta_path)
+
+    def _all_entries(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            if not self.is_valid_key(key):
+                continue
+            entry = self._read_entry(key)
+            if entry is not None:
+                entries.append(entry)
+        return entries
@@ -0,0 +1,285 @@
+# backend/scenario_builder.py
+"""
+Mixed read/write/update scenarios at a target rate.
+
+Spec:
+    {
+        "tables": [
+            {"table": "shop.orders", "write": 1, "read": 4, "update": 1},
+            {"table": "shop.users", "read": 2, "read_patterns": {"ratios": {"point": 1, "partition": 0}}}
+        ],
+        "cyclerate": 5000,
+        "threads": "auto",
+        "key_count": 1000000,
+        "phases": {"warmup_seconds": 60, "measure_seconds": 300, "cooldown_seconds": 60},
+        "read_patterns": {"ratios": {"point": 3, "partition": 1}},
+        "skew_profile": {"type": "zipf", "exponent": 1.1},
+        "row_size": {"target_row_bytes": 1024},
+        "partitioning": {"rows_per_partition": 100},
+        "vectors": {"distribution": "clustered", "clusters": 100}
+    }
+
+Every table is expected to hold key_count rows written by its generated
+write workload (or the key_count of its partition options). Reads and
+updates pick one of those rows; writes add new rows after them. The op
+ratios of all tables share one cyclerate, so each op runs at
+cyclerate * ratio / total ratio ops per second. The phases run the same
+ops back to back at that rate over consecutive cycle ranges; only their
+activity alias differs, so measure-phase metrics are reported apart from
+warmup and cooldown. A table's own "read_patterns" replace the scenario's
+for its reads.
+"""
+import json
+import math
+from fractions import Fraction
+from functools import reduce
+from typing import Dict, List, Any
+
+from partition_model import normalize_partition_options
+from read_patterns import normalize_read_patterns, plan_read_ops
+from row_sizing import normalize_row_size_options
+from skew_profiles import describe_skew_profile, key_index_binding, normalize_skew_profile
+from vector_search import normalize_vector_options
+
+OP_TYPES = ("write", "read", "update")
+PHASES = ("warmup", "measure", "cooldown")
+
+DEFAULT_KEY_COUNT = 1000000
+DEFAULT_PHASE_SECONDS = {"warmup": 60, "measure": 300, "cooldown": 60}
+
+
+def normalize_scenario_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a mixed scenario spec and fill in defaults"""
+    if not isinstance(spec, dict):
+        raise ValueError("A scenario spec must be a JSON object")
+    if not spec.get("tables"):
+        raise ValueError("A scenario needs at least one table")
+    if not isinstance(spec["tables"], list):
+        raise ValueError("tables must be a list of table entries")
+    if not spec.get("cyclerate"):
+        raise ValueError("A scenario needs a cyclerate target")
+
+    tables = []
+    for entry in spec["tables"]:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Every scenario table must be an object, got {entry!r}")
+        if not entry.get("table"):
+            raise ValueError("Every scenario table needs a table name")
+        ratios = {op_type: int(entry.get(op_type, 0)) for op_type in OP_TYPES}
+        if any(ratio < 0 for ratio in ratios.values()):
+            raise ValueError(f"Op ratios of {entry['table']} must not be negative")
+        if not any(ratios.values()):
+            raise ValueError(f"{entry['table']} needs a positive write, read or update ratio")
+        tables.append({"table": entry["table"], "ratios": ratios,
+                       "update_columns": entry.get("update_columns"),
+                       "read_patterns": normalize_read_patterns(entry["read_patterns"])
+                       if entry.get("read_patterns") else None})
+
+    phases = spec.get("phases") or {}
+    if not isinstance(phases, dict):
+        raise ValueError("phases must be an object of <phase>_seconds durations")
+    normalized = {
+        "tables": tables,
+        "cyclerate": float(spec["cyclerate"]),
+        "threads": str(spec.get("threads", "auto")),
+        "key_count": int(spec.get("key_count", DEFAULT_KEY_COUNT)),
+        "phases": {
+            phase: int(phases.get(f"{phase}_seconds", DEFAULT_PHASE_SECONDS[phase]))
+            for phase in PHASES
+        },
+        "read_patterns": normalize_read_patterns(spec.get("read_patterns")),
+        "skew_profile": normalize_skew_profile(spec["skew_profile"]) if spec.get("skew_profile") else None,
+        "row_size": normalize_row_size_options(spec.get("row_size")),
+        "partitioning": normalize_partition_options(spec.get("partitioning")),
+        "vectors": normalize_vector_options(spec.get("vectors"))
+    }
+
+    if normalized["cyclerate"] <= 0:
+        raise ValueError("cyclerate must be positive")
+    if normalized["key_count"] < 1:
+        raise ValueError("key_count must be at least 1")
+    if any(seconds < 0 for seconds in normalized["phases"].values()):
+        raise ValueError("Phase durations must not be negative")
+    if not normalized["phases"]["measure"]:
+        raise ValueError("The measure phase needs a positive duration")
+
+    return normalized
+
+
+def parse_scenario_json(spec_json: str) -> Dict[str, Any]:
+    """Parse a mixed scenario spec passed as a JSON form field"""
+    return normalize_scenario_spec(json.loads(spec_json))
+
+
+def phase_steps(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Cycle range of each phase with a non-zero duration, at the target rate"""
+    steps = []
+    start = 0
+    for phase in PHASES:
+        seconds = spec["phases"][phase]
+        if not seconds:
+            continue
+        cycles = int(math.ceil(seconds * spec["cyclerate"]))
+        steps.append({"phase": phase, "seconds": seconds, "start": start, "end": start + cycles})
+        start += cycles
+    return steps
+
+
+def _table_ops(parser, schema_info: Dict[str, Any], entry: Dict[str, Any],
+               spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Bindings and weighted ops for one table of the scenario"""
+    full_name, table_info = parser.find_table(schema_info, entry["table"])
+    if not table_info:
+        raise ValueError(f"Table {entry['table']} not found in the schema")
+    if not table_info["primary_key"]:
+        raise ValueError(f"Table {full_name} has no primary key")
+
+    plan = parser.write_plan(table_info, full_name, spec["row_size"], spec["partitioning"],
+                             spec["vectors"])
+    key_count = plan["partitioning"]["key_count"] if plan["partitioning"] else spec["key_count"]
+    keyspace = table_info["keyspace"] or "baselines"
+    table_name = table_info["name"]
+    alias = full_name.replace('.', '_')
+
+    partition_columns = table_info["primary_key"][0]
+    clustering_columns = [col for part in table_info["primary_key"][1:] for col in part]
+    key_columns = partition_columns + clustering_columns
+    columns = list(table_info["columns"])
+
+    # New rows continue after the loaded ones; existing rows are re-derived from a loaded cycle
+    bindings = {}
+    for col, binding in plan["bindings"].items():
+        bindings[f"{alias}_w_{col}"] = f"Add({key_count}L); {binding}"
+    index_binding = key_index_binding(spec["skew_profile"], key_count)
+    for col in key_columns:
+        bindings[f"{alias}_{col}"] = f"{index_binding}; {plan['bindings'][col]}"
+
+    # Weighted ops; read ratios are split over the read patterns
+    ratios = entry["ratios"]
+    read_ops = []
+    if ratios["read"]:
+        read_ops = plan_read_ops(keyspace, table_name, columns, partition_columns, clustering_columns,
+                                 table_info["clustering_order"], key_columns,
+                                 entry["read_patterns"] or spec["read_patterns"], prefix=f"{alias}_")
+    pattern_total = sum(op["ratio"] for op in read_ops)
+
+    ops = []
+    if ratios["write"]:
+        ops.append({
+            "name": f"{alias}_write",
+            "type": "write",
+            "table": full_name,
+            "weight": Fraction(ratios["write"]),
+            "stmt": "\n".join([
+                f"INSERT INTO <<keyspace:{keyspace}>>.{table_name} ({', '.join(columns)})",
+                f"VALUES ({', '.join('{' + alias + '_w_' + col + '}' for col in columns)});"
+            ])
+        })
+
+    for op in read_ops:
+        ops.append({
+            "name": f"{alias}_{op['name']}",
+            "type": "read",
+            "table": full_name,
+            "weight": Fraction(ratios["read"] * op["ratio"], pattern_total),
+            "stmt": op["stmt"]
+        })
+
+    if ratios["update"]:
+        update_columns = entry["update_columns"] or [col for col in columns if col not in key_columns]
+        unknown = [col for col in update_columns if col not in table_info["columns"] or col in key_columns]
+        if unknown:
+            raise ValueError(f"Cannot update {', '.join(unknown)} of {full_name}: not a non-key column")
+        if not update_columns:
+            raise ValueError(f"{full_name} has no non-key columns to update")
+        assignments = ", ".join(f"{col} = {{{alias}_w_{col}}}" for col in update_columns)
+        conditions = [f"{col} = {{{alias}_{col}}}" for col in key_columns]
+        ops.append({
+            "name": f"{alias}_update",
+            "type": "update",
+            "table": full_name,
+            "weight": Fraction(ratios["update"]),
+            "stmt": "\n".join(
+                [f"UPDATE <<keyspace:{keyspace}>>.{table_name}", f"SET {assignments}", f"WHERE {conditions[0]}"]
+                + [f"AND {condition}" for condition in conditions[1:]]
+            ) + ";"
+        })
+
+    return {
+        "table": full_name,
+        "key_count": key_count,
+        "create": parser.create_table_statement(table_info),
+        "bindings": bindings,
+        "ops": ops
+    }
+
+
+def build_mixed_scenario(parser, schema_info: Dict[str, Any], spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build one nb5 workload mixing writes, reads and updates over several tables.
+
+    parser is a CQLParser. Returns the YAML and the plan: every op with its
+    ratio and target rate, and the cycle range of every phase.
+    """
+    tables = [_table_ops(parser, schema_info, entry, spec) for entry in spec["tables"]]
+    ops = [op for table in tables for op in table["ops"]]
+
+    # Smallest integer ratios with the same proportions
+    multiple = reduce(lambda a, b: a * b // math.gcd(a, b), (op["weight"].denominator for op in ops))
+    divisor = reduce(math.gcd, (int(op["weight"] * multiple) for op in ops))
+    for op in ops:
+        op["ratio"] = int(op.pop("weight") * multiple) // divisor
+    total = sum(op["ratio"] for op in ops)
+    for op in ops:
+        op["target_rate"] = round(spec["cyclerate"] * op["ratio"] / total, 1)
+
+    steps = phase_steps(spec)
+    rate = f"{spec['cyclerate']:g}"
+
+    lines = [
+        f"# Mixed workload over {', '.join(table['table'] for table in tables)} at {rate} ops/s",
+        "# Op targets: " + ", ".join(f"{op['name']} {op['target_rate']:g} ops/s" for op in ops),
+        "# Phases: " + ", ".join(f"{step['phase']} {step['seconds']}s" for step in steps)
+    ]
+    if spec["skew_profile"]:
+        lines.append(f"# Key skew: {describe_skew_profile(spec['skew_profile'])}")
+    lines.extend([
+        "scenarios:",
+        "  default:",
+        "    schema: run driver=cql tags=block:schema threads==1 cycles==UNDEF"
+    ])
+    for step in steps:
+        lines.append(
+            f"    {step['phase']}: run driver=cql tags=block:main alias={step['phase']} "
+            f"cycles=={step['start']}..{step['end']} cyclerate=TEMPLATE(cyclerate,{rate}) "
+            f"threads={spec['threads']}"
+        )
+    lines.extend(["", "bindings:"])
+    for table in tables:
+        for name, binding in table["bindings"].items():
+            lines.append(f"  {name}: {binding};")
+
+    lines.extend(["", "blocks:", "  schema:", "    params:", "      prepared: false", "    ops:"])
+    for table in tables:
+        lines.append(f"      create_{table['table'].replace('.', '_')}: |")
+        lines.extend(f"        {line}" for line in table["create"])
+
+    lines.extend([
+        "  main:",
+        "    params:",
+        "      cl: TEMPLATE(cl,LOCAL_QUORUM)",
+        "      instrument: true",
+        "      prepared: true",
+        "    ops:"
+    ])
+    for op in ops:
+        lines.extend([f"      {op['name']}:", f"        ratio: {op['ratio']}", "        stmt: |"])
+        lines.extend(f"          {line}" for line in op["stmt"].split("\n"))
+
+    return {
+        "yaml": "\n".join(lines) + "\n",
+        "cyclerate": spec["cyclerate"],
+        "ops": [{key: value for key, value in op.items() if key != "stmt"} for op in ops],
+        "phases": steps,
+        "key_counts": {table["table"]: table["key_count"] for table in tables}
+    }
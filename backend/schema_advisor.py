@@ -0,0 +1,258 @@
+# backend/schema_advisor.py
+"""
+Performance review of a parsed schema.
+
+Checks every table of a schema parsed by CQLParser.parse_cql for:
+
+    unbounded_partition     warning  time-ordered clustering without a time bucket
+                                     in the partition key or a TTL
+    low_cardinality_key     warning  partition key made only of low-cardinality columns
+    collection_heavy_rows   warning  several non-frozen collections per row
+    too_many_indexes        warning  more than one secondary index, or many indexes
+    simple_strategy         error    SimpleStrategy while other keyspaces span several DCs
+                            warning  SimpleStrategy otherwise
+    low_replication         warning  replication factor below 3
+    compaction_mismatch     warning  TWCS on a table not written in time order, or
+                            info     size-tiered/levelled compaction on TTL'd time series
+
+Every finding carries a benchmark that can confirm it: a write workload or
+mixed scenario spec with the options that exercise the suspected problem,
+and the generated YAML.
+"""
+import re
+from typing import Dict, List, Optional, Any
+
+from partition_model import normalize_partition_options
+from row_sizing import column_kind, normalize_row_size_options
+from scenario_builder import build_mixed_scenario, normalize_scenario_spec
+from schema_parser import parse_cql_map, replication_settings
+from workload_linter import SEVERITIES
+
+TIME_TYPES = ("timestamp", "timeuuid", "date", "time")
+LOW_CARDINALITY_TYPES = ("boolean", "tinyint")
+
+# Partition key column names that suggest a time bucket
+TIME_BUCKET_PATTERN = re.compile(r"(bucket|minute|hour|day|date|week|month|quarter|year|period)", re.IGNORECASE)
+
+MAX_COLLECTIONS = 2
+MAX_SECONDARY_INDEXES = 1
+MAX_INDEXES = 4
+MIN_REPLICATION_FACTOR = 3
+
+# Rows per partition the growth benchmarks write
+GROWTH_ROWS_PER_PARTITION = 100000
+COLLECTION_ROW_BYTES = 16384
+BENCHMARK_CYCLERATE = 2000
+
+def _finding(severity: str, rule: str, message: str, table: Optional[str] = None,
+             keyspace: Optional[str] = None, benchmark: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"severity": severity, "rule": rule, "table": table, "keyspace": keyspace,
+            "message": message, "benchmark": benchmark}
+
+
+def _base_type(cql_type: str) -> str:
+    return cql_type.strip().rstrip(',').strip().lower()
+
+
+def _compaction_class(table_info: Dict[str, Any]) -> Optional[str]:
+    """Short compaction class name, e.g. SizeTieredCompactionStrategy"""
+    compaction = parse_cql_map(table_info.get("with_options", {}).get("compaction"))
+    if not compaction.get("class"):
+        return None
+    return compaction["class"].split('.')[-1]
+
+
+def _ttl(table_info: Dict[str, Any]) -> int:
+    try:
+        return int(table_info.get("with_options", {}).get("default_time_to_live", 0))
+    except ValueError:
+        return 0
+
+
+def _write_benchmark(parser, schema_info: Dict[str, Any], full_name: str, description: str,
+                     row_size: Optional[Dict[str, Any]] = None,
+                     partitioning: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write workload of a table generated with options that exercise a finding"""
+    options = {"row_size": row_size, "partitioning": partitioning}
+    return {
+        "type": "write",
+        "description": description,
+        "filename": f"{full_name.replace('.', '_')}_advisor.yaml",
+        "options": {key: value for key, value in options.items() if value},
+        "content": parser.generate_nosqlbench_yaml(schema_info, full_name, normalize_row_size_options(row_size),
+                                                   normalize_partition_options(partitioning))
+    }
+
+
+def _scenario_benchmark(parser, schema_info: Dict[str, Any], full_name: str, description: str,
+                        ratios: Dict[str, int]) -> Dict[str, Any]:
+    """Mixed scenario over a table with the given op ratios"""
+    spec = {"tables": [dict(table=full_name, **ratios)], "cyclerate": BENCHMARK_CYCLERATE}
+    return {
+        "type": "scenario",
+        "description": description,
+        "filename": f"mixed_{full_name.replace('.', '_')}_advisor.yaml",
+        "options": {"scenario": spec},
+        "content": build_mixed_scenario(parser, schema_info, normalize_scenario_spec(spec))["yaml"]
+    }
+
+
+def _partition_findings(parser, schema_info: Dict[str, Any], full_name: str,
+                        table_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    findings = []
+    columns = table_info["columns"]
+    partition_columns = table_info["primary_key"][0]
+    clustering_columns = [col for part in table_info["primary_key"][1:] for col in part]
+
+    if all(_base_type(columns[col]) in LOW_CARDINALITY_TYPES for col in partition_columns) or (
+            len(partition_columns) == 1 and _base_type(columns[partition_columns[0]]) == "date"):
+        findings.append(_finding(
+            "warning", "low_cardinality_key",
+            f"Partition key ({', '.join(partition_columns)}) has few distinct values, so writes "
+            f"concentrate on a handful of partitions and replicas",
+            full_name, table_info["keyspace"],
+            _write_benchmark(parser, schema_info, full_name,
+                             "Write into a few very wide partitions and watch write latency and partition size",
+                             partitioning={"rows_per_partition": GROWTH_ROWS_PER_PARTITION, "distribution": "zipf"})
+        ))
+
+    time_ordered = clustering_columns and _base_type(columns[clustering_columns[0]]) in TIME_TYPES
+    bucketed = any(
+        TIME_BUCKET_PATTERN.search(col) or _base_type(columns[col]) in TIME_TYPES
+        for col in partition_columns
+    )
+    if time_ordered and not bucketed and not _ttl(table_info):
+        findings.append(_finding(
+            "warning", "unbounded_partition",
+            f"Rows are clustered by time ({clustering_columns[0]}) but the partition key "
+            f"({', '.join(partition_columns)}) has no time bucket and the table no TTL, "
+            f"so partitions grow without bound",
+            full_name, table_info["keyspace"],
+            _write_benchmark(parser, schema_info, full_name,
+                             f"Grow partitions to {GROWTH_ROWS_PER_PARTITION} rows and watch write and "
+                             f"read latency as they widen",
+                             partitioning={"rows_per_partition": GROWTH_ROWS_PER_PARTITION, "distribution": "fixed"})
+        ))
+    return findings
+
+
+def _row_findings(parser, schema_info: Dict[str, Any], full_name: str,
+                  table_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    collections = [
+        col for col, cql_type in table_info["columns"].items()
+        if column_kind(cql_type) in ("map", "list", "set") and not _base_type(cql_type).startswith("frozen<")
+    ]
+    if len(collections) <= MAX_COLLECTIONS:
+        return []
+    return [_finding(
+        "warning", "collection_heavy_rows",
+        f"{len(collections)} non-frozen collections per row ({', '.join(collections)}); every element is "
+        f"a separate cell, and overwriting a collection writes a tombstone",
+        full_name, table_info["keyspace"],
+        _write_benchmark(parser, schema_info, full_name,
+                         f"Write rows whose collections fill most of a {COLLECTION_ROW_BYTES // 1024} KB row",
+                         row_size={"target_row_bytes": COLLECTION_ROW_BYTES})
+    )]
+
+
+def _index_findings(parser, schema_info: Dict[str, Any], full_name: str,
+                    table_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    indexes = [
+        index for index in schema_info.get("indices", [])
+        if index["table"] in (full_name, table_info["name"])
+    ]
+    secondary = [index for index in indexes if index.get("kind", "secondary") == "secondary"]
+    if len(secondary) <= MAX_SECONDARY_INDEXES and len(indexes) <= MAX_INDEXES:
+        return []
+    return [_finding(
+        "warning", "too_many_indexes",
+        f"{len(indexes)} indexes ({len(secondary)} legacy secondary) on {full_name}; each one adds "
+        f"write amplification and secondary index reads fan out to every node",
+        full_name, table_info["keyspace"],
+        _scenario_benchmark(parser, schema_info, full_name,
+                            "Write-heavy mix; compare its write latency with the indexes dropped",
+                            {"write": 4, "read": 1})
+    )]
+
+
+def _compaction_findings(parser, schema_info: Dict[str, Any], full_name: str,
+                         table_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    compaction = _compaction_class(table_info)
+    if not compaction:
+        return []
+    columns = table_info["columns"]
+    clustering_columns = [col for part in table_info["primary_key"][1:] for col in part]
+    time_ordered = clustering_columns and _base_type(columns[clustering_columns[0]]) in TIME_TYPES
+
+    if compaction == "TimeWindowCompactionStrategy" and not time_ordered:
+        return [_finding(
+            "warning", "compaction_mismatch",
+            "TimeWindowCompactionStrategy expects rows written in time order, but the table is not "
+            "clustered by time; windows will overlap and old SSTables never expire cleanly",
+            full_name, table_info["keyspace"],
+            _scenario_benchmark(parser, schema_info, full_name,
+                                "Mixed updates and reads; compare read latency against size-tiered compaction",
+                                {"write": 2, "read": 2, "update": 1})
+        )]
+    if compaction in ("SizeTieredCompactionStrategy", "LeveledCompactionStrategy") and time_ordered and _ttl(table_info):
+        return [_finding(
+            "info", "compaction_mismatch",
+            f"{compaction} on a time series with a TTL keeps expired data in mixed SSTables; "
+            f"TimeWindowCompactionStrategy drops whole expired windows",
+            full_name, table_info["keyspace"],
+            _scenario_benchmark(parser, schema_info, full_name,
+                                "Append-heavy time-series mix; compare against time-window compaction",
+                                {"write": 4, "read": 1})
+        )]
+    return []
+
+
+def _keyspace_findings(schema_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    findings = []
+    settings = {name: replication_settings(info) for name, info in schema_info.get("keyspaces", {}).items()}
+    datacenters = {
+        dc for strategy, factors in settings.values()
+        if strategy == "NetworkTopologyStrategy" for dc in factors
+    }
+
+    for keyspace, (strategy, factors) in settings.items():
+        if strategy == "SimpleStrategy":
+            multi_dc = len(datacenters) > 1
+            findings.append(_finding(
+                "error" if multi_dc else "warning", "simple_strategy",
+                f"Keyspace {keyspace} uses SimpleStrategy, which ignores data centers and racks"
+                + (f" while the cluster spans {', '.join(sorted(datacenters))}; replicas land in "
+                   f"remote DCs and LOCAL_* consistency levels cannot be met locally" if multi_dc else
+                   "; use NetworkTopologyStrategy"),
+                keyspace=keyspace
+            ))
+        low = {dc: factor for dc, factor in factors.items() if factor < MIN_REPLICATION_FACTOR}
+        if low:
+            findings.append(_finding(
+                "warning", "low_replication",
+                f"Keyspace {keyspace} has replication factor "
+                f"{', '.join(str(factor) if dc == 'replication_factor' else f'{factor} in {dc}' for dc, factor in low.items())}; below "
+                f"{MIN_REPLICATION_FACTOR}, QUORUM reads and writes fail as soon as a replica is down",
+                keyspace=keyspace
+            ))
+    return findings
+
+
+def advise_schema(parser, schema_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Review every table and keyspace of a parsed schema.
+
+    parser is a CQLParser, used to generate the benchmarks. Returns the
+    findings, worst first, with counts per severity.
+    """
+    findings = _keyspace_findings(schema_info)
+    for full_name, table_info in schema_info.get("tables", {}).items():
+        if not table_info.get("primary_key"):
+            continue
+        for check in (_partition_findings, _row_findings, _index_findings, _compaction_findings):
+            findings.extend(check(parser, schema_info, full_name, table_info))
+
+    findings.sort(key=lambda finding: SEVERITIES.index(finding["severity"]))
+    counts = {severity: sum(1 for finding in findings if finding["severity"] == severity)
+              for severity in SEVERITIES}
+    return {"tables": len(schema_info.get("tables", {})), "counts": counts, "findings": findings}
@@ -1,15 +1,52 @@
 from typing import Dict, List, Tuple, Optional, Any, Set
 import re
-import yaml
 import io
 import os
+import time
+import yaml_utils
+import metrics
+from read_patterns import describe_read_ops, index_value_binding, plan_read_ops
+from read_yaml_generator import generate_read_yaml_from_text, parse_create_statement
+from partition_model import describe_partitioning, partition_bindings, resolve_partition_options
+from row_sizing import plan_column_sizes, resolve_row_size_options, size_header
+from sizing_planner import describe_sizing, plan_table_sizing
+from vector_search import describe_vectors, resolve_vector_options, vector_binding, vector_bindings
+from skew_profiles import (
+    check_sampler_csv,
+    describe_skew_profile,
+    is_skewed,
+    key_index_binding,
+    phase_cycles,
+    read_phases,
+    sampler_key_columns,
+    weight_column,
+)
+
+
+_MAP_ENTRY_PATTERN = re.compile(r"'([^']*)'\s*:\s*'?([^',}]*)'?")
+
+
+def parse_cql_map(text: Optional[str]) -> Dict[str, str]:
+    """Entries of a CQL map literal such as a replication or compaction option"""
+    return {key.strip(): value.strip() for key, value in _MAP_ENTRY_PATTERN.findall(text or "")}
+
+
+def replication_settings(keyspace_info: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, int]]:
+    """Strategy class and replication factor per DC (or "replication_factor") of a parsed keyspace"""
+    replication = parse_cql_map(keyspace_info.get("replication"))
+    strategy = replication.pop("class", None)
+    factors = {}
+    for key, value in replication.items():
+        if value.isdigit():
+            factors[key] = int(value)
+    return (strategy.split('.')[-1] if strategy else None), factors
 
 
 class CQLParser:
     def __init__(self):
         # Regular expressions for parsing CQL
         self.keyspace_pattern = re.compile(
-            r"CREATE\s+KEYSPACE\s+(\w+)\s+WITH\s+replication\s*=\s*({[^}]+})\s*(?:AND\s+durable_writes\s*=\s*(true|false))?",
+            r"CREATE\s+KEYSPACE\s+(?:if\s+not\s+exists\s+)?(\w+)\s+WITH\s+replication\s*=\s*({[^}]+})\s*(?:AND\s+durable_writes\s*=\s*(true|false))?",
             re.IGNORECASE | re.DOTALL
         )
         
@@ -24,12 +61,24 @@ class CQLParser:
         )
         
         self.index_pattern = re.compile(
-            r"CREATE\s+INDEX\s+(?:if\s+not\s+exists\s+)?(\w+)\s+ON\s+(?:(\w+)\.)?(\w+)\s*\(([^)]+)\);",
+            r"CREATE\s+(CUSTOM\s+)?INDEX\s+(?:if\s+not\s+exists\s+)?(\w+)?\s*ON\s+(?:(\w+)\.)?(\w+)\s*"
+            r"\(\s*((?:[^()]|\([^()]*\))+?)\s*\)\s*(?:USING\s+'([^']+)')?\s*"
+            r"(?:WITH\s+OPTIONS\s*=\s*(\{[^}]*\}))?\s*;",
             re.IGNORECASE | re.DOTALL
         )
         
+        self.index_target_pattern = re.compile(
+            r"(keys|values|entries|full)\s*\(\s*(\w+)\s*\)",
+            re.IGNORECASE
+        )
+        
         self.primary_key_pattern = re.compile(
-            r"PRIMARY\s+KEY\s*\(\s*([^)]+)\s*\)",
+            r"PRIMARY\s+KEY\s*\(",
+            re.IGNORECASE
+        )
+        
+        self.inline_primary_key_pattern = re.compile(
+            r"\s+PRIMARY\s+KEY\s*$",
             re.IGNORECASE
         )
         
@@ -37,6 +86,16 @@ class CQLParser:
             r"CLUSTERING\s+ORDER\s+BY\s*\(\s*([^)]+)\s*\)",
             re.IGNORECASE
         )
+        
+        self.with_clause_pattern = re.compile(
+            r"\s*\)\s*WITH\s+(.*?)\s*;\s*$",
+            re.IGNORECASE | re.DOTALL
+        )
+        
+        self.with_separator_pattern = re.compile(
+            r"\s+AND\s+",
+            re.IGNORECASE
+        )
 
         # Pattern to extract the table name from insert statement
         self.insert_table_pattern = re.compile(
@@ -52,6 +111,7 @@ class CQLParser:
 
     def parse_cql(self, cql_content: str) -> Dict[str, Any]:
         """Parse CQL content and return structured schema information"""
+        start_time = time.perf_counter()
         result = {
             "keyspaces": {},
             "tables": {},
@@ -103,12 +163,16 @@ class CQLParser:
             table_name = match.group(2)
             column_definitions = match.group(3)
             
-            # Find the WITH clause for this table
-            table_with_clause = self._extract_with_clause(cql_content, keyspace_name, table_name)
-            
             # Parse columns, primary key, and clustering order
             columns, primary_key, clustering_order = self._parse_column_definitions(column_definitions)
             
+            # The WITH clause follows the column list and holds the clustering order
+            table_with_clause = {}
+            with_match = self.with_clause_pattern.match(cql_content, match.end(3), match.end())
+            if with_match:
+                table_with_clause, with_clustering_order = self._extract_with_clause(with_match.group(1))
+                clustering_order = with_clustering_order or clustering_order
+            
             if keyspace_name:
                 full_table_name = f"{keyspace_name}.{table_name}"
             else:
@@ -123,13 +187,24 @@ class CQLParser:
                 "with_options": table_with_clause
             }
         
-        # Extract indices
+        # Extract indices, including CUSTOM and SAI indexes
         index_matches = self.index_pattern.finditer(cql_content)
         for match in index_matches:
-            index_name = match.group(1)
-            keyspace_name = match.group(2) if match.group(2) else None
-            table_name = match.group(3)
-            indexed_columns = match.group(4).strip()
+            keyspace_name = match.group(3) if match.group(3) else None
+            table_name = match.group(4)
+            indexed_columns = match.group(5).strip()
+            using = match.group(6)
+            
+            # Collection indexes name their target: keys(col), values(col), entries(col), full(col)
+            target_match = self.index_target_pattern.fullmatch(indexed_columns)
+            column = target_match.group(2) if target_match else indexed_columns.strip('"')
+            
+            if using and ("storageattachedindex" in using.lower() or using.lower() == "sai"):
+                kind = "sai"
+            elif using or match.group(1):
+                kind = "custom"
+            else:
+                kind = "secondary"
             
             if keyspace_name:
                 full_table_name = f"{keyspace_name}.{table_name}"
@@ -137,96 +212,128 @@ class CQLParser:
                 full_table_name = table_name
                 
             result["indices"].append({
-                "name": index_name,
+                "name": match.group(2) or f"{table_name}_{column}_idx",
                 "table": full_table_name,
-                "columns": indexed_columns
+                "columns": indexed_columns,
+                "column": column,
+                "target": target_match.group(1).lower() if target_match else None,
+                "kind": kind,
+                "using": using,
+                "options": dict(re.findall(r"'([^']*)'\s*:\s*'([^']*)'", match.group(7) or ""))
             })
         
+        metrics.observe_schema_parse(len(cql_content.encode('utf-8')), time.perf_counter() - start_time)
         return result
 
-    def _extract_with_clause(self, cql_content: str, keyspace_name: Optional[str], table_name: str) -> Dict[str, Any]:
-        """Extract the WITH clause for a table"""
-        pattern = rf"CREATE\s+TABLE\s+(?:if\s+not\s+exists\s+)?(?:{keyspace_name}\.)?\s*{table_name}[^;]+?WITH\s+([^;]+)"
-        match = re.search(pattern, cql_content, re.IGNORECASE | re.DOTALL)
-        
-        if not match:
-            return {}
+    def _split_top_level(self, text: str, separator: str = ',') -> List[str]:
+        """Split text on a separator outside parentheses, angle brackets, braces and quotes"""
+        parts = []
+        depth = 0
+        in_quote = False
+        start = 0
+        for i, char in enumerate(text):
+            if char == "'":
+                in_quote = not in_quote
+            elif in_quote:
+                continue
+            elif char in '(<{':
+                depth += 1
+            elif char in ')>}':
+                depth -= 1
+            elif char == separator and depth == 0:
+                parts.append(text[start:i])
+                start = i + 1
+        parts.append(text[start:])
+        return [part.strip() for part in parts if part.strip()]
+
+    def _extract_with_clause(self, with_content: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Parse the options of a table's WITH clause.
         
-        with_content = match.group(1)
+        Returns the key/value options and the clustering order, which is
+        declared in the same clause.
+        """
         options = {}
+        clustering_order = {}
         
-        # Handle nested structures like maps in options
-        current_option = ""
-        brace_level = 0
-        
-        for char in with_content + " AND ":  # Add a separator at the end
-            if char == '{':
-                brace_level += 1
-                current_option += char
-            elif char == '}':
-                brace_level -= 1
-                current_option += char
-            elif char == "'" and brace_level > 0:
-                current_option += char
-            elif brace_level == 0 and re.match(r'\s+AND\s+', char + with_content[with_content.index(char)+1:], re.IGNORECASE):
-                # Found the end of an option
-                if current_option.strip():
-                    key_value = current_option.strip().split('=', 1)
-                    if len(key_value) == 2:
-                        key, value = key_value
-                        options[key.strip()] = value.strip()
-                current_option = ""
-            else:
-                current_option += char
-        
-        return options
+        # Split on AND outside of maps, parentheses and quoted strings
+        parts = []
+        depth = 0
+        in_quote = False
+        start = 0
+        i = 0
+        while i < len(with_content):
+            char = with_content[i]
+            if char == "'":
+                in_quote = not in_quote
+            elif not in_quote:
+                if char in '({':
+                    depth += 1
+                elif char in ')}':
+                    depth -= 1
+                elif depth == 0 and char.isspace():
+                    separator = self.with_separator_pattern.match(with_content, i)
+                    if separator:
+                        parts.append(with_content[start:i])
+                        start = i = separator.end()
+                        continue
+            i += 1
+        parts.append(with_content[start:])
+        
+        for part in parts:
+            part = part.strip()
+            clustering_order_match = self.clustering_order_pattern.match(part)
+            if clustering_order_match:
+                clustering_order = self._parse_clustering_order(clustering_order_match.group(1))
+                continue
+            key_value = part.split('=', 1)
+            if len(key_value) == 2:
+                key, value = key_value
+                options[key.strip()] = value.strip()
+        
+        return options, clustering_order
+
+    def _parse_clustering_order(self, clustering_str: str) -> Dict[str, str]:
+        clustering_order = {}
+        for part in clustering_str.split(','):
+            if ' ' in part.strip():
+                col, order = part.strip().rsplit(' ', 1)
+                clustering_order[col.strip()] = order.strip().upper()
+        return clustering_order
 
     def _parse_column_definitions(self, column_defs: str) -> Tuple[Dict[str, str], List[List[str]], Dict[str, str]]:
         """Parse column definitions, extract primary key and clustering order"""
-        # Extract PRIMARY KEY, if present
-        primary_key_match = self.primary_key_pattern.search(column_defs)
+        columns = {}
         primary_key = []
-        if primary_key_match:
-            pk_str = primary_key_match.group(1)
-            # Handle composite partition keys
-            if '(' in pk_str:
-                partition_key = re.findall(r'\(([^)]+)\)', pk_str)
-                if partition_key:
-                    primary_key.append([col.strip() for col in partition_key[0].split(',')])
-                    
-                # Extract clustering keys
-                clustering_keys = re.sub(r'\([^)]+\),\s*', '', pk_str)
-                if clustering_keys:
-                    for col in clustering_keys.split(','):
-                        if col.strip():
-                            primary_key.append([col.strip()])
-            else:
-                # Simple primary key
-                primary_key = [[col.strip()] for col in pk_str.split(',')]
-        
-        # Extract CLUSTERING ORDER, if present
         clustering_order = {}
-        clustering_order_match = self.clustering_order_pattern.search(column_defs)
-        if clustering_order_match:
-            clustering_str = clustering_order_match.group(1)
-            for part in clustering_str.split(','):
-                if ' ' in part:
-                    col, order = part.strip().rsplit(' ', 1)
-                    clustering_order[col.strip()] = order.strip()
-        
-        # Remove PRIMARY KEY and CLUSTERING ORDER from column definitions
-        clean_column_defs = re.sub(self.primary_key_pattern, '', column_defs)
-        clean_column_defs = re.sub(self.clustering_order_pattern, '', clean_column_defs)
-        
-        # Extract column names and types
-        columns = {}
-        for col_def in re.split(r',\s*(?=\w+\s+\w+)', clean_column_defs):
-            col_def = col_def.strip()
-            if col_def:
-                parts = col_def.split(None, 1)
-                if len(parts) == 2:
-                    col_name, col_type = parts
-                    columns[col_name.strip()] = col_type.strip()
+        
+        for col_def in self._split_top_level(column_defs):
+            # PRIMARY KEY ((partition, key), clustering, key)
+            pk_match = self.primary_key_pattern.match(col_def)
+            if pk_match:
+                key_parts = self._split_top_level(col_def[pk_match.end():col_def.rindex(')')])
+                for index, part in enumerate(key_parts):
+                    if part.startswith('('):
+                        primary_key.append([col.strip() for col in part.strip('()').split(',') if col.strip()])
+                    else:
+                        primary_key.append([part])
+                continue
+            
+            # Legacy placement of CLUSTERING ORDER inside the column list
+            clustering_order_match = self.clustering_order_pattern.match(col_def)
+            if clustering_order_match:
+                clustering_order = self._parse_clustering_order(clustering_order_match.group(1))
+                continue
+            
+            parts = col_def.split(None, 1)
+            if len(parts) == 2:
+                col_name, col_type = parts
+                # Inline primary key: "id uuid PRIMARY KEY"
+                inline_pk = self.inline_primary_key_pattern.search(col_type)
+                if inline_pk:
+                    col_type = col_type[:inline_pk.start()]
+                    primary_key = [[col_name]]
+                columns[col_name.strip()] = col_type.strip()
         
         return columns, primary_key, clustering_order
 
@@ -258,18 +365,152 @@ class CQLParser:
             return 'MapSizedStepped(Mod(7), NumberNameToString(), NumberNameToString())'
         elif cql_type.startswith('list<'):
             return 'ListSizedStepped(Mod(7), NumberNameToString())'
+        elif vector_binding(cql_type):
+            return vector_binding(cql_type)
         else:
             # Default for other types
             return 'AlphaNumericString(36)'
 
-    def generate_nosqlbench_yaml(self, cql_schema: Dict[str, Any], table_name: str) -> str:
-        """Generate NoSQLBench YAML for a specific table"""
-        # Find the table in the schema
-        table_info = None
+    def find_table(self, cql_schema: Dict[str, Any], table_name: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Full name and info of a table, looked up by full or bare name"""
         for full_name, info in cql_schema["tables"].items():
             if full_name == table_name or info["name"] == table_name:
-                table_info = info
-                break
+                return full_name, info
+        return None, None
+
+    def write_plan(self, table_info: Dict[str, Any], full_table_name: str,
+                   row_size: Optional[Dict[str, Any]] = None,
+                   partitioning: Optional[Dict[str, Any]] = None,
+                   vectors: Optional[Dict[str, Any]] = None,
+                   key_count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Work out the write bindings of a table.
+        
+        Returns the bindings with the column size plan, the row-size,
+        partition and vector options that apply to the table and the vector
+        datasets the bindings read. key_count overrides the number of rows
+        the partition options lay out (e.g. a planned dataset size).
+        """
+        # Size the variable-length columns
+        table_row_size = resolve_row_size_options(row_size, full_table_name, table_info["name"])
+        key_columns = [col for part in table_info["primary_key"] for col in part]
+        size_plan = plan_column_sizes(table_info["columns"], key_columns, table_row_size)
+        
+        # Lay rows out over partitions
+        table_partitioning = resolve_partition_options(partitioning, full_table_name, table_info["name"])
+        if table_partitioning and key_count:
+            table_partitioning = dict(table_partitioning,
+                                      key_count=max(key_count, table_partitioning["rows_per_partition"]))
+        
+        # Generate bindings based on column types
+        bindings = {
+            col_name: size_plan[col_name]["binding"] or self.map_cql_to_nosqlbench_type(col_type)
+            for col_name, col_type in table_info["columns"].items()
+        }
+        
+        # Vector columns draw from clustered datasets when vector options are given
+        table_vectors = resolve_vector_options(vectors, full_table_name, table_info["name"])
+        vector_columns, datasets = vector_bindings(table_info["columns"], full_table_name, table_vectors)
+        bindings.update(vector_columns)
+        
+        bindings = partition_bindings(table_info["columns"], table_info["primary_key"],
+                                      table_info["clustering_order"], bindings, table_partitioning)
+        
+        return {
+            "bindings": bindings,
+            "size_plan": size_plan,
+            "row_size": table_row_size,
+            "partitioning": table_partitioning,
+            "vectors": table_vectors,
+            "vector_datasets": datasets
+        }
+
+    def create_table_statement(self, table_info: Dict[str, Any],
+                               with_options: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Lines of the CREATE TABLE statement of a workload's schema block
+        
+        with_options are table options (name to CQL value, e.g. compaction
+        to a map literal) added to the WITH clause.
+        """
+        keyspace_name = table_info["keyspace"]
+        lines = [f"CREATE TABLE if not exists <<keyspace:{keyspace_name or 'baselines'}>>.{table_info['name']} ("]
+        
+        # Add column definitions
+        for col_name, col_type in table_info["columns"].items():
+            lines.append(f"{col_name} {col_type},")
+        
+        # Add primary key
+        if table_info["primary_key"]:
+            pk_parts = []
+            for part in table_info["primary_key"]:
+                if len(part) > 1:  # Composite partition key
+                    pk_parts.append(f"({', '.join(part)})")
+                else:
+                    pk_parts.append(part[0])
+            
+            lines.append(f"PRIMARY KEY ({', '.join(pk_parts)})")
+        
+        lines.append(")")
+        
+        # Add clustering order and table options if present
+        clauses = []
+        if table_info["clustering_order"]:
+            clustering_parts = []
+            for col, order in table_info["clustering_order"].items():
+                clustering_parts.append(f"{col} {order}")
+            
+            clauses.append(f"CLUSTERING ORDER BY ({', '.join(clustering_parts)})")
+        clauses.extend(f"{name} = {value}" for name, value in (with_options or {}).items())
+        
+        if clauses:
+            lines.append(f"WITH {clauses[0]}")
+            lines.extend(f"AND {clause}" for clause in clauses[1:])
+            lines[-1] += ";"
+        else:
+            lines.append(";")
+        
+        return lines
+
+    def create_index_statements(self, cql_schema: Dict[str, Any], full_table_name: str,
+                                table_info: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Name and CREATE INDEX statement of every index of a table"""
+        keyspace_name = table_info["keyspace"] or 'baselines'
+        statements = []
+        for index in cql_schema.get("indices", []):
+            if index["table"] not in (full_table_name, table_info["name"]):
+                continue
+            custom = "CUSTOM " if index.get("kind", "secondary") != "secondary" else ""
+            statement = (f"CREATE {custom}INDEX if not exists {index['name']} "
+                         f"ON <<keyspace:{keyspace_name}>>.{table_info['name']} ({index['columns']})")
+            if index.get("using"):
+                statement += f" USING '{index['using']}'"
+            if index.get("options"):
+                options = ", ".join(f"'{key}': '{value}'" for key, value in index["options"].items())
+                statement += f" WITH OPTIONS = {{{options}}}"
+            statements.append((index["name"], statement + ";"))
+        return statements
+
+    @metrics.timed_generation("write")
+    def generate_nosqlbench_yaml(self, cql_schema: Dict[str, Any], table_name: str,
+                                 row_size: Optional[Dict[str, Any]] = None,
+                                 partitioning: Optional[Dict[str, Any]] = None,
+                                 vectors: Optional[Dict[str, Any]] = None,
+                                 sizing: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate NoSQLBench YAML for a specific table
+        
+        row_size holds normalized row-size options (see row_sizing); without
+        them every column keeps its default binding. partitioning holds
+        normalized partition options (see partition_model); without them
+        every cycle writes its own partition. vectors holds normalized vector
+        options (see vector_search); without them vector columns get uniform
+        hashed vectors. sizing holds normalized sizing options (see
+        sizing_planner); with them the rampup writes the planned dataset
+        instead of 1,000,000 rows.
+        """
+        # Find the table in the schema
+        table_full_name, table_info = self.find_table(cql_schema, table_name)
         
         if not table_info:
             return f"# Table {table_name} not found in the schema"
@@ -277,19 +518,37 @@ class CQLParser:
         # Determine the keyspace
         keyspace_name = table_info["keyspace"]
         
+        dataset = plan_table_sizing(cql_schema, table_full_name, table_info, sizing, row_size)
+        plan = self.write_plan(table_info, table_full_name, row_size, partitioning, vectors,
+                               dataset["cycles"] if dataset else None)
+        size_plan = plan["size_plan"]
+        table_row_size = plan["row_size"]
+        table_partitioning = plan["partitioning"]
+        if dataset:
+            rampup_cycles = dataset["cycles"]
+        else:
+            rampup_cycles = table_partitioning["key_count"] if table_partitioning else 1000000
+        rows_per_partition = table_partitioning["rows_per_partition"] if table_partitioning else None
+        
+        header = size_header(size_plan, table_row_size, rows_per_partition)
+        if dataset:
+            header += describe_sizing(dataset)
+        if table_partitioning:
+            header += describe_partitioning(table_partitioning, table_info["primary_key"], table_info["clustering_order"])
+        header += describe_vectors(plan["vectors"], plan["vector_datasets"])
+        
         # Start building the YAML
-        yaml_content = [
+        yaml_content = header + [
             "scenarios:",
             "  default:",
             "    schema1: run driver=cql tags=block:\"schema.*\" threads===UNDEF cycles==UNDEF",
-            "    rampup1: run driver=cql tags='block:rampup1' cycles===TEMPLATE(rampup-cycles,1000000) threads=auto",
+            f"    rampup1: run driver=cql tags='block:rampup1' cycles===TEMPLATE(rampup-cycles,{rampup_cycles}) threads=auto",
             "",
             "bindings:"
         ]
         
         # Generate bindings based on column types
-        for col_name, col_type in table_info["columns"].items():
-            binding_type = self.map_cql_to_nosqlbench_type(col_type)
+        for col_name, binding_type in plan["bindings"].items():
             yaml_content.append(f"  {col_name} : {binding_type};")
         
         yaml_content.append("")
@@ -301,41 +560,15 @@ class CQLParser:
         
         # Generate the CREATE TABLE statement
         table_name_only = table_info["name"]
-        full_keyspace_table = f"{keyspace_name}.{table_name_only}" if keyspace_name else table_name_only
         
         # Create the schema block
         yaml_content.append("      create_table1: | ")
-        yaml_content.append(f"        CREATE TABLE if not exists <<keyspace:{keyspace_name or 'baselines'}>>.{table_name_only} (")
+        yaml_content.extend(f"        {line}" for line in self.create_table_statement(table_info))
         
-        # Add column definitions
-        columns_lines = []
-        for col_name, col_type in table_info["columns"].items():
-            columns_lines.append(f"        {col_name} {col_type},")
-        
-        # Add primary key
-        if table_info["primary_key"]:
-            pk_parts = []
-            for part in table_info["primary_key"]:
-                if len(part) > 1:  # Composite partition key
-                    pk_parts.append(f"({', '.join(part)})")
-                else:
-                    pk_parts.append(part[0])
-            
-            pk_definition = f"        PRIMARY KEY ({', '.join(pk_parts)})"
-            columns_lines.append(pk_definition)
-        
-        yaml_content.extend(columns_lines)
-        yaml_content.append("        )")
-        
-        # Add clustering order if present
-        if table_info["clustering_order"]:
-            clustering_parts = []
-            for col, order in table_info["clustering_order"].items():
-                clustering_parts.append(f"{col} {order}")
-            
-            yaml_content.append(f"        WITH CLUSTERING ORDER BY ({', '.join(clustering_parts)});")
-        else:
-            yaml_content.append(";")
+        # Indexes are created with the table so the read workload can query through them
+        for index_name, statement in self.create_index_statements(cql_schema, table_full_name, table_info):
+            yaml_content.append(f"      create_index_{index_name}: |")
+            yaml_content.append(f"        {statement}")
         
         # Add the rampup block
         yaml_content.append("  rampup1:")
@@ -365,278 +598,306 @@ class CQLParser:
         
         return "\n".join(yaml_content)
 
-def generate_read_yaml_from_write_and_csv(
-    self, 
-    write_yaml: str, 
-    csv_file_path: str, 
-    primary_key_columns: List[str]
-) -> str:
-    """Generate a read YAML file from a write YAML file, DSBulk CSV path, and primary key columns"""
-    try:
-        # Preprocess the YAML to fix common syntax issues
-        preprocessed_yaml = self._preprocess_yaml(write_yaml)
-        
-        # Extract the write YAML to get the table name
-        yaml_data = None
+    @metrics.timed_generation("read")
+    def generate_read_yaml_from_write_and_csv(
+        self, 
+        write_yaml: str, 
+        csv_file_path: Optional[str], 
+        primary_key_columns: List[str],
+        skew_profile: Optional[Dict[str, Any]] = None,
+        read_patterns: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Generate a read YAML file from a write YAML file, DSBulk CSV path, and primary key columns.
+        
+        Without a CSV path, key values are re-derived from the write bindings
+        at rampup cycles chosen by the skew profile's distribution. The read
+        ops (point reads, partition slices, clustering ranges) follow the
+        table's primary key and the read_patterns options.
+        """
         try:
-            yaml_data = yaml.safe_load(preprocessed_yaml)
-        except Exception as e:
-            # If still failing, try a regex-based approach
-            return self._generate_read_yaml_from_text(preprocessed_yaml, csv_file_path, primary_key_columns)
-        
-        # Extract table name from the write YAML
-        table_name = None
-        keyspace = 'baselines'  # Default keyspace
+            # Parse the write YAML, repairing common syntax issues only if needed
+            yaml_data = None
+            try:
+                yaml_data = yaml_utils.load_tolerant(write_yaml)
+            except yaml_utils.YAMLError:
+                # If still failing, try a regex-based approach
+                return self._generate_read_yaml_from_text(self._preprocess_yaml(write_yaml), csv_file_path, primary_key_columns,
+                                                          skew_profile, read_patterns)
+        
+            # Extract table name from the write YAML
+            table_name = None
+            keyspace = 'baselines'  # Default keyspace
+            layout = None
+            index_statements = []
         
-        if yaml_data and 'blocks' in yaml_data:
-            for block_name, block_data in yaml_data['blocks'].items():
-                if 'ops' in block_data:
-                    for op_name, op_value in block_data['ops'].items():
-                        if isinstance(op_value, str) and 'insert into' in op_value.lower():
-                            # Extract table name from insert statement
-                            table_match = self.insert_table_pattern.search(op_value)
-                            if table_match:
-                                if table_match.group(1):
-                                    keyspace = table_match.group(1)
-                                table_name = table_match.group(2)
-                                break
-                    if table_name:
-                        break
-        
-        if not table_name:
-            # Try to extract from CREATE TABLE statement
             if yaml_data and 'blocks' in yaml_data:
                 for block_name, block_data in yaml_data['blocks'].items():
                     if 'ops' in block_data:
                         for op_name, op_value in block_data['ops'].items():
-                            if isinstance(op_value, str) and 'CREATE TABLE' in op_value:
-                                # Extract table name from create statement
-                                table_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+<<keyspace:([^>]+)>>\.(\w+)', op_value)
+                            if isinstance(op_value, str) and 'CREATE TABLE' in op_value and not layout:
+                                layout = parse_create_statement(op_value)
+                            if isinstance(op_value, str) and re.search(r'CREATE\s+(CUSTOM\s+)?INDEX', op_value, re.IGNORECASE):
+                                index_statements.append(re.sub(r'<<keyspace:([^>]+)>>', r'\1', op_value))
+                            if isinstance(op_value, str) and 'insert into' in op_value.lower():
+                                # Extract table name from insert statement
+                                table_match = self.insert_table_pattern.search(op_value)
                                 if table_match:
-                                    keyspace = table_match.group(1)
+                                    if table_match.group(1):
+                                        keyspace = table_match.group(1)
                                     table_name = table_match.group(2)
                                     break
-                                # Try alternative pattern
-                                alt_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+(\w+)\.(\w+)', op_value)
-                                if alt_match:
-                                    keyspace = alt_match.group(1)
-                                    table_name = alt_match.group(2)
-                                    break
                         if table_name:
                             break
         
-        if not table_name:
-            # Try to find table name in the filename
-            if hasattr(write_yaml, 'filename'):
-                filename = write_yaml.filename
-                parts = os.path.basename(filename).split('_')
-                if len(parts) > 0:
-                    table_name = parts[-1].split('.')[0]
-        
-        if not table_name:
-            return "# Error: Could not determine table name from write YAML"
-        
-        # Determine columns for the select statement
-        columns = []
-        
-        # Always include the primary key columns
-        columns.extend(primary_key_columns)
-        
-        # Try to find other columns that might be interesting for read operations
-        timestamp_cols = ['insertedtimestamp', 'created_at', 'timestamp', 'last_updated']
-        for col in timestamp_cols:
-            if yaml_data and 'bindings' in yaml_data and col in yaml_data['bindings']:
-                if col not in columns:
-                    columns.append(col)
+            if not table_name:
+                # Try to extract from CREATE TABLE statement
+                if yaml_data and 'blocks' in yaml_data:
+                    for block_name, block_data in yaml_data['blocks'].items():
+                        if 'ops' in block_data:
+                            for op_name, op_value in block_data['ops'].items():
+                                if isinstance(op_value, str) and 'CREATE TABLE' in op_value:
+                                    # Extract table name from create statement
+                                    table_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+<<keyspace:([^>]+)>>\.(\w+)', op_value)
+                                    if table_match:
+                                        keyspace = table_match.group(1)
+                                        table_name = table_match.group(2)
+                                        break
+                                    # Try alternative pattern
+                                    alt_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+(\w+)\.(\w+)', op_value)
+                                    if alt_match:
+                                        keyspace = alt_match.group(1)
+                                        table_name = alt_match.group(2)
+                                        break
+                            if table_name:
+                                break
         
-        # If no timestamp column found, add a default one
-        if not any(col in columns for col in timestamp_cols):
-            columns.append('insertedtimestamp')
+            if not table_name:
+                # Try to find table name in the filename
+                if hasattr(write_yaml, 'filename'):
+                    filename = write_yaml.filename
+                    parts = os.path.basename(filename).split('_')
+                    if len(parts) > 0:
+                        table_name = parts[-1].split('.')[0]
+        
+            if not table_name:
+                return "# Error: Could not determine table name from write YAML"
+        
+            # Without a CSV, reads reuse the write bindings of the key columns; index
+            # reads always reuse the write bindings of the indexed columns
+            write_bindings = {}
+            if yaml_data and 'bindings' in yaml_data:
+                write_bindings = {
+                    name: str(binding).strip().rstrip(';')
+                    for name, binding in yaml_data['bindings'].items()
+                }
+            
+            # Read every column of the table; the key layout decides which ops apply
+            if layout and layout["primary_key"]:
+                columns = list(layout["columns"])
+                partition_columns = layout["primary_key"][0]
+                clustering_columns = [col for part in layout["primary_key"][1:] for col in part]
+                clustering_order = layout["clustering_order"]
+                bound_columns = (list(primary_key_columns) if csv_file_path else
+                                 [col for col in partition_columns + clustering_columns if col in write_bindings])
+            else:
+                columns = list(primary_key_columns)
+                partition_columns = list(primary_key_columns)
+                clustering_columns = []
+                clustering_order = {}
+                bound_columns = list(primary_key_columns)
+            
+            indexes = []
+            if layout and index_statements:
+                indexes = [
+                    index for index in self.parse_cql("\n".join(index_statements))["indices"]
+                    if index["table"].split('.')[-1] == table_name and index["column"] in write_bindings
+                ]
+            
+            rampup_match = re.search(r'TEMPLATE\(rampup-cycles,\s*(\d+)\)', str(write_yaml))
+            key_count = int(rampup_match.group(1)) if rampup_match else 1000000
+            
+            return self._build_read_yaml(
+                keyspace, table_name, columns, partition_columns, clustering_columns, clustering_order,
+                bound_columns, csv_file_path, skew_profile, write_bindings, key_count, read_patterns,
+                indexes, layout["columns"] if layout else None
+            )
+            
+        except ValueError:
+            # Invalid options or key sources are the caller's to report
+            raise
+        except Exception as e:
+            # If there's an error, return a comment explaining the error
+            return f"# Error generating read YAML: {str(e)}"
+
+    def convert_ingestion_to_read_yaml(self, ingestion_yaml: str, csv_path: Optional[str] = None,
+                                       skew_profile: Optional[Dict[str, Any]] = None,
+                                       read_patterns: Optional[Dict[str, Any]] = None) -> str:
+        """Convert an ingestion (write) YAML into a read YAML sampling keys from a DSBulk CSV"""
+        return generate_read_yaml_from_text(ingestion_yaml, csv_path, skew_profile=skew_profile,
+                                            read_patterns=read_patterns)
+
+    def _preprocess_yaml(self, yaml_content: str) -> str:
+        """Preprocess YAML content to fix common syntax issues"""
+        return yaml_utils.repair_yaml(yaml_content)
+
+    def _build_read_yaml(
+        self,
+        keyspace: str,
+        table_name: str,
+        columns: List[str],
+        partition_columns: List[str],
+        clustering_columns: List[str],
+        clustering_order: Dict[str, str],
+        bound_columns: List[str],
+        csv_file_path: Optional[str],
+        skew_profile: Optional[Dict[str, Any]] = None,
+        write_bindings: Optional[Dict[str, str]] = None,
+        key_count: int = 1000000,
+        read_patterns: Optional[Dict[str, Any]] = None,
+        indexes: Optional[List[Dict[str, Any]]] = None,
+        column_types: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Assemble a read YAML with one op per read pattern, and one read block per skew phase
+        
+        Every key column binding starts from the same sampled row (the same
+        CSV row, or the same rampup cycle), so the values of one cycle
+        always belong to a row that was written. Index reads draw their
+        values from the write bindings of the indexed columns the same way.
+        """
+        phases = read_phases(skew_profile, "read1")
+        cycles = phase_cycles(skew_profile, "TEMPLATE(read-cycles,1000)")
+        
+        if csv_file_path:
+            bound_columns = sampler_key_columns(csv_file_path, partition_columns, bound_columns)
+        else:
+            missing = [col for col in partition_columns if col not in (write_bindings or {})]
+            if missing:
+                raise ValueError(f"No write binding for key columns {', '.join(missing)}; provide a CSV path")
+        
+        phase_ops = {
+            phase["block"]: plan_read_ops(
+                keyspace, table_name, columns, partition_columns, clustering_columns,
+                clustering_order, bound_columns, read_patterns, phase["suffix"],
+                indexes=indexes, column_types=column_types
+            )
+            for phase in phases
+        }
         
         # Create the read YAML
-        read_yaml_lines = [
-            "scenarios:",
-            "  default:",
-            f"    read1: run driver=cql tags='block:read1' cycles==TEMPLATE(read-cycles,1000) threads=auto",
-            "",
-            "bindings:"
-        ]
-        
-        # Primary key in CSVSampler format
-        primary_key_column = primary_key_columns[0]  # Use the first primary key column for CSVSampler
-        read_yaml_lines.append(f"  {primary_key_column}: CSVSampler('{primary_key_column}','{primary_key_column}-weight','{csv_file_path}');")
+        read_yaml_lines = []
+        if is_skewed(skew_profile):
+            read_yaml_lines.append(f"# Key skew: {describe_skew_profile(skew_profile)}")
+            csv_warning = check_sampler_csv(csv_file_path, bound_columns[0], skew_profile) if csv_file_path else None
+            if csv_warning:
+                read_yaml_lines.append(f"# Warning: {csv_warning}")
+        if len(phase_ops[phases[0]["block"]]) > 1:
+            read_yaml_lines.append(f"# Read mix: {describe_read_ops(phase_ops[phases[0]['block']])}")
+        
+        read_yaml_lines.extend(["scenarios:", "  default:"])
+        for phase in phases:
+            read_yaml_lines.append(
+                f"    {phase['block']}: run driver=cql tags='block:{phase['block']}' cycles=={cycles} threads=auto"
+            )
+        read_yaml_lines.extend(["", "bindings:"])
+        
+        for phase in phases:
+            suffix = phase["suffix"]
+            if csv_file_path:
+                # Key columns in CSVSampler format, all weighted by the first key column
+                weights = weight_column(bound_columns[0], phase["phase"])
+                for key_col in bound_columns:
+                    read_yaml_lines.append(
+                        f"  {key_col}{suffix}: CSVSampler('{key_col}','{weights}','{csv_file_path}');"
+                    )
+            else:
+                # Re-derive the written key values from a chosen rampup cycle
+                index_binding = key_index_binding(skew_profile, key_count, phase["phase"])
+                for key_col in bound_columns:
+                    read_yaml_lines.append(f"  {key_col}{suffix}: {index_binding}; {write_bindings[key_col]};")
+            
+            # Values of indexed columns, as written at a chosen rampup cycle
+            index_columns = list(dict.fromkeys(op["column"] for op in phase_ops[phase["block"]] if op.get("column")))
+            value_binding = key_index_binding(skew_profile, key_count, phase["phase"])
+            for column in index_columns:
+                read_yaml_lines.append(
+                    f"  {index_value_binding(column)}{suffix}: {value_binding}; {write_bindings[column]};"
+                )
         read_yaml_lines.append("")
         
         # Add blocks section
-        read_yaml_lines.extend([
-            "blocks:",
-            "  read1:",
-            "    params:",
-            "      cl: TEMPLATE(read_cl,LOCAL_QUORUM)",
-            "      instrument: true",
-            "      prepared: true",
-            "    ops:",
-            f"      read_by_{primary_key_column}: |"
-        ])
-        
-        # Create a SELECT statement with primary key as WHERE clause
-        selected_columns = ", ".join(columns)
-        select_statement = [
-            f"        SELECT {selected_columns}",
-            f"        FROM <<keyspace:{keyspace}>>.{table_name}",
-            f"        WHERE {primary_key_column} = {{{primary_key_column}}}"
-        ]
-        
-        # Add additional primary key columns to WHERE clause if any
-        for i, pk_col in enumerate(primary_key_columns[1:], 1):
-            select_statement.append(f"        AND {pk_col} = {{{pk_col}}}")
-        
-        select_statement.append("        LIMIT 1;")
-        
-        # Add select statement to YAML
-        read_yaml_lines.extend(select_statement)
+        read_yaml_lines.append("blocks:")
+        for phase in phases:
+            ops = phase_ops[phase["block"]]
+            read_yaml_lines.extend([
+                f"  {phase['block']}:",
+                "    params:",
+                "      cl: TEMPLATE(read_cl,LOCAL_QUORUM)",
+                "      instrument: true",
+                "      prepared: true",
+                "    ops:"
+            ])
+            
+            for op in ops:
+                if len(ops) == 1:
+                    read_yaml_lines.append(f"      {op['name']}: |")
+                    indent = "        "
+                else:
+                    read_yaml_lines.extend([
+                        f"      {op['name']}:",
+                        f"        ratio: {op['ratio']}",
+                        "        stmt: |"
+                    ])
+                    indent = "          "
+                read_yaml_lines.extend(f"{indent}{line}" for line in op["stmt"].split("\n"))
         
         return "\n".join(read_yaml_lines)
-            
-    except Exception as e:
-        # If there's an error, return a comment explaining the error
-        return f"# Error generating read YAML: {str(e)}"
-
-def _preprocess_yaml(self, yaml_content: str) -> str:
-    """Preprocess YAML content to fix common syntax issues"""
-    if isinstance(yaml_content, bytes):
-        yaml_content = yaml_content.decode('utf-8')
-    
-    # Fix common issues:
-    
-    # 1. Remove trailing semicolons in bindings section
-    lines = yaml_content.split('\n')
-    in_bindings = False
-    
-    for i, line in enumerate(lines):
-        if line.strip() == 'bindings:':
-            in_bindings = True
-        elif line.strip() and line[0] not in ' \t' and in_bindings:
-            in_bindings = False
-        
-        if in_bindings and ':' in line and line.rstrip().endswith(';'):
-            binding_parts = line.split(':', 1)
-            binding_name = binding_parts[0]
-            binding_value = binding_parts[1].rstrip(';')
-            lines[i] = f"{binding_name}:{binding_value}"
-    
-    # 2. Fix extra commas in CREATE TABLE statements
-    content = '\n'.join(lines)
-    content = re.sub(r',(\s*PRIMARY\s+KEY)', r'\1', content)
-    content = re.sub(r',\s*\)', r'\n)', content)
-    
-    # 3. Fix standalone semicolons
-    content = re.sub(r'^\s*;\s*$', '', content, flags=re.MULTILINE)
-    
-    # 4. Fix CREATE TABLE statements ending with semicolon on a separate line
-    content = re.sub(r'\)\s*\n\s*;', r'\);', content)
-    
-    # 5. Fix INSERT statements with trailing commas before values or closing parentheses
-    content = re.sub(r',\s*\)\s*values', r'\n) values', content, flags=re.MULTILINE | re.IGNORECASE)
-    content = re.sub(r',\s*\);', r'\n);', content, flags=re.MULTILINE)
-    
-    # Fix YAML structure issues (indentation, etc.)
-    lines = content.split('\n')
-    for i, line in enumerate(lines):
-        # Fix indentation for rampup1 section
-        if line.strip() == 'rampup1:' and i > 0 and lines[i-1].strip().endswith(';'):
-            indent = re.match(r'(\s*)', line).group(1)
-            if len(indent) == 0:
-                lines[i] = '  ' + line
-        
-        # Fix indentation for params, ops, etc.
-        if any(key in line for key in ['params:', 'ops:', 'instrument:', 'prepared:']) and ':' in line:
-            if len(re.match(r'(\s*)', line).group(1)) == 0:
-                lines[i] = '    ' + line
-    
-    return '\n'.join(lines)
 
-def _generate_read_yaml_from_text(self, yaml_content: str, csv_file_path: str, primary_key_columns: List[str]) -> str:
-    """
-    Fallback method to generate read YAML using regex when YAML parsing fails.
-    This is a more robust approach for malformed YAML files.
-    """
-    # Try to extract table information using regex
-    table_name = None
-    keyspace = 'baselines'  # Default keyspace
-    
-    # Try to extract from CREATE TABLE statement
-    create_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+<<keyspace:([^>]+)>>\.(\w+)', yaml_content)
-    if create_match:
-        keyspace = create_match.group(1)
-        table_name = create_match.group(2)
-    else:
-        # Try alternative pattern
-        alt_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+(\w+)\.(\w+)', yaml_content)
-        if alt_match:
-            keyspace = alt_match.group(1)
-            table_name = alt_match.group(2)
+    def _generate_read_yaml_from_text(self, yaml_content: str, csv_file_path: str, primary_key_columns: List[str],
+                                      skew_profile: Optional[Dict[str, Any]] = None,
+                                      read_patterns: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Fallback method to generate read YAML using regex when YAML parsing fails.
+        This is a more robust approach for malformed YAML files.
+        """
+        # Try to extract table information using regex
+        table_name = None
+        keyspace = 'baselines'  # Default keyspace
     
-    # If still no table name, try the insert statement
-    if not table_name:
-        insert_match = re.search(r'insert\s+into\s+<<keyspace:([^>]+)>>\.(\w+)', yaml_content, re.IGNORECASE)
-        if insert_match:
-            keyspace = insert_match.group(1)
-            table_name = insert_match.group(2)
+        # Try to extract from CREATE TABLE statement
+        create_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+<<keyspace:([^>]+)>>\.(\w+)', yaml_content)
+        if create_match:
+            keyspace = create_match.group(1)
+            table_name = create_match.group(2)
         else:
             # Try alternative pattern
-            alt_match = re.search(r'insert\s+into\s+(\w+)\.(\w+)', yaml_content, re.IGNORECASE)
+            alt_match = re.search(r'CREATE\s+TABLE\s+if\s+not\s+exists\s+(\w+)\.(\w+)', yaml_content)
             if alt_match:
                 keyspace = alt_match.group(1)
                 table_name = alt_match.group(2)
     
-    if not table_name:
-        return "# Error: Could not determine table name from write YAML"
-    
-    # Create the read YAML
-    read_yaml_lines = [
-        "scenarios:",
-        "  default:",
-        f"    read1: run driver=cql tags='block:read1' cycles==TEMPLATE(read-cycles,1000) threads=auto",
-        "",
-        "bindings:"
-    ]
-    
-    # Primary key in CSVSampler format
-    primary_key_column = primary_key_columns[0]  # Use the first primary key column for CSVSampler
-    read_yaml_lines.append(f"  {primary_key_column}: CSVSampler('{primary_key_column}','{primary_key_column}-weight','{csv_file_path}');")
-    read_yaml_lines.append("")
-    
-    # Add blocks section
-    read_yaml_lines.extend([
-        "blocks:",
-        "  read1:",
-        "    params:",
-        "      cl: TEMPLATE(read_cl,LOCAL_QUORUM)",
-        "      instrument: true",
-        "      prepared: true",
-        "    ops:",
-        f"      read_by_{primary_key_column}: |"
-    ])
-    
-    # Create a SELECT statement with primary key as WHERE clause
-    selected_columns = ", ".join(primary_key_columns + ["insertedtimestamp"])  # Include timestamp
-    select_statement = [
-        f"        SELECT {selected_columns}",
-        f"        FROM <<keyspace:{keyspace}>>.{table_name}",
-        f"        WHERE {primary_key_column} = {{{primary_key_column}}}"
-    ]
-    
-    # Add additional primary key columns to WHERE clause if any
-    for i, pk_col in enumerate(primary_key_columns[1:], 1):
-        select_statement.append(f"        AND {pk_col} = {{{pk_col}}}")
-    
-    select_statement.append("        LIMIT 1;")
+        # If still no table name, try the insert statement
+        if not table_name:
+            insert_match = re.search(r'insert\s+into\s+<<keyspace:([^>]+)>>\.(\w+)', yaml_content, re.IGNORECASE)
+            if insert_match:
+                keyspace = insert_match.group(1)
+                table_name = insert_match.group(2)
+            else:
+                # Try alternative pattern
+                alt_match = re.search(r'insert\s+into\s+(\w+)\.(\w+)', yaml_content, re.IGNORECASE)
+                if alt_match:
+                    keyspace = alt_match.group(1)
+                    table_name = alt_match.group(2)
     
-    # Add select statement to YAML
-    read_yaml_lines.extend(select_statement)
+        if not table_name:
+            return "# Error: Could not determine table name from write YAML"
     
-    return "\n".join(read_yaml_lines)
+        # Without a parsed layout every given key column is matched by equality
+        return self._build_read_yaml(
+            keyspace, table_name, primary_key_columns, primary_key_columns, [], {},
+            primary_key_columns, csv_file_path, skew_profile, read_patterns=read_patterns
+        )
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+# backend/sizing_planner.py
+"""
+Dataset sizing for generated write workloads.
+
+Options:
+    {
+        "target_size": "500GB",
+        "scope": "node",
+        "nodes": 6,
+        "datacenter": "dc1",
+        "replication_factor": null,
+        "compression_ratio": 1.0,
+        "row_overhead_bytes": null,
+        "write_rate": 20000,
+        "tables": {"shop.orders": {"target_size": "2TB"}}
+    }
+
+target_size is a byte count or a size such as "500GB" or "1.5TiB" (units
+are binary: 1 GB = 1024^3 bytes). With scope "node" it is the data each of
+the nodes should hold once the rampup finishes; with "dataset" it is the
+unreplicated size of the table. The replication factor defaults to the one
+of the table's keyspace, for "datacenter" (or the largest one) when the
+keyspace uses NetworkTopologyStrategy; nodes is the node count of that
+datacenter.
+
+A row takes its estimated payload (see row_sizing) plus row_overhead_bytes
+on disk, divided by compression_ratio. row_overhead_bytes defaults to an
+estimate of the row and cell headers of the SSTable format. Each rampup
+cycle writes one row, so the planned cycle count replaces the default
+rampup-cycles; the rampup time is estimated from write_rate, in writes per
+second, measured by an earlier run or assumed.
+"""
+import json
+import re
+from typing import Dict, List, Optional, Any
+
+from row_sizing import plan_column_sizes, resolve_row_size_options
+
+SIZING_SCOPES = ("node", "dataset")
+
+DEFAULT_NODES = 3
+DEFAULT_WRITE_RATE = 10000.0
+
+# Row header (flags, timestamp and TTL deltas) and per-cell header of the SSTable format
+ROW_HEADER_BYTES = 8
+CELL_HEADER_BYTES = 3
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4, "p": 1024 ** 5}
+_SIZE_PATTERN = re.compile(r"^\s*([\d.]+)\s*([kmgtp]?)(?:i?b)?\s*$", re.IGNORECASE)
+
+
+def parse_size(value: Any) -> int:
+    """Bytes of a size given as a number or a string such as "500GB" """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _SIZE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid size: {value}. Expected bytes or a size such as 500GB")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def format_size(size_bytes: float) -> str:
+    """Human-readable binary size, e.g. 1.5 TiB"""
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(size_bytes) < 1024 or unit == "TiB":
+            return f"{size_bytes:.0f} {unit}" if unit == "B" else f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+
+
+def format_duration(seconds: float) -> str:
+    """Duration as days, hours and minutes, e.g. 3h 25m"""
+    minutes = int(round(seconds / 60.0))
+    if minutes < 1:
+        return f"{seconds:.0f}s"
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = [f"{days}d"] if days else []
+    if hours or days:
+        parts.append(f"{hours}h")
+    parts.append(f"{minutes}m")
+    return " ".join(parts)
+
+
+def normalize_sizing_options(options: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Validate sizing options and fill in defaults; empty means the default rampup"""
+    if not options:
+        return None
+
+    scope = options.get("scope", "node")
+    if scope not in SIZING_SCOPES:
+        raise ValueError(f"Unsupported sizing scope: {scope}. Expected one of {', '.join(SIZING_SCOPES)}")
+    if "target_size" not in options:
+        raise ValueError("Sizing options need a target_size")
+
+    normalized = {
+        "target_size": options["target_size"],
+        "target_bytes": parse_size(options["target_size"]),
+        "scope": scope,
+        "nodes": int(options.get("nodes", DEFAULT_NODES)),
+        "datacenter": options.get("datacenter"),
+        "replication_factor": int(options["replication_factor"]) if options.get("replication_factor") else None,
+        "compression_ratio": float(options.get("compression_ratio", 1.0)),
+        "row_overhead_bytes": int(options["row_overhead_bytes"]) if options.get("row_overhead_bytes") is not None else None,
+        "write_rate": float(options["write_rate"]) if options.get("write_rate") else None,
+        "rate_source": options.get("rate_source", "assumed" if options.get("write_rate") else "default"),
+        "tables": options.get("tables", {})
+    }
+
+    if normalized["target_bytes"] < 1:
+        raise ValueError("target_size must be positive")
+    if normalized["nodes"] < 1:
+        raise ValueError("nodes must be at least 1")
+    if normalized["replication_factor"] is not None and normalized["replication_factor"] < 1:
+        raise ValueError("replication_factor must be at least 1")
+    if normalized["compression_ratio"] <= 0:
+        raise ValueError("compression_ratio must be positive")
+    if normalized["row_overhead_bytes"] is not None and normalized["row_overhead_bytes"] < 0:
+        raise ValueError("row_overhead_bytes must not be negative")
+    if normalized["write_rate"] is not None and normalized["write_rate"] <= 0:
+        raise ValueError("write_rate must be positive")
+
+    return normalized
+
+
+def parse_sizing_json(options_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse sizing options passed as a JSON form field"""
+    if not options_json:
+        return None
+    return normalize_sizing_options(json.loads(options_json))
+
+
+def resolve_sizing_options(options: Optional[Dict[str, Any]], full_table_name: str,
+                           table_name: str) -> Optional[Dict[str, Any]]:
+    """Merge a table's entry under "tables" over the top-level options"""
+    if not options:
+        return None
+    table_options = options["tables"].get(full_table_name) or options["tables"].get(table_name)
+    if not table_options:
+        return options
+
+    merged = {key: value for key, value in options.items() if key not in ("tables", "target_bytes")}
+    merged.update(table_options)
+    return normalize_sizing_options(merged)
+
+
+def keyspace_replication_factor(cql_schema: Dict[str, Any], keyspace: Optional[str],
+                                datacenter: Optional[str] = None) -> Optional[int]:
+    """Replication factor of a keyspace in a datacenter, or its largest one"""
+    # schema_parser imports this module
+    from schema_parser import replication_settings
+
+    keyspace_info = cql_schema.get("keyspaces", {}).get(keyspace) if keyspace else None
+    if not keyspace_info:
+        return None
+    _, factors = replication_settings(keyspace_info)
+    if datacenter and datacenter in factors:
+        return factors[datacenter]
+    return max(factors.values()) if factors else None
+
+
+def measured_write_rate(timers: Dict[str, Dict[str, float]]) -> Optional[float]:
+    """
+    Write rate of an earlier rampup, from its exit summary timers (see
+    nb5_executor.parse_timer_summary).
+    """
+    rates = [timer["ops_per_second"] for name, timer in timers.items()
+             if "rampup" in name and "cycles.servicetime" in name and timer.get("ops_per_second")]
+    return max(rates) if rates else None
+
+
+def plan_dataset(options: Dict[str, Any], row_bytes: int, regular_columns: int,
+                 replication_factor: Optional[int]) -> Dict[str, Any]:
+    """
+    Rampup cycles and time for a table whose rows hold row_bytes of payload.
+
+    replication_factor is the keyspace's; the options' own factor wins.
+    """
+    factor = options["replication_factor"] or replication_factor or 1
+    overhead = options["row_overhead_bytes"]
+    if overhead is None:
+        overhead = ROW_HEADER_BYTES + CELL_HEADER_BYTES * regular_columns
+    disk_row_bytes = (row_bytes + overhead) / options["compression_ratio"]
+
+    if options["scope"] == "node":
+        dataset_bytes = options["target_bytes"] * options["nodes"] / factor
+    else:
+        dataset_bytes = options["target_bytes"]
+    cycles = max(1, int(dataset_bytes // disk_row_bytes))
+
+    write_rate = options["write_rate"] or DEFAULT_WRITE_RATE
+    replicated_bytes = cycles * disk_row_bytes * factor
+    return {
+        "cycles": cycles,
+        "row_bytes": row_bytes,
+        "disk_row_bytes": round(disk_row_bytes, 1),
+        "replication_factor": factor,
+        "replication_source": "options" if options["replication_factor"] else
+                              "keyspace" if replication_factor else "default",
+        "nodes": options["nodes"],
+        "datacenter": options["datacenter"],
+        "dataset_bytes": int(cycles * disk_row_bytes),
+        "replicated_bytes": int(replicated_bytes),
+        "bytes_per_node": int(replicated_bytes / options["nodes"]),
+        "write_rate": write_rate,
+        "rate_source": options["rate_source"] if options["write_rate"] else "default",
+        "estimated_seconds": round(cycles / write_rate, 1)
+    }
+
+
+def plan_table_sizing(cql_schema: Dict[str, Any], full_table_name: str, table_info: Dict[str, Any],
+                      sizing: Optional[Dict[str, Any]],
+                      row_size: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Dataset plan of a table of a parsed schema, or None without sizing options"""
+    table_sizing = resolve_sizing_options(sizing, full_table_name, table_info["name"])
+    if not table_sizing:
+        return None
+
+    table_row_size = resolve_row_size_options(row_size, full_table_name, table_info["name"])
+    key_columns = [col for part in table_info["primary_key"] for col in part]
+    size_plan = plan_column_sizes(table_info["columns"], key_columns, table_row_size)
+    row_bytes = sum(entry["bytes"] for entry in size_plan.values())
+
+    replication_factor = keyspace_replication_factor(cql_schema, table_info["keyspace"], table_sizing["datacenter"])
+    return plan_dataset(table_sizing, row_bytes, len(table_info["columns"]) - len(key_columns), replication_factor)
+
+
+def sizing_command_params(plan: Optional[Dict[str, Any]]) -> Optional[str]:
+    """nb5 parameters applying a dataset plan to a generated write workload"""
+    if not plan:
+        return None
+    return f"rampup-cycles={plan['cycles']}"
+
+
+def describe_sizing(plan: Dict[str, Any]) -> List[str]:
+    """YAML comment lines reporting a dataset plan"""
+    where = f" in {plan['datacenter']}" if plan["datacenter"] else ""
+    return [
+        f"# Dataset: {plan['cycles']:,} rows of ~{plan['disk_row_bytes']:.0f} bytes on disk = "
+        f"{format_size(plan['dataset_bytes'])}, {format_size(plan['bytes_per_node'])} per node "
+        f"over {plan['nodes']} node{'s' if plan['nodes'] != 1 else ''}{where} at RF {plan['replication_factor']}",
+        f"# Estimated rampup time: {format_duration(plan['estimated_seconds'])} at "
+        f"{plan['write_rate']:,.0f} writes/s ({plan['rate_source']})"
+    ]
@@ -0,0 +1,214 @@
+# backend/skew_profiles.py
+"""
+Hot-key skew profiles for generated read workloads.
+
+A profile describes how reads are spread over the key space:
+    {"type": "uniform"}
+    {"type": "zipf", "exponent": 1.1}
+    {"type": "hotspot", "hot_set_fraction": 0.05, "hot_traffic_fraction": 0.8}
+
+"hot_set_size" can replace "hot_set_fraction" with an absolute key count.
+"rotations" > 1 splits the read into phases that each move the hot set to
+a different part of the key space, every phase running "rotation_cycles"
+cycles.
+
+A profile is realised either as CSVSampler weight columns (one per phase)
+or as nb5 distribution bindings that pick which written cycle to read.
+"""
+import csv
+import json
+import math
+import os
+from typing import Dict, List, Optional, Any
+
+SKEW_TYPES = ("uniform", "zipf", "hotspot")
+
+DEFAULT_ZIPF_EXPONENT = 1.1
+DEFAULT_HOT_SET_FRACTION = 0.05
+DEFAULT_HOT_TRAFFIC_FRACTION = 0.8
+
+
+def normalize_skew_profile(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate a skew profile and fill in defaults"""
+    profile = dict(profile or {})
+    skew_type = profile.get("type", "uniform")
+    if skew_type not in SKEW_TYPES:
+        raise ValueError(f"Unsupported skew type: {skew_type}. Expected one of {', '.join(SKEW_TYPES)}")
+
+    normalized = {
+        "type": skew_type,
+        "exponent": float(profile.get("exponent", DEFAULT_ZIPF_EXPONENT)),
+        "hot_set_fraction": float(profile.get("hot_set_fraction", DEFAULT_HOT_SET_FRACTION)),
+        "hot_set_size": int(profile["hot_set_size"]) if profile.get("hot_set_size") else None,
+        "hot_traffic_fraction": float(profile.get("hot_traffic_fraction", DEFAULT_HOT_TRAFFIC_FRACTION)),
+        "rotations": int(profile.get("rotations", 1)),
+        "rotation_cycles": profile.get("rotation_cycles")
+    }
+
+    if normalized["exponent"] <= 0:
+        raise ValueError("Zipf exponent must be positive")
+    if not 0 < normalized["hot_set_fraction"] <= 1:
+        raise ValueError("hot_set_fraction must be in (0, 1]")
+    if not 0 <= normalized["hot_traffic_fraction"] <= 1:
+        raise ValueError("hot_traffic_fraction must be in [0, 1]")
+    if normalized["rotations"] < 1:
+        raise ValueError("rotations must be at least 1")
+
+    return normalized
+
+
+def parse_skew_profile_json(profile_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse a skew profile passed as a JSON form field; empty means no skew"""
+    if not profile_json:
+        return None
+    return normalize_skew_profile(json.loads(profile_json))
+
+
+def is_skewed(profile: Optional[Dict[str, Any]]) -> bool:
+    return bool(profile) and (profile["type"] != "uniform" or profile["rotations"] > 1)
+
+
+def hot_set_size(profile: Dict[str, Any], key_count: int) -> int:
+    """Number of keys in the hot set (also the distance the hot set rotates by)"""
+    if profile["hot_set_size"]:
+        return max(1, min(key_count, profile["hot_set_size"]))
+    return max(1, min(key_count, int(math.ceil(key_count * profile["hot_set_fraction"]))))
+
+
+def sampler_weight(profile: Dict[str, Any], rank: int, key_count: int, phase: int = 0) -> float:
+    """
+    Sampling weight of the key at position rank (0-based) during a phase.
+
+    Keys are ranked in an arbitrary but fixed order (hash order for unloads);
+    each phase shifts the ranks by one hot set.
+    """
+    if profile["type"] == "uniform":
+        return 1.0
+
+    position = (rank - phase * hot_set_size(profile, key_count)) % key_count
+
+    if profile["type"] == "zipf":
+        return 1.0 / (position + 1) ** profile["exponent"]
+
+    hot_keys = hot_set_size(profile, key_count)
+    if position < hot_keys:
+        return profile["hot_traffic_fraction"] / hot_keys
+    cold_keys = key_count - hot_keys
+    return (1.0 - profile["hot_traffic_fraction"]) / cold_keys if cold_keys else 0.0
+
+
+def weight_column(label: str, phase: int = 0) -> str:
+    """Name of the CSVSampler weight column used during a phase"""
+    return f"{label}-weight" if phase == 0 else f"{label}-weight-{phase}"
+
+
+def check_sampler_csv(csv_path: str, label: str, profile: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Check that a sampler CSV has the weight columns a skewed profile reads.
+
+    A CSV without them, such as a raw DSBulk unload, would be read
+    uniformly whatever the profile says, so that raises ValueError. When
+    the CSV does not exist yet, returns a warning for the YAML header.
+    """
+    if not is_skewed(profile):
+        return None
+    columns = [weight_column(label, phase["phase"]) for phase in read_phases(profile, "read")]
+    if not os.path.isfile(csv_path):
+        return (f"{csv_path} does not exist yet; the key skew only applies if it is built by "
+                f"build_sampler_csv with this profile (weight columns {', '.join(columns)})")
+
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), None) or []
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(f"{csv_path} has no weight column {', '.join(missing)}, so reads would be uniform; "
+                         f"build it from the unload with build_sampler_csv and the same skew profile")
+    return None
+
+
+def sampler_key_columns(csv_path: str, partition_columns: List[str], key_columns: List[str]) -> List[str]:
+    """
+    Key columns a read workload can bind from a sampler CSV.
+
+    Columns missing from an existing CSV are left unbound, so reads fall
+    back to the ops the partition key alone supports; a missing partition
+    key column raises ValueError. A CSV that does not exist yet is assumed
+    to hold every key column.
+    """
+    if not os.path.isfile(csv_path):
+        return list(key_columns)
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), None) or []
+    missing = [column for column in partition_columns if column not in header]
+    if missing:
+        raise ValueError(f"{csv_path} has no partition key column {', '.join(missing)}; "
+                         f"build it with build_sampler_csv from an unload of the key columns")
+    return [column for column in key_columns if column in header]
+
+
+def key_index_binding(profile: Optional[Dict[str, Any]], key_count: int, phase: int = 0) -> str:
+    """
+    nb5 functions choosing which written cycle (0..key_count-1) to read.
+
+    Composed in front of a column's write binding, this reproduces the value
+    written at that cycle, so all key columns stay consistent.
+    """
+    last = key_count - 1
+    if not profile or profile["type"] == "uniform":
+        binding = f"HashRange(0L,{last}L)"
+    elif profile["type"] == "zipf":
+        binding = f"Zipf({key_count},{profile['exponent']}); Add(-1L)"
+    else:
+        hot_keys = hot_set_size(profile, key_count)
+        hot_fraction = profile["hot_traffic_fraction"]
+        if hot_keys >= key_count:
+            binding = f"HashRange(0L,{last}L)"
+        else:
+            binding = (f"WeightedFuncs({hot_fraction},HashRange(0L,{hot_keys - 1}L),"
+                       f"{round(1.0 - hot_fraction, 6)},HashRange({hot_keys}L,{last}L))")
+
+    if profile and phase:
+        shift = phase * hot_set_size(profile, key_count)
+        binding += f"; Add({shift}L); Mod({key_count}L)"
+
+    return binding
+
+
+def read_phases(profile: Optional[Dict[str, Any]], block_name: str) -> List[Dict[str, Any]]:
+    """
+    Phases of a read scenario: one per hot-set rotation.
+
+    Without rotation there is a single phase using the plain block and
+    binding names, so generated YAML is unchanged.
+    """
+    rotations = profile["rotations"] if profile else 1
+    if rotations == 1:
+        return [{"phase": 0, "block": block_name, "suffix": ""}]
+    return [
+        {"phase": phase, "block": f"{block_name}_p{phase}", "suffix": f"_p{phase}"}
+        for phase in range(rotations)
+    ]
+
+
+def phase_cycles(profile: Optional[Dict[str, Any]], default_cycles: str) -> str:
+    """Cycle count of each read phase"""
+    if profile and profile["rotations"] > 1 and profile["rotation_cycles"]:
+        return str(profile["rotation_cycles"])
+    return default_cycles
+
+
+def describe_skew_profile(profile: Optional[Dict[str, Any]]) -> str:
+    """One-line description used in generated YAML headers"""
+    if not profile:
+        return "uniform"
+    if profile["type"] == "zipf":
+        description = f"zipf exponent {profile['exponent']}"
+    elif profile["type"] == "hotspot":
+        hot_set = (f"{profile['hot_set_size']} keys" if profile["hot_set_size"]
+                   else f"{profile['hot_set_fraction'] * 100:g}% of keys")
+        description = f"hotspot {hot_set} take {profile['hot_traffic_fraction'] * 100:g}% of reads"
+    else:
+        description = "uniform"
+    if profile["rotations"] > 1:
+        description += f", hot set rotated over {profile['rotations']} phases"
+    return description
@@ -0,0 +1,283 @@
+# backend/table_variants.py
+"""
+A/B variants of a table's options (compaction, compression, ...).
+
+Spec:
+    {
+        "table": "shop.orders",
+        "variants": {
+            "stcs": {"compaction": {"class": "SizeTieredCompactionStrategy"}},
+            "lcs": {"compaction": {"class": "LeveledCompactionStrategy", "sstable_size_in_mb": 160}},
+            "ucs": {"compaction": {"class": "UnifiedCompactionStrategy", "scaling_parameters": "T4"}},
+            "lz4_16k": {"compression": {"class": "LZ4Compressor", "chunk_length_in_kb": 16}}
+        },
+        "baseline": true,
+        "cycles": 1000000,
+        "read_cycles": 100000,
+        "threads": "auto",
+        "cyclerate": null,
+        "read_patterns": {"ratios": {"point": 1}},
+        "row_size": {"target_row_bytes": 1024},
+        "partitioning": {"rows_per_partition": 100}
+    }
+
+Every variant writes to its own copy of the table, named table_<variant>,
+created with the table's options overridden by the variant's. All variants
+share the bindings and cycle counts, so they write the same rows and read
+the same keys. With "baseline", an extra variant keeps the table's own
+options and the comparison reports every other variant relative to it.
+
+Variants run back to back: each drops and recreates its table, writes
+"cycles" rows, then reads "read_cycles" times.
+"""
+import json
+import re
+import time
+from typing import Dict, List, Optional, Any
+
+from nb5_executor import SUMMARY_REPORT_PARAMS, parse_timer_summary
+from partition_model import normalize_partition_options
+from read_patterns import describe_read_ops, normalize_read_patterns, plan_read_ops
+from row_sizing import normalize_row_size_options
+from skew_profiles import key_index_binding
+
+BASELINE_VARIANT = "baseline"
+DEFAULT_CYCLES = 1000000
+DEFAULT_READ_CYCLES = 100000
+
+# Variant names become table name suffixes
+_VARIANT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+
+# Compared per phase; for latencies lower is better
+COMPARED_METRICS = ("ops_per_second", "p50_ms", "p99_ms", "p999_ms")
+
+
+def normalize_variant_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a variant spec and fill in defaults"""
+    if not spec.get("table"):
+        raise ValueError("A variant spec needs a table")
+    if not spec.get("variants"):
+        raise ValueError("A variant spec needs at least one variant")
+    for name, options in spec["variants"].items():
+        if not _VARIANT_NAME_PATTERN.match(name) or name == BASELINE_VARIANT:
+            raise ValueError(f"Invalid variant name: {name}. Use letters, digits and underscores, "
+                             f"other than '{BASELINE_VARIANT}'")
+        if not isinstance(options, dict) or not options:
+            raise ValueError(f"Variant {name} needs a map of table options")
+
+    normalized = {
+        "table": spec["table"],
+        "variants": spec["variants"],
+        "baseline": bool(spec.get("baseline", True)),
+        "cycles": int(spec.get("cycles", DEFAULT_CYCLES)),
+        "read_cycles": int(spec.get("read_cycles", DEFAULT_READ_CYCLES)),
+        "threads": str(spec.get("threads", "auto")),
+        "cyclerate": float(spec["cyclerate"]) if spec.get("cyclerate") else None,
+        "read_patterns": normalize_read_patterns(spec.get("read_patterns")),
+        "row_size": normalize_row_size_options(spec.get("row_size")),
+        "partitioning": normalize_partition_options(spec.get("partitioning"))
+    }
+
+    if normalized["cycles"] < 1:
+        raise ValueError("cycles must be at least 1")
+    if normalized["read_cycles"] < 0:
+        raise ValueError("read_cycles must not be negative")
+    if normalized["cyclerate"] is not None and normalized["cyclerate"] <= 0:
+        raise ValueError("cyclerate must be positive")
+
+    return normalized
+
+
+def parse_variant_json(spec_json: str) -> Dict[str, Any]:
+    """Parse a variant spec passed as a JSON form field"""
+    return normalize_variant_spec(json.loads(spec_json))
+
+
+def cql_option_value(value: Any) -> str:
+    """CQL literal of a table option value; maps become map literals"""
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"'{key}': '{str(item).lower() if isinstance(item, bool) else item}'"
+                               for key, item in value.items()) + "}"
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        return str(value)
+    value = str(value).strip()
+    if value.startswith("{") or value.startswith("'") or re.match(r"^-?\d+(\.\d+)?$", value):
+        return value
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _variant_yaml(parser, table_info: Dict[str, Any], variant: str, with_options: Dict[str, str],
+                  plan: Dict[str, Any], spec: Dict[str, Any]) -> Dict[str, Any]:
+    """One variant's workload: recreate the table, write, then read"""
+    keyspace = table_info["keyspace"] or "baselines"
+    table_name = f"{table_info['name']}_{variant}"
+    variant_info = dict(table_info, name=table_name)
+    columns = list(table_info["columns"])
+    partition_columns = table_info["primary_key"][0]
+    clustering_columns = [col for part in table_info["primary_key"][1:] for col in part]
+    key_columns = partition_columns + clustering_columns
+    key_count = plan["partitioning"]["key_count"] if plan["partitioning"] else spec["cycles"]
+
+    read_ops = []
+    if spec["read_cycles"]:
+        read_ops = plan_read_ops(keyspace, table_name, columns, partition_columns, clustering_columns,
+                                 table_info["clustering_order"], key_columns, spec["read_patterns"],
+                                 prefix="read_")
+
+    rate = f" cyclerate={spec['cyclerate']:g}" if spec["cyclerate"] else ""
+    lines = [f"# Variant {variant} of {keyspace}.{table_info['name']}, written to {keyspace}.{table_name}"]
+    lines.extend(f"# {name} = {value}" for name, value in with_options.items())
+    if read_ops:
+        lines.append(f"# Read mix: {describe_read_ops(read_ops)}")
+    lines.extend([
+        "scenarios:",
+        "  default:",
+        "    schema: run driver=cql tags=block:schema threads==1 cycles==UNDEF",
+        f"    write: run driver=cql tags=block:write alias={variant}_write cycles=={spec['cycles']} "
+        f"threads={spec['threads']}{rate}"
+    ])
+    if read_ops:
+        lines.append(f"    read: run driver=cql tags=block:read alias={variant}_read "
+                     f"cycles=={spec['read_cycles']} threads={spec['threads']}{rate}")
+
+    # Reads re-derive the keys of rows written at a uniformly chosen write cycle
+    lines.extend(["", "bindings:"])
+    lines.extend(f"  {col}: {binding};" for col, binding in plan["bindings"].items())
+    index_binding = key_index_binding(None, min(key_count, spec["cycles"]))
+    lines.extend(f"  read_{col}: {index_binding}; {plan['bindings'][col]};" for col in key_columns)
+
+    lines.extend(["", "blocks:", "  schema:", "    params:", "      prepared: false", "    ops:",
+                  "      drop_table: |",
+                  f"        DROP TABLE IF EXISTS <<keyspace:{keyspace}>>.{table_name};",
+                  "      create_table: |"])
+    lines.extend(f"        {line}" for line in parser.create_table_statement(variant_info, with_options))
+    lines.extend([
+        "  write:",
+        "    params:",
+        "      cl: TEMPLATE(write_cl,LOCAL_QUORUM)",
+        "      instrument: true",
+        "      prepared: true",
+        "    ops:",
+        "      insert: |",
+        f"        INSERT INTO <<keyspace:{keyspace}>>.{table_name} ({', '.join(columns)})",
+        f"        VALUES ({', '.join('{' + col + '}' for col in columns)});"
+    ])
+    if read_ops:
+        lines.extend([
+            "  read:",
+            "    params:",
+            "      cl: TEMPLATE(read_cl,LOCAL_QUORUM)",
+            "      instrument: true",
+            "      prepared: true",
+            "    ops:"
+        ])
+        for op in read_ops:
+            lines.extend([f"      {op['name']}:", f"        ratio: {op['ratio']}", "        stmt: |"])
+            lines.extend(f"          {line}" for line in op["stmt"].split("\n"))
+
+    return {
+        "variant": variant,
+        "table": f"{keyspace}.{table_name}",
+        "with_options": with_options,
+        "filename": f"{keyspace}_{table_name}.yaml",
+        "yaml": "\n".join(lines) + "\n"
+    }
+
+
+def build_variant_workloads(parser, schema_info: Dict[str, Any], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Build one workload per variant (baseline first).
+
+    parser is a CQLParser. The bindings come from a single write plan of
+    the table, so every variant writes identical rows.
+    """
+    full_name, table_info = parser.find_table(schema_info, spec["table"])
+    if not table_info:
+        raise ValueError(f"Table {spec['table']} not found in the schema")
+    if not table_info["primary_key"]:
+        raise ValueError(f"Table {full_name} has no primary key")
+
+    plan = parser.write_plan(table_info, full_name, spec["row_size"], spec["partitioning"])
+    base_options = dict(table_info.get("with_options") or {})
+
+    variants = {}
+    if spec["baseline"]:
+        variants[BASELINE_VARIANT] = base_options
+    for name, overrides in spec["variants"].items():
+        options = dict(base_options)
+        options.update({option: cql_option_value(value) for option, value in overrides.items()})
+        variants[name] = options
+
+    return [_variant_yaml(parser, table_info, name, options, plan, spec) for name, options in variants.items()]
+
+
+def _phase_metrics(timers: Dict[str, Dict[str, float]], alias: str) -> Optional[Dict[str, float]]:
+    """Service-time timer of one activity of a variant run"""
+    for name, timer in timers.items():
+        if name.startswith(f"{alias}.") and "servicetime" in name and "cycles" in name:
+            return timer
+    return None
+
+
+def compare_variants(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Side-by-side write and read metrics of finished variant runs.
+
+    The first variant (the baseline when there is one) is the reference:
+    every other variant reports the change of each metric in percent.
+    """
+    rows = []
+    reference = None
+    for result in results:
+        row = {"variant": result["variant"], "table": result["table"], "status": result["status"],
+               "write": result.get("write"), "read": result.get("read")}
+        if reference is None and row["write"]:
+            reference = row
+        elif reference is not None:
+            row["change_pct"] = {
+                phase: {
+                    metric: round(100.0 * (row[phase][metric] - reference[phase][metric]) / reference[phase][metric], 1)
+                    for metric in COMPARED_METRICS
+                    if reference[phase].get(metric) and row[phase].get(metric) is not None
+                }
+                for phase in ("write", "read") if row[phase] and reference[phase]
+            }
+        rows.append(row)
+    return rows
+
+
+def run_variant_comparison(executor, comparison: Dict[str, Any], host: str, datacenter: str, keyspace: str,
+                           additional_params: Optional[str] = None, timeout: int = 3600):
+    """
+    Run the workloads of a comparison back to back through an NB5Executor.
+
+    Meant for a background thread: comparison is updated in place with each
+    run's execution id, status and metrics, and its "comparison" table is
+    refreshed after every run.
+    """
+    params = f"{additional_params} {SUMMARY_REPORT_PARAMS}" if additional_params else SUMMARY_REPORT_PARAMS
+    comparison["status"] = "running"
+    for run in comparison["runs"]:
+        if comparison.get("cancelled"):
+            run["status"] = "skipped"
+            continue
+        try:
+            started = executor.execute_nb5_command(run["yaml"], host, datacenter, keyspace, params, timeout)
+            run["execution_id"] = started["execution_id"]
+            run["status"] = "running"
+            status = executor.wait_for_execution(started["execution_id"])
+        except Exception as e:
+            run["status"] = "error"
+            run["error"] = str(e)
+            continue
+
+        timers = parse_timer_summary(status["stdout"])
+        run["status"] = status["status"]
+        run["write"] = _phase_metrics(timers, f"{run['variant']}_write")
+        run["read"] = _phase_metrics(timers, f"{run['variant']}_read")
+        comparison["comparison"] = compare_variants(comparison["runs"])
+
+    comparison["status"] = "cancelled" if comparison.get("cancelled") else "completed"
+    comparison["end_time"] = time.time()
@@ -0,0 +1,161 @@
+# backend/tests/test_dsbulk_coordinator.py
+"""DSBulkRangeCoordinator against the stub dsbulk executable in tests/stubs"""
+import os
+
+import pytest
+
+import dsbulk_coordinator
+from dsbulk_coordinator import DSBulkRangeCoordinator
+from dsbulk_utils import MAX_TOKEN, MIN_TOKEN, DSBulkManager, split_token_ring
+
+STUB_DSBULK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs", "dsbulk")
+
+
+@pytest.fixture
+def stub_state(tmp_path, monkeypatch):
+    state = tmp_path / "stub"
+    monkeypatch.setenv("STUB_DSBULK_STATE", str(state))
+    monkeypatch.setenv("STUB_DSBULK_ROWS", "100")
+    monkeypatch.delenv("STUB_DSBULK_FAILURES", raising=False)
+    monkeypatch.delenv("STUB_DSBULK_FAIL_MATCH", raising=False)
+    return state
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays requested by the coordinator, without sleeping"""
+    delays = []
+    monkeypatch.setattr(dsbulk_coordinator.time, "sleep", delays.append)
+    return delays
+
+
+def _coordinator(tmp_path) -> DSBulkRangeCoordinator:
+    return DSBulkRangeCoordinator(DSBulkManager(STUB_DSBULK), str(tmp_path / "jobs"))
+
+
+def _run(coordinator: DSBulkRangeCoordinator, job_id: str, resume: bool = False):
+    (coordinator.resume if resume else coordinator.start)(job_id)
+    coordinator._threads[job_id].join(timeout=30)
+    return coordinator.get_job(job_id)
+
+
+def _invocations(state) -> list:
+    with open(state / "invocations.log") as f:
+        return f.read().splitlines()
+
+
+def test_split_token_ring_covers_the_ring():
+    ranges = split_token_ring(4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == MIN_TOKEN
+    assert ranges[-1][1] == MAX_TOKEN
+    assert all(ranges[i][1] == ranges[i + 1][0] for i in range(3))
+
+
+def test_unload_runs_one_sub_job_per_token_range(tmp_path, stub_state, sleeps):
+    coordinator = _coordinator(tmp_path)
+    output_path = tmp_path / "unload"
+    job = coordinator.create_job("unload", "ks", "events", partition_key="tenant,bucket",
+                                 output_path=str(output_path), range_count=4, max_parallel=2)
+
+    assert [sub_job["start_token"] for sub_job in job["sub_jobs"]] == [str(start) for start, _ in split_token_ring(4)]
+    for sub_job in job["sub_jobs"]:
+        assert f"> {sub_job['start_token']} AND" in sub_job["command"]
+        assert f"<= {sub_job['end_token']};" in sub_job["command"]
+
+    job = _run(coordinator, job["job_id"])
+
+    assert job["status"] == "completed"
+    assert job["progress"]["completed"] == 4
+    assert job["throughput"]["rows"] == 400
+    assert len(_invocations(stub_state)) == 4
+    assert sorted(os.listdir(output_path)) == [f"range-{i:04d}" for i in range(4)]
+    assert sleeps == []
+
+
+def test_failed_sub_jobs_are_retried_with_backoff(tmp_path, stub_state, sleeps, monkeypatch):
+    monkeypatch.setenv("STUB_DSBULK_FAILURES", "2")
+    coordinator = _coordinator(tmp_path)
+    job = coordinator.create_job("count", "ks", "events", partition_key="id", range_count=1,
+                                 max_retries=3, backoff_seconds=0.5)
+
+    job = _run(coordinator, job["job_id"])
+
+    assert job["status"] == "completed"
+    assert job["sub_jobs"][0]["attempts"] == 3
+    assert job["sub_jobs"][0]["rows"] == 100
+    assert sleeps == [0.5, 1.0]
+
+
+def test_sub_job_fails_once_retries_are_exhausted(tmp_path, stub_state, sleeps, monkeypatch):
+    monkeypatch.setenv("STUB_DSBULK_FAILURES", "99")
+    coordinator = _coordinator(tmp_path)
+    job = coordinator.create_job("count", "ks", "events", partition_key="id", range_count=1,
+                                 max_retries=1, backoff_seconds=0.5)
+
+    job = _run(coordinator, job["job_id"])
+
+    assert job["status"] == "failed"
+    assert job["sub_jobs"][0]["attempts"] == 2
+    assert "injected failure" in job["sub_jobs"][0]["error"]
+    assert sleeps == [0.5]
+
+
+def test_resume_from_checkpoint_reruns_only_unfinished_ranges(tmp_path, stub_state, sleeps, monkeypatch):
+    coordinator = _coordinator(tmp_path)
+    job = coordinator.create_job("count", "ks", "events", partition_key="id", range_count=4, max_retries=0)
+    failing = job["sub_jobs"][2]
+
+    monkeypatch.setenv("STUB_DSBULK_FAILURES", "99")
+    monkeypatch.setenv("STUB_DSBULK_FAIL_MATCH", f"> {failing['start_token']} AND")
+    job = _run(coordinator, job["job_id"])
+    assert job["status"] == "failed"
+    assert job["progress"]["completed"] == 3
+
+    # A new coordinator only knows the job from its checkpoint
+    monkeypatch.delenv("STUB_DSBULK_FAILURES")
+    restarted = _coordinator(tmp_path)
+    job = _run(restarted, job["job_id"], resume=True)
+
+    assert job["status"] == "completed"
+    assert job["throughput"]["rows"] == 400
+    calls = _invocations(stub_state)
+    assert len(calls) == 5
+    assert sum(1 for call in calls if f"> {failing['start_token']} AND" in call) == 2
+
+
+def test_checkpoint_of_an_interrupted_run_is_resumable(tmp_path, stub_state, sleeps):
+    coordinator = _coordinator(tmp_path)
+    job = coordinator.create_job("count", "ks", "events", partition_key="id", range_count=2)
+
+    # Simulate a restart while the job was running
+    with coordinator._lock:
+        coordinator._jobs[job["job_id"]]["status"] = "running"
+        coordinator._jobs[job["job_id"]]["sub_jobs"][0]["status"] = "running"
+        coordinator._save(coordinator._jobs[job["job_id"]])
+
+    restarted = _coordinator(tmp_path)
+    assert restarted.get_job(job["job_id"])["status"] == "interrupted"
+
+    job = _run(restarted, job["job_id"], resume=True)
+    assert job["status"] == "completed"
+    assert job["sub_jobs"][0]["attempts"] == 1
+
+
+def test_cancel_marks_a_job_that_is_not_running(tmp_path, stub_state, sleeps):
+    coordinator = _coordinator(tmp_path)
+    job = coordinator.create_job("count", "ks", "events", partition_key="id", range_count=2)
+
+    job = coordinator.cancel(job["job_id"])
+    assert job["status"] == "cancelled"
+    assert _coordinator(tmp_path).get_job(job["job_id"])["status"] == "cancelled"
+
+    job = _run(coordinator, job["job_id"], resume=True)
+    assert job["status"] == "completed"
+    with pytest.raises(ValueError):
+        coordinator.cancel(job["job_id"])
+
+
+def test_cancel_unknown_job(tmp_path):
+    with pytest.raises(KeyError):
+        _coordinator(tmp_path).cancel("dsbulk_count_missing")
@@ -0,0 +1,395 @@
+# backend/vector_search.py
+"""
+Vector search workloads for vector<float, N> columns and ANN indexes.
+
+Options (all optional):
+    {
+        "distribution": "clustered",
+        "clusters": 100,
+        "spread": 0.3,
+        "dataset_size": 100000,
+        "dataset_dir": "vector_datasets",
+        "seed": 42,
+        "tables": {"shop.products": {"clusters": 20}}
+    }
+
+"uniform" hashes every cycle to a vector of independent values in
+[-1, 1]. Such vectors are all about equally far apart, so ANN results say
+little about index quality. "clustered" instead writes a dataset of
+dataset_size vectors drawn around `clusters` random unit centres (each
+value of a vector is its centre's plus Gaussian noise of total length
+`spread`) to an .fvec file under dataset_dir, and the write workload
+reads vector (cycle mod dataset_size) from it. Writing at most
+dataset_size rows keeps every vector distinct, and recall can then be
+checked against a brute-force top-k computed locally from the same file.
+The brute-force search streams the file in chunks and runs for a sample
+of at most max_queries of the submitted ANN results.
+
+NumPy is listed in requirements.txt and is what makes clustered datasets
+practical. Without it, generation and brute-force search fall back to plain
+Python, and the default dataset_size and max_queries are much smaller, as
+a 100k x 768 dataset would take minutes to write.
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+import random
+import re
+import struct
+from typing import Dict, List, Optional, Any, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+VECTOR_DISTRIBUTIONS = ("uniform", "clustered")
+SIMILARITY_FUNCTIONS = ("cosine", "dot_product", "euclidean")
+
+DEFAULT_CLUSTERS = 100
+DEFAULT_SPREAD = 0.3
+DEFAULT_DATASET_SIZE = 100000 if NUMPY_AVAILABLE else 5000
+DEFAULT_DATASET_DIR = "vector_datasets"
+DEFAULT_SEED = 42
+
+# ANN results checked per recall request; more are sampled down
+DEFAULT_MAX_RECALL_QUERIES = 100 if NUMPY_AVAILABLE else 10
+
+# Rows generated per batch when writing a dataset, and scanned per batch by brute-force search
+DATASET_CHUNK_ROWS = 10000
+
+_VECTOR_TYPE_PATTERN = re.compile(r"^vector\s*<\s*(\w+)\s*,\s*(\d+)\s*>$")
+
+
+def normalize_vector_options(options: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Validate vector options and fill in defaults; empty means uniform vectors"""
+    if not options:
+        return None
+
+    distribution = options.get("distribution", "clustered")
+    if distribution not in VECTOR_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported vector distribution: {distribution}. "
+                         f"Expected one of {', '.join(VECTOR_DISTRIBUTIONS)}")
+
+    normalized = {
+        "distribution": distribution,
+        "clusters": int(options.get("clusters", DEFAULT_CLUSTERS)),
+        "spread": float(options.get("spread", DEFAULT_SPREAD)),
+        "dataset_size": int(options.get("dataset_size", DEFAULT_DATASET_SIZE)),
+        "dataset_dir": os.path.abspath(options.get("dataset_dir", DEFAULT_DATASET_DIR)),
+        "seed": int(options.get("seed", DEFAULT_SEED)),
+        "tables": options.get("tables", {})
+    }
+
+    if normalized["clusters"] < 1:
+        raise ValueError("clusters must be at least 1")
+    if normalized["spread"] < 0:
+        raise ValueError("spread must not be negative")
+    if normalized["dataset_size"] < normalized["clusters"]:
+        raise ValueError("dataset_size must be at least clusters")
+
+    return normalized
+
+
+def parse_vector_json(options_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse vector options passed as a JSON form field"""
+    if not options_json:
+        return None
+    return normalize_vector_options(json.loads(options_json))
+
+
+def resolve_vector_options(options: Optional[Dict[str, Any]], full_table_name: str,
+                           table_name: str) -> Optional[Dict[str, Any]]:
+    """Merge a table's entry under "tables" over the top-level options"""
+    if not options:
+        return None
+    table_options = options["tables"].get(full_table_name) or options["tables"].get(table_name)
+    if not table_options:
+        return options
+
+    merged = {key: value for key, value in options.items() if key != "tables"}
+    merged.update(table_options)
+    return normalize_vector_options(merged)
+
+
+def vector_type(cql_type: str) -> Optional[Tuple[str, int]]:
+    """Element type and dimension count of a vector type, None for other types"""
+    match = _VECTOR_TYPE_PATTERN.match(cql_type.strip().rstrip(',').strip().lower())
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+def dataset_path(options: Dict[str, Any], full_table_name: str, column: str, dimensions: int) -> str:
+    """Path of the dataset file of a column; changing the options changes the name"""
+    settings = {key: options[key] for key in ("clusters", "spread", "dataset_size", "seed")}
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+    filename = f"{full_table_name.replace('.', '_')}_{column}_{dimensions}d_{digest}.fvec"
+    return os.path.join(options["dataset_dir"], filename)
+
+
+def vector_binding(cql_type: str, dataset: Optional[str] = None,
+                   dataset_size: Optional[int] = None) -> Optional[str]:
+    """
+    nb5 binding producing vectors of a vector<float, N> column.
+
+    With a dataset file, cycles read its vectors in turn; otherwise every
+    cycle hashes to a uniform vector. Returns None for other types.
+    """
+    parsed = vector_type(cql_type)
+    if not parsed or parsed[0] != "float":
+        return None
+    if dataset:
+        return f"Mod({dataset_size}L); FVecReader('{dataset}'); ToCqlVector()"
+    return f"HashedFloatVectors({parsed[1]},-1.0,1.0); ToCqlVector()"
+
+
+def vector_bindings(columns: Dict[str, str], full_table_name: str,
+                    options: Optional[Dict[str, Any]]) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+    """
+    Bindings of the float vector columns of a table.
+
+    Returns the bindings and, for clustered vectors, the datasets they read,
+    which are written on first use.
+    """
+    bindings = {}
+    datasets = []
+    for column, cql_type in columns.items():
+        parsed = vector_type(cql_type)
+        if not parsed or parsed[0] != "float":
+            continue
+        if not options or options["distribution"] == "uniform":
+            bindings[column] = vector_binding(cql_type)
+            continue
+
+        path = dataset_path(options, full_table_name, column, parsed[1])
+        ensure_dataset(path, parsed[1], options)
+        bindings[column] = vector_binding(cql_type, path, options["dataset_size"])
+        datasets.append({"column": column, "path": path, "dimensions": parsed[1],
+                         "size": options["dataset_size"]})
+    return bindings, datasets
+
+
+def describe_vectors(options: Optional[Dict[str, Any]], datasets: List[Dict[str, Any]]) -> List[str]:
+    """YAML comment lines describing the vector datasets"""
+    return [
+        f"# Vectors: {dataset['column']} {dataset['dimensions']}-d, {dataset['size']} vectors around "
+        f"{options['clusters']} centres (spread {options['spread']:g}) read from {dataset['path']}"
+        for dataset in datasets
+    ]
+
+
+def similarity_function(index: Dict[str, Any]) -> str:
+    """Similarity function of an ANN index; SAI defaults to cosine"""
+    options = {key.lower(): str(value).lower() for key, value in (index.get("options") or {}).items()}
+    return options.get("similarity_function", "cosine")
+
+
+def _write_fvec_rows(f, rows, dimensions: int):
+    header = struct.pack('<i', dimensions)
+    row_format = f'<{dimensions}f'
+    for row in rows:
+        f.write(header)
+        f.write(struct.pack(row_format, *row))
+
+
+def _generate_numpy(f, dimensions: int, options: Dict[str, Any]):
+    rng = np.random.default_rng(options["seed"])
+    centres = rng.standard_normal((options["clusters"], dimensions))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    for start in range(0, options["dataset_size"], DATASET_CHUNK_ROWS):
+        rows = min(DATASET_CHUNK_ROWS, options["dataset_size"] - start)
+        noise = rng.standard_normal((rows, dimensions)) * (options["spread"] / math.sqrt(dimensions))
+        vectors = centres[rng.integers(0, options["clusters"], rows)] + noise
+        # One int32 dimension count ahead of every row
+        block = np.empty((rows, dimensions + 1), dtype='<f4')
+        block[:, 1:] = vectors
+        block.view('<i4')[:, 0] = dimensions
+        block.tofile(f)
+
+
+def _generate_python(f, dimensions: int, options: Dict[str, Any]):
+    rng = random.Random(options["seed"])
+    centres = []
+    for _ in range(options["clusters"]):
+        centre = [rng.gauss(0, 1) for _ in range(dimensions)]
+        norm = math.sqrt(sum(value * value for value in centre)) or 1.0
+        centres.append([value / norm for value in centre])
+    sigma = options["spread"] / math.sqrt(dimensions)
+    rows = ([value + rng.gauss(0, sigma) for value in centres[rng.randrange(options["clusters"])]]
+            for _ in range(options["dataset_size"]))
+    _write_fvec_rows(f, rows, dimensions)
+
+
+def ensure_dataset(path: str, dimensions: int, options: Dict[str, Any]) -> str:
+    """Write the clustered dataset of a column unless it already exists"""
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        if NUMPY_AVAILABLE:
+            _generate_numpy(f, dimensions, options)
+        else:
+            _generate_python(f, dimensions, options)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_dataset(path: str):
+    """
+    Vectors of an .fvec file: a read-only memory map when NumPy is available, else lists.
+    """
+    if NUMPY_AVAILABLE:
+        if not os.path.getsize(path):
+            return np.empty((0, 0), dtype='<f4')
+        raw = np.memmap(path, dtype='<f4', mode='r')
+        dimensions = int(raw[:1].view('<i4')[0])
+        return raw.reshape(-1, dimensions + 1)[:, 1:]
+
+    vectors = []
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(4)
+            if not header:
+                break
+            dimensions = struct.unpack('<i', header)[0]
+            vectors.append(list(struct.unpack(f'<{dimensions}f', f.read(4 * dimensions))))
+    return vectors
+
+
+def sample_queries(dataset, count: int, seed: int = DEFAULT_SEED) -> List[int]:
+    """Ids of count distinct dataset vectors to use as recall queries"""
+    count = min(count, len(dataset))
+    if NUMPY_AVAILABLE:
+        return sorted(int(i) for i in np.random.default_rng(seed).choice(len(dataset), count, replace=False))
+    return sorted(random.Random(seed).sample(range(len(dataset)), count))
+
+
+def _numpy_scores(queries, chunk, similarity: str):
+    """Similarity of every query (rows, already normalised for cosine) to every chunk vector"""
+    chunk = np.asarray(chunk, dtype=np.float64)
+    if similarity == "cosine":
+        chunk = chunk / np.maximum(np.linalg.norm(chunk, axis=1, keepdims=True), 1e-12)
+    if similarity == "euclidean":
+        return 2 * queries @ chunk.T - (chunk * chunk).sum(axis=1)
+    return queries @ chunk.T
+
+
+def brute_force_top_k(dataset, query_ids: List[int], k: int,
+                      similarity: str = "cosine") -> Dict[int, List[int]]:
+    """
+    Exact top-k neighbour ids of the given dataset vectors, best first.
+
+    The dataset is scanned DATASET_CHUNK_ROWS vectors at a time, keeping
+    only the running top-k of each query, so a memory-mapped dataset is
+    never copied whole.
+    """
+    if similarity not in SIMILARITY_FUNCTIONS:
+        raise ValueError(f"Unsupported similarity function: {similarity}. "
+                         f"Expected one of {', '.join(SIMILARITY_FUNCTIONS)}")
+    k = min(k, len(dataset))
+    if not query_ids or not k:
+        return {query_id: [] for query_id in query_ids}
+
+    if NUMPY_AVAILABLE:
+        queries = np.asarray(dataset[query_ids], dtype=np.float64)
+        if similarity == "cosine":
+            queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        best_scores = np.empty((len(query_ids), 0))
+        best_ids = np.empty((len(query_ids), 0), dtype=np.int64)
+        for start in range(0, len(dataset), DATASET_CHUNK_ROWS):
+            chunk = dataset[start:start + DATASET_CHUNK_ROWS]
+            scores = np.concatenate([best_scores, _numpy_scores(queries, chunk, similarity)], axis=1)
+            ids = np.concatenate([best_ids, np.broadcast_to(np.arange(start, start + len(chunk)),
+                                                            (len(query_ids), len(chunk)))], axis=1)
+            keep = min(k, scores.shape[1])
+            top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_ids = np.take_along_axis(ids, top, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return {
+            query_id: [int(i) for i in np.take_along_axis(best_ids[n:n + 1], order[n:n + 1], axis=1)[0]]
+            for n, query_id in enumerate(query_ids)
+        }
+
+    def score(a: List[float], b: List[float]) -> float:
+        if similarity == "euclidean":
+            return -sum((x - y) ** 2 for x, y in zip(a, b))
+        dot = sum(x * y for x, y in zip(a, b))
+        if similarity == "cosine":
+            return dot / ((math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))) or 1e-12)
+        return dot
+
+    return {
+        query_id: heapq.nlargest(k, range(len(dataset)), key=lambda i: score(dataset[query_id], dataset[i]))
+        for query_id in query_ids
+    }
+
+
+def _vector_key(vector) -> bytes:
+    if NUMPY_AVAILABLE:
+        return np.asarray(vector, dtype='<f4').tobytes()
+    return struct.pack(f'<{len(vector)}f', *(float(value) for value in vector))
+
+
+def _ids_of_vectors(dataset, vectors: List[List[float]]) -> Dict[bytes, int]:
+    """Dataset ids of the given vectors, keyed by _vector_key, scanning the dataset once"""
+    wanted = {_vector_key(vector) for vector in vectors}
+    ids_by_vector = {}
+    for i, vector in enumerate(dataset):
+        key = _vector_key(vector)
+        if key in wanted and key not in ids_by_vector:
+            ids_by_vector[key] = i
+            if len(ids_by_vector) == len(wanted):
+                break
+    return ids_by_vector
+
+
+def check_recall(path: str, results: List[Dict[str, Any]], k: int, similarity: str = "cosine",
+                 max_queries: int = DEFAULT_MAX_RECALL_QUERIES, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """
+    Recall@k of ANN results against a brute-force search of the dataset.
+
+    Each result names its query by dataset id and lists what the ANN query
+    returned, either as dataset ids or as the vectors themselves. When
+    there are more than max_queries results, a seeded sample of them is
+    checked.
+    """
+    submitted = len(results)
+    if submitted > max_queries:
+        results = [results[i] for i in sorted(random.Random(seed).sample(range(submitted), max_queries))]
+
+    dataset = load_dataset(path)
+    query_ids = [int(result["query_id"]) for result in results]
+    if any(not 0 <= query_id < len(dataset) for query_id in query_ids):
+        raise ValueError(f"query_id must be a dataset id below {len(dataset)}")
+    expected = brute_force_top_k(dataset, query_ids, k, similarity)
+
+    ids_by_vector = {}
+    returned_vectors = [vector for result in results for vector in result.get("vectors", [])[:k]]
+    if returned_vectors:
+        ids_by_vector = _ids_of_vectors(dataset, returned_vectors)
+
+    per_query = []
+    for query_id, result in zip(query_ids, results):
+        if "vectors" in result:
+            returned = [ids_by_vector.get(_vector_key(vector)) for vector in result["vectors"]]
+        else:
+            returned = [int(i) for i in result.get("ids", [])]
+        hits = len(set(returned[:k]) & set(expected[query_id]))
+        per_query.append({"query_id": query_id, "recall": round(hits / len(expected[query_id]), 4),
+                          "expected": expected[query_id]})
+
+    return {
+        "k": k,
+        "similarity": similarity,
+        "queries": len(per_query),
+        "submitted": submitted,
+        "recall": round(sum(entry["recall"] for entry in per_query) / len(per_query), 4) if per_query else None,
+        "per_query": per_query
+    }
@@ -0,0 +1,341 @@
+# backend/workload_linter.py
+"""
+Static performance checks for nb5 workload YAMLs.
+
+The workload is parsed with the same tolerant repair logic the generators
+use, then every op outside schema blocks is checked on its own and against
+the tables of a parsed schema (when one is available):
+
+    allow_filtering      error    statement uses ALLOW FILTERING
+    full_scan            error    SELECT without a WHERE clause
+    missing_partition_key error   WHERE clause does not fix the partition key
+                                  and no index serves the restricted columns
+    collection_comparison error   collection column compared with =, IN or a
+                                  range instead of CONTAINS / CONTAINS KEY
+    unbounded_partition  warning  partition or index read without LIMIT
+    unprepared_op        warning  op runs unprepared outside a schema block
+    inconsistent_cl      warning  reads (or writes) use different consistency levels
+    unknown_table        info     table not found in the schema
+"""
+import re
+from typing import Dict, List, Optional, Any, Tuple
+
+import yaml_utils
+from row_sizing import column_kind, normalize_cql_type
+
+SEVERITIES = ("error", "warning", "info")
+
+# Op fields holding the statement; raw and simple statements are never prepared
+STATEMENT_FIELDS = ("stmt", "prepared", "raw", "simple")
+UNPREPARED_FIELDS = ("raw", "simple")
+
+_DDL_PATTERN = re.compile(r"^\s*(CREATE|DROP|ALTER|TRUNCATE)\b", re.IGNORECASE)
+_DML_PATTERN = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_KEYSPACE_TEMPLATE_PATTERN = re.compile(r"<<keyspace:([^>]*)>>")
+_TEMPLATE_PATTERN = re.compile(r"TEMPLATE\(\s*[^,)]+\s*,\s*([^)]*)\)", re.IGNORECASE)
+_TABLE_PATTERNS = {
+    "SELECT": re.compile(r"\bFROM\s+([\w.\"]+)", re.IGNORECASE),
+    "INSERT": re.compile(r"\bINTO\s+([\w.\"]+)", re.IGNORECASE),
+    "UPDATE": re.compile(r"^\s*UPDATE\s+([\w.\"]+)", re.IGNORECASE),
+    "DELETE": re.compile(r"\bFROM\s+([\w.\"]+)", re.IGNORECASE)
+}
+_WHERE_PATTERN = re.compile(
+    r"\bWHERE\b(.*?)(?=\bORDER\s+BY\b|\bGROUP\s+BY\b|\bLIMIT\b|\bPER\s+PARTITION\s+LIMIT\b"
+    r"|\bALLOW\s+FILTERING\b|\bIF\b|;|$)",
+    re.IGNORECASE | re.DOTALL
+)
+_CONDITION_PATTERN = re.compile(r"^\s*(\(?[\w\s,\"]+\)?)\s*(=|<=|>=|<|>|!=|\bIN\b|\bCONTAINS\s+KEY\b|\bCONTAINS\b|\bLIKE\b)",
+                                re.IGNORECASE)
+
+
+def _finding(severity: str, rule: str, message: str, block: Optional[str] = None,
+             op: Optional[str] = None) -> Dict[str, Any]:
+    return {"severity": severity, "rule": rule, "block": block, "op": op, "message": message}
+
+
+def _consistency_level(value: Any) -> Optional[str]:
+    """Consistency level of a cl param, resolving TEMPLATE(name,default) to its default"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    template = _TEMPLATE_PATTERN.search(value)
+    if template:
+        value = template.group(1)
+    return value.strip().upper() or None
+
+
+def iter_ops(workload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a workload into its ops with their effective params.
+
+    Params are inherited from the document, then the block, then the op
+    (both its params map and its own fields).
+    """
+    document_params = workload.get("params") or {}
+    if isinstance(workload.get("blocks"), dict):
+        blocks = workload["blocks"]
+    else:
+        blocks = {"default": {"ops": workload.get("ops") or {}}}
+
+    ops = []
+    for block_name, block in blocks.items():
+        if not isinstance(block, dict):
+            continue
+        block_params = dict(document_params)
+        block_params.update(block.get("params") or {})
+
+        block_ops = block.get("ops") or {}
+        if isinstance(block_ops, list):
+            block_ops = {f"op{i + 1}": op for i, op in enumerate(block_ops)}
+
+        for op_name, op in block_ops.items():
+            params = dict(block_params)
+            statement = None
+            unprepared_form = False
+            if isinstance(op, str):
+                statement = op
+            elif isinstance(op, dict):
+                params.update(op.get("params") or {})
+                params.update({key: value for key, value in op.items() if key not in ("params", "ops")
+                               and not (key in STATEMENT_FIELDS and isinstance(value, str))})
+                for field in STATEMENT_FIELDS:
+                    if isinstance(op.get(field), str):
+                        statement = op[field]
+                        unprepared_form = field in UNPREPARED_FIELDS
+                        break
+            if statement is None:
+                continue
+            ops.append({
+                "block": block_name,
+                "op": op_name,
+                "statement": statement,
+                "params": params,
+                "unprepared_form": unprepared_form
+            })
+    return ops
+
+
+def _find_table(schema_info: Dict[str, Any], table_ref: str) -> Optional[Dict[str, Any]]:
+    table_ref = table_ref.replace('"', '')
+    tables = schema_info.get("tables", {})
+    if table_ref in tables:
+        return tables[table_ref]
+    bare_name = table_ref.split('.')[-1]
+    keyspace = table_ref.split('.')[0] if '.' in table_ref else None
+    for info in tables.values():
+        if info["name"] == bare_name and (keyspace is None or info["keyspace"] in (None, keyspace)):
+            return info
+    return None
+
+
+def _split_conditions(where: str) -> List[str]:
+    """Split a WHERE clause on AND outside parentheses"""
+    conditions = []
+    depth = 0
+    start = 0
+    for match in re.finditer(r"[()]|\bAND\b", where, re.IGNORECASE):
+        token = match.group(0)
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0:
+            conditions.append(where[start:match.start()])
+            start = match.end()
+    conditions.append(where[start:])
+    return [condition.strip() for condition in conditions if condition.strip()]
+
+
+def restrictions(statement: str) -> List[Tuple[List[str], str]]:
+    """The (columns, operator) pairs of a statement's WHERE clause, operators upper-cased"""
+    where = _WHERE_PATTERN.search(statement)
+    if not where:
+        return []
+
+    pairs = []
+    for condition in _split_conditions(where.group(1)):
+        if condition.lower().startswith("token("):
+            continue
+        match = _CONDITION_PATTERN.match(condition)
+        if not match:
+            continue
+        columns = [col.strip().strip('"') for col in match.group(1).strip("() ").split(',') if col.strip()]
+        pairs.append((columns, " ".join(match.group(2).upper().split())))
+    return pairs
+
+
+def restricted_columns(statement: str) -> Tuple[List[str], List[str]]:
+    """Columns a statement fixes with = or IN, and columns it restricts otherwise"""
+    equal, other = [], []
+    for columns, operator in restrictions(statement):
+        target = equal if operator in ("=", "IN") else other
+        target.extend(columns)
+    return equal, other
+
+
+def _collection_comparisons(statement: str, column_types: Dict[str, str]) -> List[str]:
+    """Non-frozen collection columns a statement restricts with anything but CONTAINS"""
+    columns = []
+    for restricted, operator in restrictions(statement):
+        if operator.startswith("CONTAINS"):
+            continue
+        for col in restricted:
+            cql_type = column_types.get(col)
+            if (cql_type and column_kind(cql_type) in ("set", "list", "map")
+                    and not normalize_cql_type(cql_type).startswith("frozen<")):
+                columns.append(col)
+    return columns
+
+
+def _resolved_statement(op: Dict[str, Any]) -> str:
+    return _KEYSPACE_TEMPLATE_PATTERN.sub(lambda m: m.group(1) or "baselines", op["statement"])
+
+
+def _check_statement(op: Dict[str, Any], schema_info: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    statement = _resolved_statement(op)
+    block, op_name = op["block"], op["op"]
+    findings = []
+
+    if re.search(r"\bALLOW\s+FILTERING\b", statement, re.IGNORECASE):
+        findings.append(_finding("error", "allow_filtering",
+                                 "ALLOW FILTERING makes every replica scan and filter rows", block, op_name))
+
+    kind = _DML_PATTERN.match(statement).group(1).upper()
+    if kind == "INSERT":
+        return findings
+
+    has_where = bool(re.search(r"\bWHERE\b", statement, re.IGNORECASE))
+    has_limit = bool(re.search(r"\bLIMIT\s+\S+", statement, re.IGNORECASE))
+    if kind == "SELECT" and not has_where:
+        if not re.search(r"\bANN\s+OF\b", statement, re.IGNORECASE):
+            findings.append(_finding("error", "full_scan",
+                                     "SELECT without a WHERE clause scans the whole table", block, op_name))
+        return findings
+
+    table_match = _TABLE_PATTERNS[kind].search(statement)
+    if not schema_info or not table_match:
+        return findings
+    table_info = _find_table(schema_info, table_match.group(1))
+    if not table_info or not table_info.get("primary_key"):
+        findings.append(_finding("info", "unknown_table",
+                                 f"Table {table_match.group(1)} is not in the schema; key checks skipped",
+                                 block, op_name))
+        return findings
+
+    collections = _collection_comparisons(statement, table_info.get("columns", {}))
+    if collections:
+        findings.append(_finding("error", "collection_comparison",
+                                 f"Collection column(s) {', '.join(collections)} can only be restricted "
+                                 f"with CONTAINS or CONTAINS KEY", block, op_name))
+
+    partition_columns = table_info["primary_key"][0]
+    clustering_columns = [col for part in table_info["primary_key"][1:] for col in part]
+    indexed = {
+        index["column"] for index in schema_info.get("indices", [])
+        if index["table"] in (f"{table_info['keyspace']}.{table_info['name']}", table_info["name"])
+    }
+    equal, other = restricted_columns(statement)
+    restricted = set(equal) | set(other)
+
+    if not all(col in equal for col in partition_columns):
+        if kind == "SELECT" and restricted & indexed:
+            if not has_limit:
+                findings.append(_finding("warning", "unbounded_partition",
+                                         "Index query without LIMIT can return any number of rows "
+                                         "from every node", block, op_name))
+            return findings
+        missing = [col for col in partition_columns if col not in equal]
+        findings.append(_finding("error", "missing_partition_key",
+                                 f"WHERE clause does not fix partition key column(s) {', '.join(missing)}; "
+                                 f"the query has to visit every partition", block, op_name))
+        return findings
+
+    full_key = all(col in equal for col in clustering_columns)
+    if kind == "SELECT" and clustering_columns and not full_key and not has_limit:
+        findings.append(_finding("warning", "unbounded_partition",
+                                 "Partition read without LIMIT reads the whole partition", block, op_name))
+    return findings
+
+
+def _check_consistency(ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reads, and writes, should all run at one consistency level"""
+    findings = []
+    for label, kinds in (("reads", ("SELECT",)), ("writes", ("INSERT", "UPDATE", "DELETE"))):
+        levels = {}
+        for op in ops:
+            level = _consistency_level(op["params"].get("cl"))
+            if op["kind"] in kinds and level:
+                levels.setdefault(level, []).append(f"{op['block']}.{op['op']}")
+        if len(levels) > 1:
+            used = "; ".join(f"{level} by {', '.join(names)}" for level, names in sorted(levels.items()))
+            findings.append(_finding("warning", "inconsistent_cl",
+                                     f"{label.capitalize()} use different consistency levels ({used}), "
+                                     f"so their latencies are not comparable", None, None))
+    return findings
+
+
+def _data_ops(workload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """DML ops of a workload; schema setup runs once, so only the data ops are checked"""
+    ops = []
+    for op in iter_ops(workload):
+        if "schema" in op["block"].lower() or _DDL_PATTERN.match(op["statement"]):
+            continue
+        dml = _DML_PATTERN.match(op["statement"])
+        if dml:
+            op["kind"] = dml.group(1).upper()
+            ops.append(op)
+    return ops
+
+
+def schema_covers_workload(yaml_content: str, schema_info: Dict[str, Any]) -> bool:
+    """
+    Whether every table the workload's data ops use is in the schema.
+
+    Used to decide if a schema that was not passed with the workload (the
+    last uploaded one) describes it, before its key checks are trusted.
+    """
+    try:
+        workload = yaml_utils.load_tolerant(yaml_content)
+    except yaml_utils.YAMLError:
+        return False
+    if not isinstance(workload, dict):
+        return False
+    for op in _data_ops(workload):
+        table_match = _TABLE_PATTERNS[op["kind"]].search(_resolved_statement(op))
+        if table_match and not _find_table(schema_info, table_match.group(1)):
+            return False
+    return True
+
+
+def lint_workload(yaml_content: str, schema_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Report performance anti-patterns of an nb5 workload.
+
+    schema_info is a parsed schema (see CQLParser.parse_cql); without it the
+    primary key and index checks are skipped. Returns the findings, worst
+    first, with counts per severity.
+    """
+    try:
+        workload = yaml_utils.load_tolerant(yaml_content)
+    except yaml_utils.YAMLError as e:
+        findings = [_finding("error", "invalid_yaml", f"Workload cannot be parsed: {str(e)}")]
+        return {"ok": False, "ops": 0, "counts": {"error": 1, "warning": 0, "info": 0}, "findings": findings}
+    if not isinstance(workload, dict):
+        findings = [_finding("error", "invalid_yaml", "Workload is not a YAML mapping")]
+        return {"ok": False, "ops": 0, "counts": {"error": 1, "warning": 0, "info": 0}, "findings": findings}
+
+    ops = _data_ops(workload)
+    findings = []
+    for op in ops:
+        prepared = str(op["params"].get("prepared", True)).strip().lower() not in ("false", "no", "0")
+        if op["unprepared_form"] or not prepared:
+            findings.append(_finding("warning", "unprepared_op",
+                                     "Op runs unprepared, so every execution is parsed again by the coordinator",
+                                     op["block"], op["op"]))
+        findings.extend(_check_statement(op, schema_info))
+    findings.extend(_check_consistency(ops))
+
+    findings.sort(key=lambda finding: SEVERITIES.index(finding["severity"]))
+    counts = {severity: sum(1 for finding in findings if finding["severity"] == severity)
+              for severity in SEVERITIES}
+    return {"ok": counts["error"] == 0, "ops": len(ops), "counts": counts, "findings": findings}
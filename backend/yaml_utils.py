@@ -0,0 +1,145 @@
+# backend/yaml_utils.py
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import yaml
+
+# Prefer the libyaml C implementation; fall back to the pure-Python classes
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+    LIBYAML_AVAILABLE = False
+
+YAMLError = yaml.YAMLError
+
+# Number of parsed documents kept by load_cached
+DOCUMENT_CACHE_SIZE = 1024
+
+_document_cache = OrderedDict()
+_document_cache_lock = threading.Lock()
+
+# All text-level repairs, applied in one scan of the document:
+#   - comma before PRIMARY KEY in CREATE TABLE statements
+#   - trailing comma before a closing parenthesis (column lists, INSERT ... values)
+#   - semicolon on its own line after a closing parenthesis
+#   - standalone semicolon lines
+_REPAIR_PATTERN = re.compile(
+    r"(?P<pk_comma>,(?=\s*PRIMARY\s+KEY))"
+    r"|(?P<trailing_comma>,\s*\))"
+    r"|(?P<detached_semicolon>\)[ \t]*\n\s*;)"
+    r"|(?P<lone_semicolon>^[ \t]*;[ \t]*$)",
+    re.IGNORECASE | re.MULTILINE
+)
+
+_BLOCK_KEYS = ('params:', 'ops:', 'instrument:', 'prepared:')
+
+
+def load(yaml_content: str) -> Any:
+    """Parse a YAML document with the fastest available safe loader"""
+    return yaml.load(yaml_content, Loader=SafeLoader)
+
+
+def dump(data: Any) -> str:
+    """Serialize data to block-style YAML, preserving key order"""
+    return yaml.dump(data, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+
+
+def load_cached(yaml_content: str) -> Any:
+    """
+    Parse a YAML document, reusing the result for identical content.
+
+    The returned object is shared between callers and must not be modified.
+    """
+    key = hashlib.sha256(yaml_content.encode('utf-8')).hexdigest()
+
+    with _document_cache_lock:
+        if key in _document_cache:
+            _document_cache.move_to_end(key)
+            return _document_cache[key]
+
+    data = load(yaml_content)
+
+    with _document_cache_lock:
+        _document_cache[key] = data
+        while len(_document_cache) > DOCUMENT_CACHE_SIZE:
+            _document_cache.popitem(last=False)
+
+    return data
+
+
+def clear_cache():
+    """Drop all cached documents"""
+    with _document_cache_lock:
+        _document_cache.clear()
+
+
+def _repair_match(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == 'pk_comma' or kind == 'lone_semicolon':
+        return ''
+    if kind == 'trailing_comma':
+        return '\n)'
+    return ');'
+
+
+def repair_yaml(yaml_content: str) -> str:
+    """
+    Fix the syntax issues commonly found in generated and hand-edited workloads.
+
+    Text repairs run as a single combined regex scan, followed by one pass
+    over the lines that strips binding semicolons and restores missing
+    indentation of block keys.
+    """
+    if isinstance(yaml_content, bytes):
+        yaml_content = yaml_content.decode('utf-8')
+
+    content = _REPAIR_PATTERN.sub(_repair_match, yaml_content)
+
+    lines = content.split('\n')
+    in_bindings = False
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+
+        # Track the top-level bindings section
+        if stripped == 'bindings:':
+            in_bindings = True
+        elif stripped and line[0] not in ' \t' and in_bindings:
+            in_bindings = False
+
+        # Remove trailing semicolons from binding definitions
+        if in_bindings and ':' in line and line.rstrip().endswith(';'):
+            binding_name, binding_value = line.split(':', 1)
+            line = f"{binding_name}:{binding_value.rstrip().rstrip(';')}"
+
+        # Indent a rampup1 block that follows a statement
+        if stripped == 'rampup1:' and i > 0 and lines[i - 1].strip().endswith(';') and line[:1] not in (' ', '\t'):
+            line = '  ' + line
+
+        # Indent block keys that lost their indentation
+        if line[:1] not in (' ', '\t') and any(key in line for key in _BLOCK_KEYS):
+            line = '    ' + line
+
+        lines[i] = line
+
+    return '\n'.join(lines)
+
+
+def load_tolerant(yaml_content: str) -> Any:
+    """
+    Parse a YAML document, repairing it only if the fast path fails.
+
+    Raises YAMLError when the document cannot be parsed even after repair.
+    """
+    if isinstance(yaml_content, bytes):
+        yaml_content = yaml_content.decode('utf-8')
+
+    try:
+        return load_cached(yaml_content)
+    except YAMLError:
+        return load_cached(repair_yaml(yaml_content))
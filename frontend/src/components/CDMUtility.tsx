@@ -1,5 +1,5 @@
 // frontend/src/components/CDMUtility.tsx
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './CDMUtility.css';
 
 interface CDMProps {
@@ -36,6 +36,19 @@ const CDMUtility: React.FC<CDMProps> = ({ keyspaces, tables }) => {
     estimatedTime: '',
     steps: []
   });
+  const [executionStatus, setExecutionStatus] = useState<any>(null);
+  
+  // Reference for the status polling interval
+  const pollIntervalRef = useRef<number | null>(null);
+  
+  // Stop polling when the component unmounts
+  useEffect(() => {
+    return () => {
+      if (pollIntervalRef.current !== null) {
+        clearInterval(pollIntervalRef.current);
+      }
+    };
+  }, []);
   
   // Update filtered tables when keyspace selection changes
   useEffect(() => {
@@ -86,7 +99,7 @@ const CDMUtility: React.FC<CDMProps> = ({ keyspaces, tables }) => {
     }
   };
   
-  const handlePreviewMigration = () => {
+  const handlePreviewMigration = async () => {
     // Validate inputs
     if (!sourceKeyspace || !sourceTable || !targetKeyspace || !targetTable) {
       setError('Please select both source and target tables');
@@ -96,65 +109,95 @@ const CDMUtility: React.FC<CDMProps> = ({ keyspaces, tables }) => {
     setIsLoading(true);
     setError(null);
     
-    // Mock API call - in real implementation, this would call the backend
-    setTimeout(() => {
-      // Generate mock migration plan
-      const mockPlan = {
-        estimatedRows: Math.floor(Math.random() * 1000000) + 1000,
-        estimatedTime: `${Math.floor(Math.random() * 60) + 5} minutes`,
-        steps: [
-          {
-            order: 1,
-            description: 'Create snapshot of source table',
-            estimatedTime: '30 seconds'
-          },
-          {
-            order: 2,
-            description: `Export data from ${sourceKeyspace}.${sourceTable}`,
-            estimatedTime: '2-3 minutes'
-          },
-          {
-            order: 3,
-            description: `Import data to ${targetKeyspace}.${targetTable}`,
-            estimatedTime: '3-5 minutes'
-          },
-          {
-            order: 4,
-            description: 'Verify row counts',
-            estimatedTime: '20 seconds'
-          }
-        ]
-      };
+    try {
+      const formData = new FormData();
+      formData.append('source_keyspace', sourceKeyspace);
+      formData.append('source_table', sourceTable);
+      formData.append('target_keyspace', targetKeyspace);
+      formData.append('target_table', targetTable);
+      formData.append('migration_type', migrationType);
+      formData.append('batch_size', batchSize.toString());
+      if (filterCondition) {
+        formData.append('filter_condition', filterCondition);
+      }
+      
+      const response = await fetch('http://localhost:8000/api/cdm/plan', {
+        method: 'POST',
+        body: formData,
+      });
       
-      // Generate mock command preview
-      const mockCommand = `
-cdm migrate \\
-  --source-keyspace ${sourceKeyspace} \\
-  --source-table ${sourceTable} \\
-  --target-keyspace ${targetKeyspace} \\
-  --target-table ${targetTable} \\
-  --migration-type ${migrationType} \\
-  --batch-size ${batchSize} \\
-  --timeout ${timeoutSecs}${filterCondition ? ` \\
-  --filter "${filterCondition}"` : ''}
-`;
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.detail || 'Failed to plan migration');
+      }
       
-      setMigrationPlan(mockPlan);
-      setCommandPreview(mockCommand);
+      const plan = await response.json();
+      setMigrationPlan(plan);
+      setCommandPreview(plan.command);
       setActiveSection('preview');
+    } catch (error) {
+      setError(`Error planning migration: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    } finally {
       setIsLoading(false);
-    }, 1500);
+    }
   };
   
-  const handleExecuteMigration = () => {
+  const loadExecutionStatus = async (executionId: string) => {
+    try {
+      const response = await fetch(`http://localhost:8000/api/cdm/status/${executionId}`);
+      
+      if (!response.ok) {
+        throw new Error('Failed to load migration status');
+      }
+      
+      const status = await response.json();
+      setExecutionStatus(status);
+      
+      // Stop polling once the run has finished
+      if (!status.is_running && pollIntervalRef.current !== null) {
+        clearInterval(pollIntervalRef.current);
+        pollIntervalRef.current = null;
+      }
+    } catch (error) {
+      setError(`Error loading migration status: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  };
+  
+  const handleExecuteMigration = async () => {
     setIsLoading(true);
     setError(null);
     
-    // Mock execution - in real implementation, this would call the backend
-    setTimeout(() => {
+    try {
+      const formData = new FormData();
+      formData.append('plan_id', migrationPlan.plan_id);
+      formData.append('timeout', timeoutSecs.toString());
+      
+      const response = await fetch('http://localhost:8000/api/cdm/run', {
+        method: 'POST',
+        body: formData,
+      });
+      
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.detail || 'Failed to start migration');
+      }
+      
+      const run = await response.json();
       setActiveSection('execute');
+      await loadExecutionStatus(run.execution_id);
+      
+      // Poll the run status every 5 seconds
+      if (pollIntervalRef.current !== null) {
+        clearInterval(pollIntervalRef.current);
+      }
+      pollIntervalRef.current = window.setInterval(() => {
+        loadExecutionStatus(run.execution_id);
+      }, 5000) as unknown as number;
+    } catch (error) {
+      setError(`Error starting migration: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    } finally {
       setIsLoading(false);
-    }, 2000);
+    }
   };
   
   const handleDownloadScript = () => {
@@ -464,35 +507,43 @@ cdm migrate \\
           <div className="execution-details">
             <div className="detail-item">
               <div className="detail-label">Job ID:</div>
-              <div className="detail-value">cdm_job_{Math.floor(Math.random() * 10000)}</div>
+              <div className="detail-value">{executionStatus?.execution_id}</div>
             </div>
             <div className="detail-item">
               <div className="detail-label">Status:</div>
               <div className="detail-value">
-                <span className="status-badge in-progress">In Progress</span>
+                <span className={`status-badge ${executionStatus?.is_running ? 'in-progress' : executionStatus?.status}`}>
+                  {executionStatus?.status}
+                </span>
               </div>
             </div>
             <div className="detail-item">
               <div className="detail-label">Start Time:</div>
-              <div className="detail-value">{new Date().toLocaleString()}</div>
+              <div className="detail-value">
+                {executionStatus?.start_time ? new Date(executionStatus.start_time * 1000).toLocaleString() : ''}
+              </div>
             </div>
             <div className="detail-item">
               <div className="detail-label">Estimated Completion:</div>
-              <div className="detail-value">{new Date(Date.now() + 15 * 60000).toLocaleString()}</div>
+              <div className="detail-value">
+                {executionStatus?.start_time
+                  ? new Date((executionStatus.start_time + migrationPlan.estimated_seconds) * 1000).toLocaleString()
+                  : ''}
+              </div>
             </div>
           </div>
           
           <div className="progress-container">
             <div className="progress-header">
               <h5>Migration Progress</h5>
-              <div className="progress-percentage">15%</div>
+              <div className="progress-percentage">{executionStatus?.progress?.percent ?? 0}%</div>
             </div>
             <div className="progress-bar">
-              <div className="progress-fill" style={{ width: '15%' }}></div>
+              <div className="progress-fill" style={{ width: `${executionStatus?.progress?.percent ?? 0}%` }}></div>
             </div>
             <div className="progress-steps">
               {migrationPlan.steps.map((step: any, index: number) => (
-                <div key={index} className={`progress-step ${index === 0 ? 'completed' : index === 1 ? 'active' : ''}`}>
+                <div key={index} className={`progress-step ${index === 0 || !executionStatus?.is_running ? 'completed' : 'active'}`}>
                   <div className="step-indicator"></div>
                   <div className="step-label">{step.description}</div>
                 </div>
@@ -503,24 +554,16 @@ cdm migrate \\
           <div className="execution-logs">
             <div className="logs-header">
               <h5>Execution Logs</h5>
-              <button className="refresh-logs-button">
+              <button
+                className="refresh-logs-button"
+                onClick={() => executionStatus && loadExecutionStatus(executionStatus.execution_id)}
+              >
                 Refresh Logs
               </button>
             </div>
             <div className="logs-content">
               <pre className="logs-output">
-{`[2023-06-15 14:32:05] INFO: Starting migration job cdm_job_5724
-[2023-06-15 14:32:06] INFO: Connecting to source cluster
-[2023-06-15 14:32:07] INFO: Source connection established
-[2023-06-15 14:32:08] INFO: Connecting to target cluster
-[2023-06-15 14:32:09] INFO: Target connection established
-[2023-06-15 14:32:10] INFO: Creating snapshot of ${sourceKeyspace}.${sourceTable}
-[2023-06-15 14:32:15] INFO: Snapshot created successfully
-[2023-06-15 14:32:16] INFO: Starting data export from ${sourceKeyspace}.${sourceTable}
-[2023-06-15 14:32:20] INFO: Exported 1,000 rows...
-[2023-06-15 14:32:30] INFO: Exported 5,000 rows...
-[2023-06-15 14:32:45] INFO: Exported 12,000 rows...
-[2023-06-15 14:33:05] INFO: Exported 25,000 rows...`}
+                {executionStatus ? [...executionStatus.stdout, ...executionStatus.stderr].join('\n') : ''}
               </pre>
             </div>
           </div>